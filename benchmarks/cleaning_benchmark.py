@@ -0,0 +1,53 @@
+"""
+Micro-benchmark of text cleaning: naive approaches against a single translate pass
+"""
+import re
+import timeit
+from string import punctuation
+
+from config.test_params import TEST_FILES_FOLDER
+from core_utils.cleaning import clean_text
+
+EXTRA_PUNCTUATION = '«»„“”‘’—–…№'
+
+
+def clean_per_character(text: str) -> str:
+    """
+    Cleans each token with a loop over its characters
+    """
+    tokens = []
+    for word in text.split():
+        cleaned = ''
+        for char in word:
+            if char not in punctuation and char not in EXTRA_PUNCTUATION:
+                cleaned += char.lower()
+        if cleaned:
+            tokens.append(cleaned)
+    return ' '.join(tokens)
+
+
+def clean_with_regex_passes(text: str) -> str:
+    """
+    Cleans text with several regular expression passes
+    """
+    text = text.lower()
+    text = re.sub(f'[{re.escape(punctuation)}]', ' ', text)
+    text = re.sub(f'[{EXTRA_PUNCTUATION}]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def main():
+    with open(TEST_FILES_FOLDER / '0_raw.txt', encoding='utf-8') as file:
+        text = '\n'.join([file.read()] * 2000)
+
+    assert clean_text(text) == clean_per_character(text) == clean_with_regex_passes(text)
+
+    for name, func in (('per-character loop', clean_per_character),
+                       ('regex passes', clean_with_regex_passes),
+                       ('translate table', clean_text)):
+        seconds = min(timeit.repeat(lambda func=func: func(text), number=5, repeat=3)) / 5
+        print(f'{name:<20} {seconds * 1000:8.2f} ms per {len(text)} chars')
+
+
+if __name__ == '__main__':
+    main()
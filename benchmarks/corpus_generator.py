@@ -0,0 +1,140 @@
+"""
+Generator of synthetic Russian corpora in the ASSETS_PATH layout
+"""
+import argparse
+import datetime
+import itertools
+import json
+import random
+import re
+import shutil
+from collections import Counter
+from pathlib import Path
+
+from config.test_params import TEST_FILES_FOLDER
+
+SYLLABLES = ('ка', 'ло', 'ми', 'ну', 'ре', 'са', 'то', 'ве', 'ди', 'жа', 'зо', 'пи')
+MULTIPLE_TAGGED_TOKEN_PATTERN = re.compile(r'[^\s<]+<[^>]*>\([^)]*\)')
+BASE_DATE = datetime.datetime(2022, 1, 1)
+
+
+def load_reference_tokens() -> list:
+    """
+    Returns aligned (word form, single-tagged, multiple-tagged) triples of the reference texts
+    """
+    def read(name):
+        with open(TEST_FILES_FOLDER / name, encoding='utf-8') as file:
+            return file.read()
+
+    words = read('reference_score_four_test.txt').split()
+    single_tagged = read('reference_test.txt').split()
+    multiple_tagged = MULTIPLE_TAGGED_TOKEN_PATTERN.findall(read('reference_score_eight_test.txt'))
+    return list(zip(words, single_tagged, multiple_tagged))
+
+
+def build_vocabulary(size: int, rng: random.Random) -> list:
+    """
+    Extends reference tokens with synthetic words keeping their tags:
+    a syllable suffix is appended to both a word form and its lemma
+    """
+    reference = load_reference_tokens()
+    vocabulary = list(reference)
+    seen = {word for word, _, _ in reference}
+    while len(vocabulary) < size:
+        word, single, multiple = rng.choice(reference)
+        suffix = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+        if word + suffix in seen:
+            continue
+        seen.add(word + suffix)
+        lemma, tags = single.split('<', 1)
+        vocabulary.append((word + suffix, f'{lemma}{suffix}<{tags}',
+                           f'{lemma}{suffix}<{multiple.split("<", 1)[1]}'))
+    return vocabulary
+
+
+def generate_article(vocabulary: list, cum_weights: list, tokens: int, rng: random.Random) -> tuple:
+    """
+    Returns raw text and a list of vocabulary entries of its tokens
+    """
+    entries = rng.choices(vocabulary, cum_weights=cum_weights, k=tokens)
+    sentences = []
+    start = 0
+    while start < tokens:
+        length = rng.randint(5, 15)
+        words = [word for word, _, _ in entries[start:start + length]]
+        words[0] = words[0].capitalize()
+        for index in range(len(words) - 1):
+            if rng.random() < 0.08:
+                words[index] += ','
+        sentences.append(' '.join(words) + rng.choice('...!?'))
+        start += length
+    return ' '.join(sentences), entries
+
+
+def generate_corpus(path: Path, articles: int = 100, tokens_per_article: int = 300,
+                    vocabulary_size: int = 5000, tagged: bool = True, seed: int = 0,
+                    overwrite: bool = False) -> None:
+    """
+    Creates articles 1..N: N_raw.txt and N_meta.json and, if tagged is set,
+    N_cleaned.txt, N_single_tagged.txt, N_multiple_tagged.txt and pos_frequencies in meta files.
+    Word frequencies follow Zipf's law, so rare words form a long tail as in real news.
+    An existing directory is removed only if overwrite is set
+    """
+    path = Path(path)
+    if path.exists():
+        if not overwrite:
+            raise FileExistsError(f'{path} already exists, pass overwrite to replace it')
+        shutil.rmtree(path)
+    path.mkdir(parents=True)
+
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(vocabulary_size, rng)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    with open(TEST_FILES_FOLDER / '0_meta.json', encoding='utf-8') as file:
+        meta_template = json.load(file)
+    meta_template.pop('pos_frequencies')
+
+    for article_id in range(1, articles + 1):
+        text, entries = generate_article(vocabulary, cum_weights, tokens_per_article, rng)
+        with open(path / f'{article_id}_raw.txt', 'w', encoding='utf-8') as file:
+            file.write(text)
+
+        meta = dict(meta_template,
+                    id=article_id,
+                    url=f'https://example.com/news/{article_id}',
+                    title=f'Статья {article_id}',
+                    date=(BASE_DATE + datetime.timedelta(hours=article_id)).strftime("%Y-%m-%d %H:%M:%S"),
+                    topics=[rng.choice(('политика', 'экономика', 'спорт', 'культура'))])
+
+        if tagged:
+            artifacts = {
+                'cleaned': ' '.join(word for word, _, _ in entries),
+                'single_tagged': ' '.join(single for _, single, _ in entries),
+                'multiple_tagged': ' '.join(multiple for _, _, multiple in entries)
+            }
+            for kind, artifact in artifacts.items():
+                with open(path / f'{article_id}_{kind}.txt', 'w', encoding='utf-8') as file:
+                    file.write(artifact)
+            meta['pos_frequencies'] = dict(Counter(re.match(r'[^<]+<([A-Z]+)', single).group(1)
+                                                   for _, single, _ in entries))
+
+        with open(path / f'{article_id}_meta.json', 'w', encoding='utf-8') as file:
+            json.dump(meta, file, sort_keys=False, indent=4, ensure_ascii=False, separators=(',', ': '))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generates a synthetic corpus')
+    parser.add_argument('--path', type=Path, required=True, help='directory to create the corpus in')
+    parser.add_argument('--articles', type=int, default=100)
+    parser.add_argument('--tokens', type=int, default=300, help='tokens per article')
+    parser.add_argument('--vocabulary', type=int, default=5000, help='number of distinct word forms')
+    parser.add_argument('--raw-only', action='store_true', help='do not generate processed artifacts')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--overwrite', action='store_true', help='replace the directory if it exists')
+    args = parser.parse_args()
+    generate_corpus(args.path, args.articles, args.tokens, args.vocabulary,
+                    not args.raw_only, args.seed, args.overwrite)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark of lemma index build time, size and query latency on a synthetic corpus
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus_generator import generate_corpus
+from benchmarks.suite import percentile
+from core_utils.corpus_statistics import SINGLE_TAGGED_TOKEN_PATTERN
+from core_utils.lemma_index import LemmaIndex
+
+
+def measure_queries(index: LemmaIndex, queries: list) -> list:
+    """
+    Returns latencies of queries, each query is a callable of the index
+    """
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        query(index)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def build_queries(corpus_path: Path, number: int, rng: random.Random) -> dict:
+    """
+    Samples lookup, boolean and phrase queries from the corpus texts
+    """
+    texts = sorted(corpus_path.glob('*_single_tagged.txt'))
+    lookups, booleans, phrases = [], [], []
+    for _ in range(number):
+        tokens = SINGLE_TAGGED_TOKEN_PATTERN.findall(rng.choice(texts).read_text(encoding='utf-8'))
+        start = rng.randrange(len(tokens) - 1)
+        (first, first_pos), (second, second_pos) = tokens[start], tokens[start + 1]
+        lookups.append(lambda index, lemma=first, pos=first_pos: index.lookup(lemma, pos))
+        booleans.append(lambda index, lemmas=(first, second): index.search(must=lemmas))
+        phrases.append(lambda index, lemmas=(first, second): index.search_phrase(list(lemmas)))
+    return {'lookup': lookups, 'boolean': booleans, 'phrase': phrases}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the lemma index')
+    parser.add_argument('--articles', type=int, default=100000)
+    parser.add_argument('--tokens', type=int, default=100, help='tokens per article')
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus_path = Path(directory) / 'articles'
+        generate_corpus(corpus_path, args.articles, args.tokens, seed=args.seed)
+
+        index = LemmaIndex()
+        start = time.perf_counter()
+        index.update(corpus_path)
+        print(f'build: {time.perf_counter() - start:.2f} sec for {args.articles} articles')
+
+        index_path = Path(directory) / 'lemma_index.bin'
+        index.save(index_path)
+        raw_size = sum(path.stat().st_size for path in corpus_path.glob('*_single_tagged.txt'))
+        print(f'size: {index_path.stat().st_size / 2 ** 20:.1f} MB, '
+              f'single-tagged texts: {raw_size / 2 ** 20:.1f} MB')
+
+        start = time.perf_counter()
+        index = LemmaIndex.load(index_path)
+        print(f'load: {time.perf_counter() - start:.2f} sec')
+
+        for name, queries in build_queries(corpus_path, args.queries, random.Random(args.seed)).items():
+            for state in ('cold', 'warm'):
+                latencies = measure_queries(index, queries)
+                print(f'{name:<8} {state}: p50 {percentile(latencies, 0.5) * 1000:8.3f} ms '
+                      f'p99 {percentile(latencies, 0.99) * 1000:8.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
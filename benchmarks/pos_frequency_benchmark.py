@@ -0,0 +1,64 @@
+"""
+Benchmark of POS frequencies counting: two-pass flow with per-token splitting,
+standalone regex scan and fused counting during processing
+"""
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from config.test_params import TEST_FILES_FOLDER
+from core_utils.pos_frequencies import PosFrequencyCounter, count_pos_frequencies
+
+ARTICLES = 500
+REPEATS = 200
+
+
+def count_with_splitting(single_tagged_text: str) -> dict:
+    """
+    Counts parts of speech splitting each token into lemma and tags
+    """
+    frequencies = Counter()
+    for token in single_tagged_text.split():
+        tags = token.split('<')[1]
+        pos = tags.replace('=', ',').replace('>', ',').split(',')[0]
+        frequencies[pos] += 1
+    return dict(frequencies)
+
+
+def main():
+    with open(TEST_FILES_FOLDER / 'reference_test.txt', encoding='utf-8') as file:
+        text = ' '.join([file.read().strip()] * REPEATS)
+    tokens_tags = [token.split('<', 1)[1][:-1] for token in text.split()]
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [Path(directory) / f'{i}_single_tagged.txt' for i in range(ARTICLES)]
+        for path in paths:
+            path.write_text(text, encoding='utf-8')
+
+        start = time.perf_counter()
+        results = [count_with_splitting(path.read_text(encoding='utf-8')) for path in paths]
+        two_pass = time.perf_counter() - start
+
+        start = time.perf_counter()
+        regex_results = [count_pos_frequencies(path.read_text(encoding='utf-8')) for path in paths]
+        standalone = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fused_results = []
+    for _ in range(ARTICLES):
+        counter = PosFrequencyCounter()
+        counter.update(tokens_tags)
+        fused_results.append(counter.get_frequencies())
+    fused = time.perf_counter() - start
+
+    assert results == regex_results == fused_results
+
+    print(f'{ARTICLES} articles, {len(tokens_tags)} tokens each')
+    print(f'two-pass, per-token splitting {two_pass:8.3f} sec')
+    print(f'standalone, regex scan        {standalone:8.3f} sec')
+    print(f'fused, tags kept in memory    {fused:8.3f} sec')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark of PyMorphy tagging: per-token parsing versus a single pass over distinct forms of a batch
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus_generator import generate_corpus
+from core_utils.morphology import PymorphyBackend, RegexTokenizerBackend, get_morph_analyzer
+
+
+def tag_per_token(morph, token_lists: list) -> int:
+    """
+    Parses every token separately, returns the number of analyzer calls
+    """
+    calls = 0
+    for tokens in token_lists:
+        for token in tokens:
+            token.pymorphy_tags = str(morph.parse(token.cleaned)[0].tag)
+            calls += 1
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares per-token and distinct-form PyMorphy tagging')
+    parser.add_argument('--articles', type=int, default=500)
+    parser.add_argument('--tokens', type=int, default=300, help='tokens per article')
+    parser.add_argument('--batch-size', type=int, default=100, help='articles per batch')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus_path = Path(directory) / 'articles'
+        generate_corpus(corpus_path, args.articles, args.tokens, tagged=False, seed=args.seed)
+        texts = [(corpus_path / f'{article_id}_raw.txt').read_text(encoding='utf-8')
+                 for article_id in range(1, args.articles + 1)]
+
+    batches = [RegexTokenizerBackend().analyze(texts[start:start + args.batch_size])
+               for start in range(0, len(texts), args.batch_size)]
+    total = sum(len(tokens) for token_lists in batches for tokens in token_lists)
+    distinct = sum(len({token.cleaned for tokens in token_lists for token in tokens})
+                   for token_lists in batches)
+    print(f'tokens: {total}, distinct forms per batch: {distinct}, ratio {distinct / total:.3f}')
+
+    morph = get_morph_analyzer()
+    backend = PymorphyBackend(morph)
+
+    start = time.perf_counter()
+    calls = sum(tag_per_token(morph, token_lists) for token_lists in batches)
+    per_token_seconds = time.perf_counter() - start
+    print(f'per token:      {calls:8} calls {per_token_seconds:8.2f} sec')
+
+    start = time.perf_counter()
+    for token_lists in batches:
+        backend.annotate(token_lists)
+    distinct_seconds = time.perf_counter() - start
+    print(f'distinct forms: {distinct:8} calls {distinct_seconds:8.2f} sec')
+    print(f'speedup: {per_token_seconds / distinct_seconds:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
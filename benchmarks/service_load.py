@@ -0,0 +1,104 @@
+"""
+Load test of the corpus query service on a synthetic corpus
+"""
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from http.client import HTTPConnection
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks.corpus_generator import generate_corpus
+from benchmarks.suite import percentile
+from core_utils.corpus_service import CorpusService, CorpusStore
+
+TOPICS = ('политика', 'экономика', 'спорт', 'культура')
+LEMMAS = ('мама', 'рама', 'красивый', 'мыть', 'второй', 'река')
+
+
+def build_requests(articles: int, number: int, rng: random.Random) -> list:
+    """
+    Returns a mix of metadata, frequency and search request paths
+    """
+    requests = []
+    for _ in range(number):
+        kind = rng.random()
+        if kind < 0.4:
+            requests.append(f'/articles?id={rng.randint(1, articles)}')
+        elif kind < 0.7:
+            requests.append('/frequencies?' + urlencode({'topic': rng.choice(TOPICS)}))
+        else:
+            requests.append('/search?' + urlencode({'lemma': rng.choice(LEMMAS), 'topic': rng.choice(TOPICS),
+                                                    'limit': 20}))
+    return requests
+
+
+def run_load(url: str, requests: list, clients: int) -> tuple:
+    """
+    Sends requests from several client threads over keep-alive connections,
+    returns latencies and wall time
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def client(paths):
+        local = []
+        connection = HTTPConnection(urlsplit(url).netloc)
+        for path in paths:
+            start = time.perf_counter()
+            connection.request('GET', path)
+            json.loads(connection.getresponse().read())
+            local.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(requests[index::clients],)) for index in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test of the corpus query service')
+    parser.add_argument('--articles', type=int, default=1000)
+    parser.add_argument('--tokens', type=int, default=300, help='tokens per article')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--distinct', type=int, default=500, help='number of distinct requests')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--cache-size', type=int, default=1024)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus_path = Path(directory) / 'articles'
+        generate_corpus(corpus_path, args.articles, args.tokens, seed=args.seed)
+        start = time.perf_counter()
+        store = CorpusStore(corpus_path)
+        print(f'load: {time.perf_counter() - start:.2f} sec for {args.articles} articles')
+
+        rng = random.Random(args.seed)
+        distinct = build_requests(args.articles, args.distinct, rng)
+        requests = [rng.choice(distinct) for _ in range(args.requests)]
+
+        service = CorpusService(store, ('127.0.0.1', 0), cache_size=args.cache_size, reload_interval=0)
+        service.start()
+        try:
+            for state in ('cold', 'warm'):
+                latencies, seconds = run_load(service.url, requests, args.clients)
+                print(f'{state}: {len(latencies) / seconds:8.1f} requests/sec '
+                      f'p50 {percentile(latencies, 0.5) * 1000:6.2f} ms '
+                      f'p99 {percentile(latencies, 0.99) * 1000:6.2f} ms')
+            print(f'cache: {service.cache.get_stats()}')
+        finally:
+            service.stop()
+
+
+if __name__ == '__main__':
+    main()
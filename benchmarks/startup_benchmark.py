@@ -0,0 +1,79 @@
+"""
+Cold start benchmark of crawler and pipeline scenarios based on python -X importtime
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from constants import PROJECT_ROOT
+
+SCENARIOS = {
+    'validate_dataset': 'from pipeline import validate_dataset; '
+                        'import core_utils.dataset_validator',
+    'crawler': 'import scrapper; import core_utils.article; import core_utils.pdf_utils',
+    'full_pipeline': 'import pipeline; import pos_frequency_pipeline; '
+                     'import core_utils.visualizer; import core_utils.morphology; '
+                     'import core_utils.pos_matrix'
+}
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    Returns cumulative import time in microseconds of each top-level import
+    """
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            imports[name.strip()] = int(cumulative)
+    return imports
+
+
+def measure(code: str, repeat: int) -> dict:
+    """
+    Runs code in fresh interpreters and returns the best wall time and import times
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best['seconds']:
+            imports = parse_importtime(result.stderr)
+            best = {
+                'seconds': seconds,
+                'import_seconds': sum(imports.values()) / 1e6,
+                'slowest_imports': sorted(imports.items(), key=lambda item: item[1], reverse=True)[:5]
+            }
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures cold start of crawler and pipeline')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs of each scenario')
+    parser.add_argument('--output', type=Path, help='json file to save results to')
+    args = parser.parse_args()
+
+    results = {'interpreter': measure('pass', args.repeat)}
+    for name, code in SCENARIOS.items():
+        results[name] = measure(code, args.repeat)
+
+    for name, result in results.items():
+        print(f"{name:<18} {result['seconds'] * 1000:8.1f} ms total, "
+              f"{result['import_seconds'] * 1000:8.1f} ms imports")
+        for module, microseconds in result['slowest_imports']:
+            print(f'{"":<18} {microseconds / 1000:8.1f} ms {module}')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""
+Reproducible benchmark suite of crawler and pipeline stages on a synthetic corpus
+"""
+import argparse
+import datetime
+import json
+import math
+import multiprocessing
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from benchmarks.corpus_generator import generate_corpus
+from constants import REPORTS_PATH
+
+DEFAULT_RESULTS_PATH = REPORTS_PATH / 'benchmark_results.json'
+
+
+class StageSkipped(Exception):
+    """
+    Stage can not be measured, e.g. it is not implemented yet
+    """
+
+
+def _redirect_assets(corpus_path: Path) -> None:
+    """
+    Makes dataset and cache locations point to the synthetic corpus
+    before student modules are imported
+    """
+    import constants  # pylint: disable=import-outside-toplevel
+    import core_utils.article  # pylint: disable=import-outside-toplevel
+    import core_utils.dataset_scanner  # pylint: disable=import-outside-toplevel
+    constants.ASSETS_PATH = corpus_path
+    core_utils.article.ASSETS_PATH = corpus_path
+    core_utils.dataset_scanner.DATASET_MANIFESTS_PATH = corpus_path.parent / 'cache' / 'dataset_manifests'
+
+
+def _timed(items, func) -> list:
+    """
+    Calls func for each item and returns per-item latencies
+    """
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_crawler_save(corpus_path: Path) -> tuple:
+    """
+    Measures how fast the crawler saves parsed articles with Article.save_raw
+    """
+    from core_utils.article import Article  # pylint: disable=import-outside-toplevel
+    ids = sorted(int(path.name.split('_')[0]) for path in corpus_path.glob('*_raw.txt'))
+    articles = []
+    for article_id in ids:
+        article = Article(url=None, article_id=article_id)
+        article.text = article.get_raw_text()
+        articles.append(article)
+    return len(articles), _timed(articles, lambda article: article.save_raw())
+
+
+def bench_scan_dataset(corpus_path: Path) -> tuple:
+    """
+    Measures a cold dataset scan
+    """
+    from core_utils.dataset_scanner import scan_dataset  # pylint: disable=import-outside-toplevel
+    start = time.perf_counter()
+    scan = scan_dataset(corpus_path, use_manifest=False)
+    return len(scan.files), [time.perf_counter() - start]
+
+
+def bench_validate_dataset(corpus_path: Path) -> tuple:
+    """
+    Measures cold and repeated validation of the dataset
+    """
+    from core_utils.dataset_validator import DatasetValidator  # pylint: disable=import-outside-toplevel
+    validator = DatasetValidator(corpus_path, manifests_path=corpus_path.parent / 'cache' / 'validation')
+    latencies = _timed(range(2), lambda _: validator.validate())
+    return len(list(corpus_path.glob('*_raw.txt'))), latencies
+
+
+def bench_corpus_manager(corpus_path: Path) -> tuple:
+    """
+    Measures CorpusManager instantiation
+    """
+    from pipeline import CorpusManager  # pylint: disable=import-outside-toplevel
+    start = time.perf_counter()
+    articles = CorpusManager(path_to_raw_txt_data=corpus_path).get_articles()
+    latency = time.perf_counter() - start
+    if not articles:
+        raise StageSkipped('CorpusManager is not implemented')
+    return len(articles), [latency]
+
+
+def bench_cleaning(corpus_path: Path) -> tuple:
+    """
+    Measures text cleaning of each raw text
+    """
+    from core_utils.cleaning import clean_text  # pylint: disable=import-outside-toplevel
+    texts = [path.read_text(encoding='utf-8') for path in sorted(corpus_path.glob('*_raw.txt'))]
+    return len(texts), _timed(texts, clean_text)
+
+
+def bench_text_processing(corpus_path: Path) -> tuple:
+    """
+    Measures TextProcessingPipeline on raw texts
+    """
+    from pipeline import CorpusManager, TextProcessingPipeline  # pylint: disable=import-outside-toplevel
+    for path in corpus_path.glob('*_cleaned.txt'):
+        path.unlink()
+    corpus_manager = CorpusManager(path_to_raw_txt_data=corpus_path)
+    start = time.perf_counter()
+    TextProcessingPipeline(corpus_manager).run()
+    latency = time.perf_counter() - start
+    processed = len(list(corpus_path.glob('*_cleaned.txt')))
+    if not processed:
+        raise StageSkipped('TextProcessingPipeline is not implemented')
+    return processed, [latency]
+
+
+def bench_pos_frequency(corpus_path: Path) -> tuple:
+    """
+    Measures POSFrequencyPipeline on tagged texts
+    """
+    from pipeline import CorpusManager  # pylint: disable=import-outside-toplevel
+    from pos_frequency_pipeline import POSFrequencyPipeline  # pylint: disable=import-outside-toplevel
+    corpus_manager = CorpusManager(path_to_raw_txt_data=corpus_path)
+    start = time.perf_counter()
+    POSFrequencyPipeline(corpus_manager).run()
+    latency = time.perf_counter() - start
+    images = len(list(corpus_path.glob('*_image.png')))
+    if not images:
+        raise StageSkipped('POSFrequencyPipeline is not implemented')
+    return images, [latency]
+
+
+STAGES = {
+    'crawler_save': bench_crawler_save,
+    'scan_dataset': bench_scan_dataset,
+    'validate_dataset': bench_validate_dataset,
+    'corpus_manager': bench_corpus_manager,
+    'cleaning': bench_cleaning,
+    'text_processing': bench_text_processing,
+    'pos_frequency': bench_pos_frequency
+}
+
+
+def get_peak_rss_kb():
+    """
+    Returns peak resident set size of the current process in kilobytes
+    """
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def percentile(values: list, fraction: float) -> float:
+    """
+    Returns a percentile of values with the nearest-rank method
+    """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def run_stage(name: str, corpus_path: str) -> dict:
+    """
+    Runs a single stage, is executed in a fresh process to measure its own peak memory
+    """
+    corpus_path = Path(corpus_path)
+    _redirect_assets(corpus_path)
+    start = time.perf_counter()
+    try:
+        items, latencies = STAGES[name](corpus_path)
+    except (StageSkipped, ImportError) as error:
+        return {'status': 'skipped', 'reason': str(error)}
+    seconds = time.perf_counter() - start
+    busy_seconds = sum(latencies)
+    return {
+        'status': 'ok',
+        'seconds': seconds,
+        'items': items,
+        'throughput': items / busy_seconds if busy_seconds else None,
+        'p50': percentile(latencies, 0.5),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'peak_rss_kb': get_peak_rss_kb()
+    }
+
+
+def run_suite(stages: list, articles: int, tokens: int, seed: int = 0) -> dict:
+    """
+    Generates a corpus and measures each stage on its own copy of it
+    """
+    results = {
+        'created': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'articles': articles,
+        'tokens_per_article': tokens,
+        'seed': seed,
+        'stages': {}
+    }
+    context = multiprocessing.get_context('spawn')
+    for name in stages:
+        with tempfile.TemporaryDirectory() as directory:
+            corpus_path = Path(directory) / 'articles'
+            generate_corpus(corpus_path, articles, tokens, seed=seed)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                results['stages'][name] = executor.submit(run_stage, name, str(corpus_path)).result()
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns descriptions of stages that are slower than the baseline by more than threshold
+    """
+    regressions = []
+    for name, current in results['stages'].items():
+        previous = baseline.get('stages', {}).get(name)
+        if current['status'] != 'ok' or not previous or previous['status'] != 'ok':
+            continue
+        if current['throughput'] < previous['throughput'] * (1 - threshold):
+            regressions.append(f"{name}: throughput {current['throughput']:.1f} items/sec, "
+                               f"baseline {previous['throughput']:.1f}")
+        if current['p95'] > previous['p95'] * (1 + threshold):
+            regressions.append(f"{name}: p95 latency {current['p95'] * 1000:.2f} ms, "
+                               f"baseline {previous['p95'] * 1000:.2f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks crawler and pipeline stages')
+    parser.add_argument('--articles', type=int, default=200)
+    parser.add_argument('--tokens', type=int, default=300, help='tokens per article')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--output', type=Path, default=DEFAULT_RESULTS_PATH)
+    parser.add_argument('--baseline', type=Path, help='results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed relative slowdown before failing, 0.2 means 20%%')
+    args = parser.parse_args()
+
+    results = run_suite(args.stages, args.articles, args.tokens, args.seed)
+    for name, result in results['stages'].items():
+        if result['status'] != 'ok':
+            print(f"{name:<18} skipped: {result['reason']}")
+            continue
+        print(f"{name:<18} {result['throughput']:10.1f} items/sec "
+              f"p50 {result['p50'] * 1000:8.2f} ms p95 {result['p95'] * 1000:8.2f} ms "
+              f"p99 {result['p99'] * 1000:8.2f} ms peak RSS {result['peak_rss_kb']} KB")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
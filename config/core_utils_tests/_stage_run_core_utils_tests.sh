@@ -0,0 +1,10 @@
+set -ex
+
+echo -e '\n'
+echo 'Running core utilities checks...'
+
+source venv/bin/activate
+
+python -m pytest -m "core_utils_checks" config/core_utils_tests
+
+echo "Core utilities are checked. Done"
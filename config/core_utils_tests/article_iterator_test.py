@@ -0,0 +1,68 @@
+"""
+Tests for lazy iteration over dataset articles
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from core_utils.article_iterator import iter_articles
+
+
+class ArticleIteratorTest(unittest.TestCase):
+    """
+    Tests for iter_articles
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / 'articles'
+        self.manifests_path = Path(self._directory.name) / 'manifests'
+        self.path.mkdir()
+        for article_id, author in ((1, 'A'), (2, 'B'), (3, 'A')):
+            (self.path / f'{article_id}_raw.txt').write_text(f'Текст {article_id}', encoding='utf-8')
+            meta = {'id': article_id, 'url': f'https://example.com/{article_id}', 'title': '',
+                    'date': f'2022-01-0{article_id} 10:00:00', 'author': author, 'topics': []}
+            (self.path / f'{article_id}_meta.json').write_text(json.dumps(meta), encoding='utf-8')
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    @pytest.mark.core_utils_checks
+    def test_meta_is_read_from_path(self):
+        """
+        Ensure that filters use meta information of the given directory
+        """
+        articles = list(iter_articles(self.path, manifests_path=self.manifests_path, author='A'))
+        self.assertEqual([1, 3], [article.article_id for article in articles])
+
+    @pytest.mark.core_utils_checks
+    def test_text_is_read_from_path(self):
+        """
+        Ensure that raw texts and artifacts belong to the given directory
+        """
+        article = next(iter_articles(self.path, manifests_path=self.manifests_path, start_id=2))
+        self.assertEqual(self.path / '2_raw.txt', article.get_raw_text_path())
+        self.assertEqual('Текст 2', article.get_raw_text())
+        self.assertEqual(self.path / '2_cleaned.txt', article.get_file_path('cleaned'))
+
+    @pytest.mark.core_utils_checks
+    def test_manifest_is_saved_to_given_path(self):
+        """
+        Ensure that the dataset manifest is saved to manifests_path only
+        """
+        articles = list(iter_articles(self.path, manifests_path=self.manifests_path, end_id=2))
+        self.assertEqual([1, 2], [article.article_id for article in articles])
+        self.assertEqual(1, len(list(self.manifests_path.iterdir())))
+        list(iter_articles(self.path, use_manifest=False))
+        self.assertEqual(1, len(list(self.manifests_path.iterdir())))
+
+    @pytest.mark.core_utils_checks
+    def test_unknown_filter_is_rejected(self):
+        """
+        Ensure that a misspelled filter is not silently ignored
+        """
+        with self.assertRaises(TypeError):
+            next(iter_articles(self.path, use_manifest=False, authors='A'))
@@ -0,0 +1,86 @@
+"""
+Tests for the background artifact writer
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from core_utils.artifact_writer import ArtifactWriter
+from core_utils.dataset_scanner import scan_dataset
+
+
+class FakeArticle:
+    """
+    Article stub that stores artifacts in a given directory
+    """
+
+    def __init__(self, path: Path, article_id: int):
+        self.path = path
+        self.article_id = article_id
+
+    def get_file_path(self, kind: str) -> Path:
+        """
+        Returns a path of an artifact
+        """
+        return self.path / f'{self.article_id}_{kind}.txt'
+
+
+class ArtifactWriterTest(unittest.TestCase):
+    """
+    Tests for ArtifactWriter
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name)
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    @pytest.mark.core_utils_checks
+    def test_artifacts_are_written(self):
+        """
+        Ensure that all scheduled artifacts are written on close
+        """
+        with ArtifactWriter(max_pending=2) as writer:
+            for article_id in range(1, 6):
+                writer.save_as(FakeArticle(self.path, article_id), f'text {article_id}', 'cleaned')
+        for article_id in range(1, 6):
+            self.assertEqual(f'text {article_id}',
+                             (self.path / f'{article_id}_cleaned.txt').read_text(encoding='utf-8'))
+        self.assertEqual(5, writer.stats['artifacts'])
+
+    @pytest.mark.core_utils_checks
+    def test_non_os_error_is_raised(self):
+        """
+        Ensure that an error other than OSError is re-raised and not lost
+        """
+        writer = ArtifactWriter(max_pending=1)
+        writer.start()
+        writer.save_as(FakeArticle(self.path, 1), None, 'cleaned')
+        with self.assertRaises(TypeError):
+            for article_id in range(2, 10):
+                writer.save_as(FakeArticle(self.path, article_id), 'text', 'cleaned')
+            writer.close()
+
+    @pytest.mark.core_utils_checks
+    def test_temporary_files_are_removed(self):
+        """
+        Ensure that a failed write leaves no temporary files in the dataset
+        """
+        with self.assertRaises(TypeError):
+            with ArtifactWriter() as writer:
+                writer.save_as(FakeArticle(self.path, 1), None, 'cleaned')
+        self.assertEqual([], list(self.path.iterdir()))
+        self.assertEqual([], scan_dataset(self.path, use_manifest=False).unknown)
+
+    @pytest.mark.core_utils_checks
+    def test_save_without_running_thread(self):
+        """
+        Ensure that saving does not block when the writer thread is not running
+        """
+        writer = ArtifactWriter(max_pending=1)
+        with self.assertRaises(RuntimeError):
+            writer.save_as(FakeArticle(self.path, 1), 'text', 'cleaned')
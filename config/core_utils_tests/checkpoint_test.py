@@ -0,0 +1,105 @@
+"""
+Tests for the processing journal
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from core_utils.checkpoint import ProcessingJournal, run_with_checkpoints
+
+
+class Crash(BaseException):
+    """
+    Stands for a crash of the whole run, e.g. the process being killed
+    """
+
+
+class ProcessingJournalTest(unittest.TestCase):
+    """
+    Tests for ProcessingJournal and run_with_checkpoints
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name)
+        self.journal_path = self.path / 'journal.jsonl'
+        self.articles = {article_id: f'article {article_id}' for article_id in range(1, 5)}
+        self.processed = []
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def run_articles(self, crash_on: int = None, fail_on: int = None, **kwargs) -> dict:
+        """
+        Processes test articles crashing the run or raising an error on given ones
+        """
+        def process_article(article):
+            if article == f'article {crash_on}':
+                raise Crash()
+            if article == f'article {fail_on}':
+                raise ValueError(article)
+            self.processed.append(article)
+
+        journal = ProcessingJournal(self.journal_path, **kwargs)
+        return run_with_checkpoints(self.articles, process_article, journal, self.path / 'report.json')
+
+    @pytest.mark.core_utils_checks
+    def test_resume_skips_finished_articles(self):
+        """
+        Ensure that a resumed run continues from the article the previous run crashed on
+        """
+        with self.assertRaises(Crash):
+            self.run_articles(crash_on=3)
+        self.processed.clear()
+        report = self.run_articles(resume=True)
+        self.assertEqual(['article 3', 'article 4'], self.processed)
+        self.assertEqual(2, report['skipped'])
+        self.processed.clear()
+        self.run_articles()
+        self.assertEqual(4, len(self.processed))
+
+    @pytest.mark.core_utils_checks
+    def test_failed_article_is_quarantined(self):
+        """
+        Ensure that an error does not stop the run and the article is retried only on request
+        """
+        report = self.run_articles(fail_on=2)
+        self.assertEqual(3, report['processed'])
+        self.assertIn('ValueError', report['quarantined']['2']['error'])
+        self.assertEqual({'2'}, set(self.run_articles(resume=True)['quarantined']))
+        report = self.run_articles(resume=True, retry_quarantined=True)
+        self.assertEqual(1, report['processed'])
+        self.assertEqual({}, report['quarantined'])
+
+    @pytest.mark.core_utils_checks
+    def test_repeated_crashes_quarantine_article(self):
+        """
+        Ensure that an article the run crashed on max_crashes times is quarantined
+        """
+        with self.assertRaises(Crash):
+            self.run_articles(crash_on=2)
+        with self.assertRaises(Crash):
+            self.run_articles(crash_on=2, resume=True)
+        self.processed.clear()
+        report = self.run_articles(crash_on=2, resume=True)
+        self.assertEqual(['article 3', 'article 4'], self.processed)
+        self.assertIn('crashed 2 times', report['quarantined']['2']['error'])
+
+    @pytest.mark.core_utils_checks
+    def test_partial_record_is_cut_off(self):
+        """
+        Ensure that a record half-written by a crash does not break the records appended on resume
+        """
+        with self.assertRaises(Crash):
+            self.run_articles(crash_on=2)
+        with open(self.journal_path, 'a', encoding='utf-8') as file:
+            file.write('{"event": "done", "id"')
+        self.run_articles(resume=True)
+        with open(self.journal_path, encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(['started', 'done', 'started'], [record['event'] for record in records[:3]])
+        with ProcessingJournal(self.journal_path, resume=True) as journal:
+            self.assertEqual({1, 2, 3, 4}, journal.done)
@@ -0,0 +1,46 @@
+"""
+Tests for text cleaning
+"""
+import unittest
+
+import pytest
+
+from core_utils.cleaning import clean_text, clean_token
+
+
+class CleaningTest(unittest.TestCase):
+    """
+    Tests for clean_text and clean_token
+    """
+
+    @pytest.mark.core_utils_checks
+    def test_punctuation_and_whitespace_are_removed(self):
+        """
+        Punctuation, symbols and any whitespace should become single spaces
+        """
+        text = '«Кто-то» пришёл —\tв 10:30!\n\nЦена: 5 $… Ok? Да'
+        self.assertEqual('кто то пришёл в 10 30 цена 5 ok да', clean_text(text))
+
+    @pytest.mark.core_utils_checks
+    def test_empty_and_punctuation_only_texts(self):
+        """
+        Texts without words should be cleaned to an empty string
+        """
+        self.assertEqual('', clean_text(''))
+        self.assertEqual('', clean_text(' ,.!? «» — \n'))
+
+    @pytest.mark.core_utils_checks
+    def test_characters_outside_table_are_kept(self):
+        """
+        Characters beyond the Basic Multilingual Plane should pass through unchanged
+        """
+        self.assertEqual('мама \U0001d400', clean_text('Мама \U0001d400'))
+
+    @pytest.mark.core_utils_checks
+    def test_token_is_cleaned_as_text(self):
+        """
+        clean_token should give the same result as clean_text for any token
+        """
+        for word in ('«Кто-то»,', '10:30', 'т.е.', '...', 'Мама', 'ёлка!'):
+            self.assertEqual(clean_text(word), clean_token(word), word)
+        self.assertEqual('кто то', clean_token('«Кто-то»,'))
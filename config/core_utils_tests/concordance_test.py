@@ -0,0 +1,98 @@
+"""
+Tests for keyword in context search
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from core_utils.concordance import Concordance
+from core_utils.lemma_index import LemmaIndex
+from core_utils.token_corpus import TokenCorpus, TokenCorpusWriter
+
+NOUN = 'S,жен,од=им,ед'
+VERB = 'V,несов,пе=прош,ед,изъяв,жен'
+ALIGNED = (['мама', 'мыла', 'раму'], ['мама', 'мыть', 'рама'], [NOUN, VERB, NOUN])
+# the number is a cleaned word form but Mystem does not tag it
+NOT_ALIGNED = (['в', '2022', 'году', 'мама', 'мыла', 'раму'],
+               ['в', 'год', 'мама', 'мыть', 'рама'], ['PR=', NOUN, NOUN, VERB, NOUN])
+
+
+class ConcordanceTest(unittest.TestCase):
+    """
+    Tests for Concordance
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / 'token_corpus.bin'
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def open_corpus(self, articles: dict) -> TokenCorpus:
+        """
+        Writes and opens a token corpus of {article_id: (forms, lemmas, tags)}
+        """
+        with TokenCorpusWriter() as writer:
+            for article_id, tokens in articles.items():
+                writer.add_tokens(article_id, *tokens)
+            writer.save(self.path)
+        corpus = TokenCorpus(self.path)
+        self.addCleanup(corpus.close)
+        return corpus
+
+    @pytest.mark.core_utils_checks
+    def test_form_query_shows_forms(self):
+        """
+        Ensure that word form queries show the keyword and context from word forms
+        """
+        concordance = Concordance(self.open_corpus({1: ALIGNED, 2: NOT_ALIGNED}), window=2)
+        lines = [line.to_json() for line in concordance.iter_lines('мама', query_type='form')]
+        self.assertEqual([(1, 0, 'мама'), (2, 3, 'мама')],
+                         [(line['article_id'], line['position'], line['keyword']) for line in lines])
+        self.assertEqual(['2022', 'году'], lines[1]['left'])
+        self.assertEqual(['мыла', 'раму'], lines[1]['right'])
+
+    @pytest.mark.core_utils_checks
+    def test_form_query_with_pos(self):
+        """
+        Ensure that a part of speech filter works for aligned articles
+        and is rejected explicitly otherwise
+        """
+        concordance = Concordance(self.open_corpus({1: ALIGNED}))
+        self.assertEqual([0], [line.position for line in concordance.iter_lines('мама', 'S', query_type='form')])
+        self.assertEqual([], list(concordance.iter_lines('мама', 'V', query_type='form')))
+
+        concordance = Concordance(self.open_corpus({1: ALIGNED, 2: NOT_ALIGNED}))
+        with self.assertRaises(ValueError):
+            concordance.get_page('мама', 'S', query_type='form')
+
+    @pytest.mark.core_utils_checks
+    def test_lemma_query(self):
+        """
+        Ensure that lemma queries find the same lines with and without an index
+        """
+        corpus = self.open_corpus({1: ALIGNED, 2: NOT_ALIGNED})
+        index = LemmaIndex()
+        for article_id, (_, lemmas, tags) in {1: ALIGNED, 2: NOT_ALIGNED}.items():
+            index.add_article(article_id, ' '.join(f'{lemma}<{tag}>' for lemma, tag in zip(lemmas, tags)))
+        for concordance in (Concordance(corpus, window=1), Concordance(corpus, index, window=1)):
+            lines = [line.to_json() for line in concordance.iter_lines('мыть', pos='V')]
+            self.assertEqual([(1, 1, 'мыла'), (2, 3, 'мыть')],
+                             [(line['article_id'], line['position'], line['keyword']) for line in lines])
+            self.assertEqual(['мама'], lines[1]['left'])
+
+    @pytest.mark.core_utils_checks
+    def test_pages(self):
+        """
+        Ensure that pages with cursors cover all lines once
+        """
+        concordance = Concordance(self.open_corpus({article_id: ALIGNED for article_id in range(1, 6)}), page_size=2)
+        lines, cursor = concordance.get_page('рама')
+        positions = [(line.article_id, line.position) for line in lines]
+        while cursor:
+            lines, cursor = concordance.get_page('рама', after=cursor)
+            positions.extend((line.article_id, line.position) for line in lines)
+        self.assertEqual([(article_id, 2) for article_id in range(1, 6)], positions)
@@ -0,0 +1,125 @@
+"""
+Tests for the corpus query service
+"""
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import urlopen
+
+import pytest
+
+from core_utils.corpus_service import CorpusService, CorpusStore
+
+
+class CorpusStoreTest(unittest.TestCase):
+    """
+    Tests for CorpusStore and CorpusService
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name)
+        self.save(1, 'мама<S,жен,од=им,ед> мыть<V,несов,пе=прош,ед,изъяв,жен>', title='Мама')
+        self.store = CorpusStore(self.path)
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def save(self, article_id: int, single_tagged: str, title: str = None, meta: str = None) -> None:
+        """
+        Saves raw, meta and single-tagged files of an article
+        """
+        (self.path / f'{article_id}_raw.txt').write_text('Текст', encoding='utf-8')
+        if meta is None:
+            meta = json.dumps({'id': article_id, 'title': title, 'date': None, 'author': None,
+                               'topics': [], 'pos_frequencies': {'S': 1}}, ensure_ascii=False)
+        (self.path / f'{article_id}_meta.json').write_text(meta, encoding='utf-8')
+        (self.path / f'{article_id}_single_tagged.txt').write_text(single_tagged, encoding='utf-8')
+
+    @pytest.mark.core_utils_checks
+    def test_partially_written_meta_is_retried(self):
+        """
+        Ensure that an unreadable meta file does not break reloading and is loaded later
+        """
+        self.save(2, 'рама<S,жен,неод=вин,ед>', meta='{"id": 2,')
+        self.store.reload()
+        self.assertEqual([1], sorted(self.store.articles))
+        self.save(2, 'рама<S,жен,неод=вин,ед>', title='Рама')
+        self.assertEqual(1, self.store.reload())
+        self.assertEqual([2], self.store.search(lemma='рама')['ids'])
+
+    @pytest.mark.core_utils_checks
+    def test_changed_article_is_reindexed(self):
+        """
+        Ensure that a re-processed article replaces its old postings
+        """
+        self.save(1, 'папа<S,муж,од=им,ед>', title='Папа')
+        self.store.reload()
+        self.assertEqual([], self.store.search(lemma='мама')['ids'])
+        self.assertEqual([1], self.store.search(lemma='папа')['ids'])
+
+    @pytest.mark.core_utils_checks
+    def test_null_title(self):
+        """
+        Ensure that articles without titles are searched by title
+        """
+        self.save(2, 'рама<S,жен,неод=вин,ед>')
+        self.store.reload()
+        self.assertEqual([1], self.store.search(title='мам')['ids'])
+
+    def get_status_code(self, url: str) -> int:
+        """
+        Returns the status code of a failed request
+        """
+        with self.assertRaises(HTTPError) as context:
+            urlopen(url)
+        context.exception.close()
+        return context.exception.code
+
+    @pytest.mark.core_utils_checks
+    def test_service_answers(self):
+        """
+        Ensure that the service answers queries and reports errors with status codes
+        """
+        service = CorpusService(self.store, ('127.0.0.1', 0), reload_interval=0)
+        service.routes['/broken'] = lambda params: 1 / 0
+        service.start()
+        try:
+            with urlopen(f'{service.url}/search?lemma={quote("мыть")}') as response:
+                self.assertEqual([1], json.loads(response.read())['ids'])
+            self.assertEqual(400, self.get_status_code(f'{service.url}/articles?id=abc'))
+            self.assertEqual(400, self.get_status_code(f'{service.url}/search?colour=red'))
+            self.assertEqual(404, self.get_status_code(f'{service.url}/unknown'))
+            self.assertEqual(500, self.get_status_code(f'{service.url}/broken'))
+        finally:
+            service.stop()
+
+    @pytest.mark.core_utils_checks
+    def test_failed_reload_does_not_stop_reloading(self):
+        """
+        Ensure that the reload thread survives an error
+        """
+        calls = []
+
+        def reload():
+            calls.append(1)
+            if len(calls) == 1:
+                raise OSError('dataset is not available')
+            return 0
+
+        with mock.patch.object(self.store, 'reload', side_effect=reload):
+            service = CorpusService(self.store, ('127.0.0.1', 0), reload_interval=0.01)
+            service.start()
+            try:
+                deadline = time.monotonic() + 5
+                while len(calls) < 3 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            finally:
+                service.stop()
+        self.assertGreaterEqual(len(calls), 3)
+        self.assertIsNone(service.last_reload_error)
@@ -0,0 +1,98 @@
+"""
+Tests for corpus-wide frequency tables
+"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from core_utils.corpus_statistics import CorpusStatistics
+
+TEXTS = {
+    1: 'мама<S,жен,од=им,ед> мыть<V,несов,пе=прош,ед,изъяв,жен> рама<S,жен,неод=вин,ед>',
+    2: 'мама<S,жен,од=им,ед> красивый<A=им,ед,полн,жен>',
+    3: 'папа<S,муж,од=им,ед> мыть<V,несов,пе=прош,ед,изъяв,муж> рама<S,жен,неод=вин,ед>'
+}
+
+
+class CorpusStatisticsTest(unittest.TestCase):
+    """
+    Tests for CorpusStatistics
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / 'articles'
+        self.path.mkdir()
+        self.statistics_path = Path(self._directory.name) / 'statistics.bin'
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def _write(self, article_id: int, text: str) -> None:
+        (self.path / f'{article_id}_single_tagged.txt').write_text(text, encoding='utf-8')
+
+    @pytest.mark.core_utils_checks
+    def test_update_counts_new_articles_only(self):
+        """
+        Ensure that update folds in only the articles that were not counted yet
+        """
+        statistics = CorpusStatistics()
+        self._write(1, TEXTS[1])
+        self.assertEqual(1, statistics.update(self.path, workers=1))
+        self._write(2, TEXTS[2])
+        self.assertEqual(1, statistics.update(self.path, workers=1))
+        self.assertEqual(0, statistics.update(self.path, workers=1))
+        self.assertEqual({1, 2}, statistics.processed_ids)
+        self.assertEqual([('S', 3), ('V', 1), ('A', 1)], statistics.top_k('pos'))
+        self.assertEqual([('мама', 2)], statistics.top_k('lemma', k=1))
+
+    @pytest.mark.core_utils_checks
+    def test_top_k_filters_by_pos(self):
+        """
+        Ensure that lemma_pos entries are filtered by part of speech
+        """
+        for article_id, text in TEXTS.items():
+            self._write(article_id, text)
+        statistics = CorpusStatistics()
+        statistics.update(self.path, workers=1)
+        self.assertEqual([(('мыть', 'V'), 2)], statistics.top_k('lemma_pos', pos='V'))
+        self.assertEqual([(('красивый', 'A'), 1)], statistics.top_k('lemma_pos', k=1, pos='A'))
+        with self.assertRaises(ValueError):
+            statistics.top_k('words')
+
+    @pytest.mark.core_utils_checks
+    def test_save_and_load_round_trip(self):
+        """
+        Ensure that tables and counted articles survive saving
+        """
+        for article_id, text in TEXTS.items():
+            self._write(article_id, text)
+        statistics = CorpusStatistics()
+        statistics.update(self.path, workers=1)
+        statistics.save(self.statistics_path)
+        loaded = CorpusStatistics.load(self.statistics_path)
+        self.assertEqual(statistics.tables, loaded.tables)
+        self.assertEqual(statistics.counted, loaded.counted)
+        self.assertEqual(0, loaded.update(self.path, workers=1))
+        self.assertEqual(CorpusStatistics().tables, CorpusStatistics.load(self.path / 'missing.bin').tables)
+
+    @pytest.mark.core_utils_checks
+    def test_rewritten_and_removed_articles_are_recounted(self):
+        """
+        Ensure that rewritten or removed texts do not leave stale counts
+        """
+        for article_id, text in TEXTS.items():
+            self._write(article_id, text)
+        statistics = CorpusStatistics()
+        statistics.update(self.path, workers=1)
+        self._write(1, TEXTS[2])
+        self.assertEqual(3, statistics.update(self.path, workers=1))
+        self.assertEqual(2, statistics.tables['lemma']['красивый'])
+        self.assertEqual(1, statistics.tables['lemma']['мыть'])
+        os.remove(self.path / '3_single_tagged.txt')
+        statistics.update(self.path, workers=1)
+        self.assertEqual({1, 2}, statistics.processed_ids)
+        self.assertNotIn('папа', statistics.tables['lemma'])
@@ -0,0 +1,87 @@
+"""
+Tests for the runner of pipeline stages
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from core_utils.dag_runner import DAGRunner, Stage, StageStatus, count_pos
+from core_utils.dataset_scanner import FileKind
+
+
+def fail(context) -> None:
+    """
+    Stage that must not run
+    """
+    raise RuntimeError(f'{context.path} must not be crawled again')
+
+
+class DAGRunnerTest(unittest.TestCase):
+    """
+    Tests for DAGRunner
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / 'articles'
+        self.path.mkdir()
+        self.stamps_path = Path(self._directory.name) / 'stamps'
+        (self.path / '1_raw.txt').write_text('Мама мыла раму', encoding='utf-8')
+        (self.path / '1_meta.json').write_text(json.dumps({'id': 1}), encoding='utf-8')
+        (self.path / '1_single_tagged.txt').write_text(
+            'мама<S,жен,од=им,ед> мыть<V,несов,пе=прош,ед,изъяв,жен> рама<S,жен,неод=вин,ед>',
+            encoding='utf-8')
+        self.stages = [
+            Stage('crawl', fail, outputs=(FileKind.raw,)),
+            Stage('pos_frequency', count_pos, inputs=(FileKind.single_tagged,))
+        ]
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def run_stages(self) -> dict:
+        """
+        Runs test stages over the test dataset
+        """
+        return DAGRunner(self.stages, self.path, stamps_path=self.stamps_path).run()
+
+    @pytest.mark.core_utils_checks
+    def test_stages_use_dataset_path(self):
+        """
+        Ensure that stages read and write the dataset given to the runner
+        """
+        report = self.run_stages()
+        self.assertEqual(StageStatus.done, report['pos_frequency']['status'], report)
+        with open(self.path / '1_meta.json', encoding='utf-8') as file:
+            self.assertEqual({'S': 2, 'V': 1}, json.load(file)['pos_frequencies'])
+
+    @pytest.mark.core_utils_checks
+    def test_up_to_date_stages_are_skipped(self):
+        """
+        Ensure that existing raw texts are not crawled again and unchanged inputs are not processed
+        """
+        self.assertEqual(StageStatus.skipped, self.run_stages()['crawl']['status'])
+        self.assertEqual(StageStatus.skipped, self.run_stages()['pos_frequency']['status'])
+
+    @pytest.mark.core_utils_checks
+    def test_results_are_passed_and_failures_block(self):
+        """
+        Ensure that results of stages reach the next ones and stages after a failed one are blocked
+        """
+        self.stages = [
+            Stage('pos_frequency', count_pos, inputs=(FileKind.single_tagged,)),
+            Stage('total', lambda context: sum(context.results['pos_frequency'][1].values()),
+                  inputs=('pos_frequency',)),
+            Stage('crawl', fail, outputs=(str(self.path / 'missing.txt'),)),
+            Stage('after_crawl', count_pos, after=('crawl',))
+        ]
+        runner = DAGRunner(self.stages, self.path, stamps_path=self.stamps_path)
+        report = runner.run()
+        self.assertEqual(StageStatus.done, report['total']['status'], report)
+        self.assertEqual(StageStatus.failed, report['crawl']['status'])
+        self.assertEqual(StageStatus.blocked, report['after_crawl']['status'])
+        with self.assertRaises(TypeError):
+            Stage('index', count_pos, before=('crawl',))
@@ -0,0 +1,103 @@
+"""
+Tests for the dataset validator
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from core_utils.dataset_validator import DatasetValidator, ProblemKind
+
+
+class DatasetValidatorTest(unittest.TestCase):
+    """
+    Tests for DatasetValidator
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / 'articles'
+        self.path.mkdir()
+        self.manifests_path = Path(self._directory.name) / 'manifests'
+        for article_id in (1, 2):
+            (self.path / f'{article_id}_raw.txt').write_text('Мама мыла раму.', encoding='utf-8')
+            (self.path / f'{article_id}_meta.json').write_text(json.dumps({'id': article_id}),
+                                                               encoding='utf-8')
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def validate(self) -> dict:
+        """
+        Validates the test dataset
+        """
+        return DatasetValidator(self.path, manifests_path=self.manifests_path).validate().to_json()
+
+    def get_problem_kinds(self, report: dict) -> list:
+        """
+        Returns kinds of problems of a report
+        """
+        return [problem['kind'] for problem in report['problems']]
+
+    @pytest.mark.core_utils_checks
+    def test_valid_dataset(self):
+        """
+        Ensure that a valid dataset has no problems and is not read again
+        """
+        self.assertTrue(self.validate()['valid'])
+        report = self.validate()
+        self.assertTrue(report['valid'])
+        self.assertEqual(4, report['reused_files'])
+
+    @pytest.mark.core_utils_checks
+    def test_empty_raw_text(self):
+        """
+        Ensure that an empty raw text is reported
+        """
+        (self.path / '2_raw.txt').write_text('', encoding='utf-8')
+        self.assertEqual([ProblemKind.empty_text], self.get_problem_kinds(self.validate()))
+
+    @pytest.mark.core_utils_checks
+    def test_files_modified_in_place(self):
+        """
+        Ensure that files rewritten in place after a successful validation are checked again
+        """
+        self.assertTrue(self.validate()['valid'])
+        with open(self.path / '1_raw.txt', 'w', encoding='utf-8'):
+            pass
+        with open(self.path / '1_meta.json', 'w', encoding='utf-8') as file:
+            file.write('{broken')
+        self.assertEqual({ProblemKind.empty_text, ProblemKind.corrupt_meta},
+                         set(self.get_problem_kinds(self.validate())))
+
+    @pytest.mark.core_utils_checks
+    def test_id_gap_and_missing_meta(self):
+        """
+        Ensure that continuity of ids and parity of raw and meta files are checked
+        """
+        (self.path / '4_raw.txt').write_text('Текст', encoding='utf-8')
+        self.assertEqual({ProblemKind.id_gap, ProblemKind.missing_meta},
+                         set(self.get_problem_kinds(self.validate())))
+
+    @pytest.mark.core_utils_checks
+    def test_unknown_files(self):
+        """
+        Ensure that only unknown article files make the dataset invalid
+        """
+        (self.path / 'notes.txt').write_text('notes', encoding='utf-8')
+        report = self.validate()
+        self.assertTrue(report['valid'])
+        self.assertEqual([ProblemKind.unknown_file], [warning['kind'] for warning in report['warnings']])
+        (self.path / '1_summary.txt').write_text('summary', encoding='utf-8')
+        self.assertEqual([ProblemKind.unknown_file], self.get_problem_kinds(self.validate()))
+
+    @pytest.mark.core_utils_checks
+    def test_empty_directory(self):
+        """
+        Ensure that a directory without articles is reported as empty
+        """
+        for path in self.path.iterdir():
+            path.unlink()
+        self.assertEqual([ProblemKind.empty_directory], self.get_problem_kinds(self.validate()))
@@ -0,0 +1,49 @@
+"""
+Tests for the dataset watcher
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from core_utils.dataset_watcher import DatasetWatcher
+
+
+class DatasetWatcherTest(unittest.TestCase):
+    """
+    Tests for DatasetWatcher in the polling mode
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name)
+        self.watcher = DatasetWatcher(self.path, poll_interval=0.01, settle_time=0.0, use_inotify=False)
+
+    def tearDown(self) -> None:
+        self.watcher.close()
+        self._directory.cleanup()
+
+    def save(self, article_id: int, text: str = 'Текст', meta: str = None) -> None:
+        """
+        Saves an article like the crawler does
+        """
+        (self.path / f'{article_id}_raw.txt').write_text(text, encoding='utf-8')
+        (self.path / f'{article_id}_meta.json').write_text(meta or json.dumps({'id': article_id}),
+                                                           encoding='utf-8')
+
+    @pytest.mark.core_utils_checks
+    def test_complete_articles_are_yielded_once(self):
+        """
+        Ensure that complete articles are yielded once and incomplete ones are not
+        """
+        self.save(1)
+        self.save(2, text='')
+        self.save(3, meta='{"id": 3,')
+        (self.path / '4_raw.txt').write_text('Текст', encoding='utf-8')
+        self.assertEqual([1], list(self.watcher.watch(idle_timeout=0.1)))
+
+        self.save(3)
+        self.save(4)
+        self.assertEqual([3, 4], list(self.watcher.watch(idle_timeout=0.1)))
@@ -0,0 +1,113 @@
+"""
+Lightweight stand-ins for Mystem and PyMorphy with the same output format
+"""
+import re
+import threading
+
+TOKEN_PATTERN = re.compile(r'\w+(?:-\w+)*|\W+')
+CYRILLIC_WORD_PATTERN = re.compile(r'^[а-яё]+(?:-[а-яё]+)*$', re.IGNORECASE)
+SENTENCE_END_PATTERN = re.compile(r'[.!?…]')
+HANG_MARKER = 'зависание'
+
+
+class FakeMystem:
+    """
+    Imitates pymystem3.Mystem.analyze: each line of input is a separate round trip,
+    Cyrillic words are lemmatized by lowercasing and tagged as nouns,
+    Latin words have an empty analysis, numbers have none
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def analyze(self, text: str) -> list:
+        """
+        Returns analysis in the format of Mystem.analyze
+        """
+        result = []
+        for line in text.splitlines():
+            self.calls += 1
+            position = 0
+            for token in TOKEN_PATTERN.findall(line):
+                if CYRILLIC_WORD_PATTERN.match(token):
+                    result.append({'text': token,
+                                   'analysis': [{'lex': token.lower(), 'gr': self._get_tags(position)}]})
+                    position += 1
+                elif token[0].isalpha():
+                    result.append({'text': token, 'analysis': []})
+                    position += 1
+                else:
+                    result.append({'text': token})
+                    if SENTENCE_END_PATTERN.search(token):
+                        position = 0
+            result.append({'text': '\n'})
+        return result
+
+    @staticmethod
+    def _get_tags(position: int) -> str:
+        """
+        Returns tags of a word at the given position in its sentence
+        """
+        return 'S,жен,од=им,ед'
+
+
+class FakeContextMystem(FakeMystem):
+    """
+    Imitates context-sensitive disambiguation: tags depend on the position
+    of a word in its sentence, sentences end with punctuation or line breaks
+    """
+
+    @staticmethod
+    def _get_tags(position: int) -> str:
+        return f'S,жен,од=им,ед,{position}'
+
+
+class FakeProcessMystem(FakeMystem):
+    """
+    Imitates a Mystem process that hangs on texts with HANG_MARKER until it is closed
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.closed = threading.Event()
+
+    def analyze(self, text: str) -> list:
+        """
+        Returns analysis in the format of Mystem.analyze or hangs
+        """
+        if HANG_MARKER in text:
+            self.closed.wait()
+            raise RuntimeError('Mystem process was stopped')
+        return super().analyze(text)
+
+    def close(self) -> None:
+        """
+        Stops the process
+        """
+        self.closed.set()
+
+
+class FakeParse:
+    """
+    Imitates the first result of pymorphy2 MorphAnalyzer.parse
+    """
+
+    def __init__(self, word: str):
+        self.normal_form = word
+        self.tag = 'NOUN,anim,femn sing,nomn'
+
+
+class FakeMorph:
+    """
+    Imitates pymorphy2.MorphAnalyzer counting parse calls
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def parse(self, word: str) -> list:
+        """
+        Returns a list with a single parse of a word
+        """
+        self.calls += 1
+        return [FakeParse(word)]
@@ -0,0 +1,74 @@
+"""
+Tests for the lemma index
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from core_utils.lemma_index import LemmaIndex, PostingList, decode_varints, encode_varints
+
+ARTICLES = {
+    1: 'мама<S,жен,од=им,ед> мыть<V,несов,пе=прош,ед,изъяв,жен> '
+       'рама<S,жен,неод=вин,ед>',
+    2: 'папа<S,муж,од=им,ед> мыть<V,несов,пе=прош,ед,изъяв,муж> '
+       'мама<S,жен,од=вин,ед>',
+    3: 'мыть<V,несов,пе=инф> рама<S,жен,неод=вин,ед>'
+}
+
+
+class LemmaIndexTest(unittest.TestCase):
+    """
+    Tests for LemmaIndex
+    """
+
+    def setUp(self) -> None:
+        self.index = LemmaIndex()
+        for article_id, text in ARTICLES.items():
+            self.index.add_article(article_id, text)
+
+    @pytest.mark.core_utils_checks
+    def test_varints_round_trip(self):
+        """
+        Ensure that varints decode to the encoded values
+        """
+        values = [0, 1, 127, 128, 300, 2 ** 40]
+        self.assertEqual(values, decode_varints(encode_varints(values)))
+
+    @pytest.mark.core_utils_checks
+    def test_queries(self):
+        """
+        Ensure that lookups, boolean and phrase queries find the right articles
+        """
+        self.assertEqual([1, 2], self.index.lookup('мама'))
+        self.assertEqual([1, 2, 3], self.index.lookup('мыть', 'V'))
+        self.assertEqual([], self.index.lookup('мама', 'V'))
+        self.assertEqual([1], self.index.search(must=['мама', 'рама']))
+        self.assertEqual([3], self.index.search(must=['рама'], must_not=['мама']))
+        self.assertEqual({1: [0]}, self.index.search_phrase(['мама', 'мыть']))
+        self.assertEqual({1: [1], 3: [0]}, self.index.search_phrase(['мыть', 'рама']))
+
+    @pytest.mark.core_utils_checks
+    def test_save_load_round_trip(self):
+        """
+        Ensure that a saved and loaded index answers the same
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'lemma_index.bin'
+            self.index.save(path)
+            loaded = LemmaIndex.load(path)
+        self.assertEqual(self.index.indexed_ids, loaded.indexed_ids)
+        for lemma in ('мама', 'мыть', 'рама', 'папа'):
+            self.assertEqual(self.index.get_positions(lemma), loaded.get_positions(lemma))
+        self.assertEqual([(2, [2])], list(loaded.iter_positions('мама', start_id=2)))
+
+    @pytest.mark.core_utils_checks
+    def test_truncated_postings(self):
+        """
+        Ensure that a truncated documents stream raises a descriptive error
+        """
+        posting_list = PostingList.from_dict({1: [0, 5], 4: [2]})
+        truncated = PostingList(posting_list.documents[:-1], posting_list.positions, posting_list.last_id)
+        with self.assertRaises(ValueError):
+            list(truncated.iter_decode())
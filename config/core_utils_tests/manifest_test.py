@@ -0,0 +1,94 @@
+"""
+Tests for the processing manifest
+"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from core_utils import manifest as manifest_module
+from core_utils.article_iterator import DatasetArticle
+from core_utils.manifest import ALL_ARTIFACTS, ProcessingManifest
+
+
+class ProcessingManifestTest(unittest.TestCase):
+    """
+    Tests for ProcessingManifest
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name)
+        self.manifest_path = self.path / 'manifest.json'
+        self.article = DatasetArticle(self.path, None, 1)
+        self.article.get_raw_text_path().write_text('Мама мыла раму', encoding='utf-8')
+        for kind in ALL_ARTIFACTS:
+            self.article.get_file_path(kind).write_text('мама мыла раму', encoding='utf-8')
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def _process(self, **kwargs) -> ProcessingManifest:
+        manifest = ProcessingManifest(path=self.manifest_path, **kwargs)
+        manifest.register(self.article)
+        manifest.save()
+        return ProcessingManifest(path=self.manifest_path, **kwargs)
+
+    @pytest.mark.core_utils_checks
+    def test_processed_article_is_skipped(self):
+        """
+        An article registered in the previous run should be up to date
+        """
+        self.assertTrue(self._process().is_up_to_date(self.article))
+
+    @pytest.mark.core_utils_checks
+    def test_missing_artifact_is_not_skipped(self):
+        """
+        An article should be processed again if any of its artifacts is missing
+        """
+        manifest = self._process()
+        os.remove(self.article.get_file_path(ALL_ARTIFACTS[-1]))
+        self.assertFalse(manifest.is_up_to_date(self.article))
+        self.assertTrue(manifest.is_up_to_date(self.article, ALL_ARTIFACTS[:1]))
+
+    @pytest.mark.core_utils_checks
+    def test_force_processes_everything(self):
+        """
+        With force, every article should be processed again
+        """
+        self._process()
+        self.assertFalse(ProcessingManifest(path=self.manifest_path, force=True).is_up_to_date(self.article))
+
+    @pytest.mark.core_utils_checks
+    def test_fingerprint_change_invalidates_entries(self):
+        """
+        Changed settings should invalidate all the entries of the previous run
+        """
+        self._process(settings={'artifacts': 'all'})
+        manifest = ProcessingManifest(path=self.manifest_path, settings={'artifacts': 'cleaned'})
+        self.assertFalse(manifest.is_up_to_date(self.article))
+
+    @pytest.mark.core_utils_checks
+    def test_raw_text_change_is_detected(self):
+        """
+        An article should be processed again if its raw text changed
+        """
+        manifest = self._process()
+        self.article.get_raw_text_path().write_text('Папа читал газету', encoding='utf-8')
+        self.assertFalse(manifest.is_up_to_date(self.article))
+
+    @pytest.mark.core_utils_checks
+    def test_raw_text_is_hashed_once(self):
+        """
+        register should reuse the hash computed by is_up_to_date
+        """
+        manifest = self._process()
+        self.article.get_raw_text_path().write_text('Папа читал газету', encoding='utf-8')
+        with mock.patch.object(manifest_module, 'get_file_hash', wraps=manifest_module.get_file_hash) as hasher:
+            self.assertFalse(manifest.is_up_to_date(self.article))
+            manifest.register(self.article)
+        self.assertEqual(1, hasher.call_count)
+        self.assertTrue(manifest.is_up_to_date(self.article))
@@ -0,0 +1,142 @@
+"""
+Tests for analyzer backends
+"""
+import unittest
+
+import pytest
+
+from config.core_utils_tests.fake_analyzers import (HANG_MARKER, FakeContextMystem, FakeMorph, FakeMystem,
+                                                    FakeProcessMystem)
+from core_utils.article import ArtifactType
+from core_utils.morphology import (AnalyzerBackend, ArtifactAnalyzer, MystemBackend, MystemLimits,
+                                   MystemTimeoutError, RegexTokenizerBackend, SupervisedMystem, analyze_batch)
+
+TEXTS = ['Кто-то пришёл, 2022!\nМама мыла раму.', 'Мама, папа и Python 3.']
+
+
+class MorphologyTest(unittest.TestCase):
+    """
+    Tests for MystemBackend, PymorphyBackend and ArtifactAnalyzer
+    """
+
+    @pytest.mark.core_utils_checks
+    def test_batch_is_a_single_mystem_call(self):
+        """
+        A batch of multiline texts should be analyzed with one Mystem call
+        """
+        mystem = FakeMystem()
+        token_lists = MystemBackend(mystem).analyze(TEXTS)
+        self.assertEqual(1, mystem.calls)
+        self.assertEqual(len(TEXTS), len(token_lists))
+        self.assertEqual('мама', token_lists[1][0].lemma)
+
+    @pytest.mark.core_utils_checks
+    def test_batch_is_the_same_as_separate_texts(self):
+        """
+        Texts analyzed in one batch should have the same context as texts analyzed separately
+        """
+        texts = ['Заголовок без точки\nТекст статьи. Второе предложение', '',
+                 'Мама мыла раму', '«Кто-то» пришёл, 2022!']
+        mystem = FakeContextMystem()
+        self.assertEqual([FakeContextMystem().analyze(text) for text in texts], analyze_batch(mystem, texts))
+        self.assertEqual(1, mystem.calls)
+
+    @pytest.mark.core_utils_checks
+    def test_cleaned_texts_do_not_depend_on_backend(self):
+        """
+        Cleaned texts of the tagged run should be the same as those of the regex tokenizer
+        """
+        tagged = ArtifactAnalyzer(mystem=FakeMystem(), morph=FakeMorph())
+        cleaned_only = ArtifactAnalyzer(artifacts=(ArtifactType.cleaned,))
+        self.assertIsInstance(cleaned_only.tokenizer, RegexTokenizerBackend)
+        with self.assertRaises(TypeError):
+            AnalyzerBackend()  # pylint: disable=abstract-class-instantiated
+        for tagged_tokens, tokens in zip(tagged.analyze(TEXTS), cleaned_only.analyze(TEXTS)):
+            self.assertEqual(cleaned_only.render(tokens)[ArtifactType.cleaned],
+                             tagged.render(tagged_tokens)[ArtifactType.cleaned])
+        rendered = tagged.render(tagged.analyze(TEXTS[:1])[0])
+        self.assertEqual('кто то пришёл 2022 мама мыла раму', rendered[ArtifactType.cleaned])
+        self.assertNotIn('2022', rendered[ArtifactType.single_tagged])
+
+    @pytest.mark.core_utils_checks
+    def test_distinct_forms_are_parsed_once(self):
+        """
+        PyMorphy should parse each distinct word form of a batch once
+        """
+        morph = FakeMorph()
+        analyzer = ArtifactAnalyzer(mystem=FakeMystem(), morph=morph)
+        token_lists = analyzer.analyze(TEXTS)
+        forms = {token.word.lower() for tokens in token_lists for token in tokens if token.tagged}
+        self.assertEqual(len(forms), morph.calls)
+        self.assertIn('кто-то<S,жен,од=им,ед>(NOUN,anim,femn sing,nomn)',
+                      analyzer.render(token_lists[0])[ArtifactType.multiple_tagged])
+
+
+class SupervisedMystemTest(unittest.TestCase):
+    """
+    Tests for SupervisedMystem
+    """
+
+    def setUp(self) -> None:
+        self.instances = []
+
+    def factory(self) -> FakeProcessMystem:
+        """
+        Creates a fake Mystem process and remembers it
+        """
+        self.instances.append(FakeProcessMystem())
+        return self.instances[-1]
+
+    @pytest.mark.core_utils_checks
+    def test_hanging_call_times_out(self):
+        """
+        A hanging call should raise MystemTimeoutError, stop the process and let the next call succeed
+        """
+        with SupervisedMystem(self.factory, MystemLimits(timeout=0.2), standby=0) as mystem:
+            with self.assertRaises(MystemTimeoutError):
+                mystem.analyze(f'Мама {HANG_MARKER}')
+            self.assertEqual('мама', mystem.analyze('Мама')[0]['analysis'][0]['lex'])
+            stats = mystem.get_stats()
+        self.assertTrue(self.instances[0].closed.wait(5))
+        self.assertEqual((1, 1, 1), (stats['timeouts'], stats['restarts']['timeout'], stats['calls']))
+
+    @pytest.mark.core_utils_checks
+    def test_process_is_replaced_after_limits(self):
+        """
+        The process should be replaced after max_calls calls and after max_megabytes of text
+        """
+        with SupervisedMystem(self.factory, MystemLimits(max_calls=2), standby=0) as mystem:
+            for _ in range(5):
+                mystem.analyze('Мама')
+            self.assertEqual(2, mystem.get_stats()['restarts']['calls'])
+        limits = MystemLimits(max_megabytes=20 / 2 ** 20)
+        with SupervisedMystem(self.factory, limits, standby=0) as mystem:
+            mystem.analyze('Мама')
+            mystem.analyze('Мама мыла раму')
+            self.assertEqual(1, mystem.get_stats()['restarts']['megabytes'])
+        self.assertEqual(3 + 1, len(self.instances))
+
+    @pytest.mark.core_utils_checks
+    def test_standby_takes_over(self):
+        """
+        A standby process should replace the retired one without a cold start
+        """
+        with SupervisedMystem(self.factory, MystemLimits(timeout=5, max_calls=1), standby=1) as mystem:
+            for _ in range(3):
+                mystem.analyze('Мама')
+            stats = mystem.get_stats()
+        self.assertEqual((0, 3), (stats['cold_starts'], stats['restarts']['calls']))
+        self.assertTrue(all(instance.closed.wait(5) for instance in self.instances[:3]))
+
+    @pytest.mark.core_utils_checks
+    def test_hanging_warmup_times_out(self):
+        """
+        A process that hangs on warmup should be stopped and not block standby or cold starts
+        """
+        with SupervisedMystem(self.factory, MystemLimits(timeout=0.2), standby=1,
+                              warmup_text=HANG_MARKER) as mystem:
+            with self.assertRaises(MystemTimeoutError):
+                mystem.analyze('Мама')
+            self.assertEqual(1, mystem.get_stats()['cold_starts'])
+        self.assertEqual(2, len(self.instances))
+        self.assertTrue(all(instance.closed.wait(5) for instance in self.instances))
@@ -0,0 +1,84 @@
+"""
+Tests for the persistent Mystem cache
+"""
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from config.core_utils_tests.fake_analyzers import FakeContextMystem, FakeMystem
+from core_utils.mystem_cache import MystemCache
+
+TEXT = 'Мама мыла раму. Папа читал газету!\nМама мыла раму.'
+CONTEXT_TEXTS = ['Заголовок без точки\nТекст статьи идёт дальше. Второе предложение тут',
+                 'Мама мыла раму\nПапа читал газету',
+                 TEXT]
+
+
+def get_words(analysis: list) -> list:
+    """
+    Returns words of Mystem analysis with their analyses
+    """
+    return [(item['text'], item['analysis']) for item in analysis if 'analysis' in item]
+
+
+class MystemCacheTest(unittest.TestCase):
+    """
+    Tests for MystemCache
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / 'cache.sqlite'
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    @pytest.mark.core_utils_checks
+    def test_words_are_the_same_as_without_cache(self):
+        """
+        Ensure that cached analysis has the same words as Mystem analysis
+        """
+        with MystemCache(FakeMystem(), self.path, version='test') as cache:
+            analysis = cache.analyze(TEXT)
+        expected = [item['text'] for item in FakeMystem().analyze(TEXT) if 'analysis' in item]
+        self.assertEqual(expected, [item['text'] for item in analysis if 'analysis' in item])
+
+    @pytest.mark.core_utils_checks
+    def test_context_is_the_same_as_without_cache(self):
+        """
+        Ensure that batching sentences of several texts does not change their context
+        """
+        expected = [get_words(FakeContextMystem().analyze(text)) for text in CONTEXT_TEXTS]
+        with MystemCache(FakeContextMystem(), self.path, version='test') as cache:
+            for _ in range(2):
+                self.assertEqual(expected, [get_words(analysis) for analysis in cache.analyze_many(CONTEXT_TEXTS)])
+            self.assertEqual(FakeContextMystem().analyze(CONTEXT_TEXTS[1]), cache.analyze(CONTEXT_TEXTS[1]))
+
+    @pytest.mark.core_utils_checks
+    def test_missed_sentences_are_analyzed_in_one_call(self):
+        """
+        Ensure that all missed sentences of a text are sent to Mystem at once
+        """
+        mystem = FakeMystem()
+        with MystemCache(mystem, self.path, version='test') as cache:
+            cache.analyze(TEXT)
+            self.assertEqual(1, mystem.calls)
+            cache.analyze(TEXT)
+            self.assertEqual(1, mystem.calls)
+            self.assertEqual(2, cache.get_stats()['misses'])
+
+    @pytest.mark.core_utils_checks
+    def test_results_are_committed_before_close(self):
+        """
+        Ensure that analyzed sentences survive a run that never closed the cache
+        """
+        cache = MystemCache(FakeMystem(), self.path, version='test')
+        cache.analyze(TEXT)
+        connection = sqlite3.connect(str(self.path))
+        count = connection.execute('SELECT COUNT(*) FROM analysis').fetchone()[0]
+        connection.close()
+        cache.close()
+        self.assertEqual(2, count)
@@ -0,0 +1,114 @@
+"""
+Tests for n-gram counting
+"""
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from core_utils.ngrams import CountingOptions, NgramStatistics
+from core_utils.token_corpus import TokenCorpusWriter
+
+NOUN = 'S,жен,неод=им,ед'
+ADJECTIVE = 'A=им,ед,полн,жен'
+ARTICLES = {
+    1: [('железный', ADJECTIVE), ('дорога', NOUN), ('железный', ADJECTIVE), ('дорога', NOUN)],
+    2: [('дорога', NOUN), ('железный', ADJECTIVE), ('дорога', NOUN)],
+    3: [],
+    4: [('новый', ADJECTIVE), ('дорога', NOUN)],
+    5: []
+}
+
+
+def count_naively(articles: dict, size: int) -> Counter:
+    """
+    Counts lemma n-grams of each article
+    """
+    counts = Counter()
+    for tokens in articles.values():
+        lemmas = [lemma for lemma, _ in tokens]
+        counts.update(tuple(lemmas[index:index + size]) for index in range(len(lemmas) - size + 1))
+    return counts
+
+
+class NgramStatisticsTest(unittest.TestCase):
+    """
+    Tests for NgramStatistics
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name)
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def count(self, articles: dict, size: int, **kwargs) -> NgramStatistics:
+        """
+        Counts n-grams of articles {article_id: [(lemma, tag)]}
+        """
+        corpus_path = self.path / 'token_corpus.bin'
+        with TokenCorpusWriter() as writer:
+            for article_id, tokens in articles.items():
+                lemmas = [lemma for lemma, _ in tokens]
+                writer.add_tokens(article_id, lemmas, lemmas, [tag for _, tag in tokens])
+            writer.save(corpus_path)
+        options = CountingOptions(spill_path=self.path, **kwargs)
+        return NgramStatistics.from_token_corpus(size, corpus_path, options=options)
+
+    def get_counts(self, statistics: NgramStatistics) -> Counter:
+        """
+        Returns counts of all n-grams
+        """
+        return Counter({lemmas: count for lemmas, _, count, _
+                        in statistics.top_k(len(statistics.counts) + 1)})
+
+    @pytest.mark.core_utils_checks
+    def test_counts(self):
+        """
+        Ensure that n-grams are counted within articles, including chunks that end with empty articles
+        """
+        for chunk_size in (1, 2, 3, 10):
+            for size in (2, 3):
+                statistics = self.count(ARTICLES, size, chunk_size=chunk_size, partitions=3)
+                self.assertEqual(count_naively(ARTICLES, size), self.get_counts(statistics))
+
+    @pytest.mark.core_utils_checks
+    def test_pattern_and_measures(self):
+        """
+        Ensure that patterns select parts of speech and measures rank n-grams
+        """
+        statistics = self.count(ARTICLES, 2)
+        best = statistics.top_k(1, pattern='A+S')
+        self.assertEqual([(('железный', 'дорога'), ('A', 'S'), 3, 3.0)], best)
+        self.assertEqual(('S', 'A'), statistics.top_k(1, pattern='S+A')[0][1])
+        for measure in ('pmi', 'log_likelihood'):
+            self.assertEqual(3, len(statistics.top_k(10, measure=measure)))
+        with self.assertRaises(ValueError):
+            statistics.top_k(1, measure='unknown')
+
+    @pytest.mark.core_utils_checks
+    def test_large_vocabulary_trigrams(self):
+        """
+        Ensure that trigrams of a vocabulary that does not fit into 64 bits are counted
+        """
+        tokens = [(f'лемма{index % 140000}', NOUN) for index in range(150000)]
+        articles = {1: tokens}
+        statistics = self.count(articles, 3, partitions=4)
+        self.assertEqual(2, statistics.ngrams.shape[1])
+        expected = count_naively(articles, 3)
+        self.assertEqual(expected.most_common(1)[0][1], statistics.top_k(1)[0][2])
+        self.assertEqual(sum(expected.values()), int(statistics.counts.sum()))
+        self.assertEqual(len(expected), len(statistics.counts))
+
+    @pytest.mark.core_utils_checks
+    def test_save_load(self):
+        """
+        Ensure that saved statistics are loaded unchanged
+        """
+        statistics = self.count(ARTICLES, 2)
+        path = self.path / 'bigrams.npz'
+        statistics.save(path)
+        self.assertEqual(statistics.top_k(10), NgramStatistics.load(path).top_k(10))
@@ -0,0 +1,82 @@
+"""
+Tests for the matrix of part of speech frequencies
+"""
+import datetime
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core_utils.pos_matrix import POSFrequencyMatrix, TAG_INDEX
+
+FREQUENCIES = {
+    2: {'S': 3, 'V': 1},
+    1: {'S': 1, 'A': 1},
+    3: {}
+}
+DATES = {
+    1: datetime.datetime(2022, 1, 10, 12),
+    2: datetime.datetime(2022, 1, 31, 23),
+    3: datetime.datetime(2022, 2, 1)
+}
+
+
+class POSFrequencyMatrixTest(unittest.TestCase):
+    """
+    Tests for POSFrequencyMatrix
+    """
+
+    def setUp(self) -> None:
+        self.matrix = POSFrequencyMatrix.from_frequencies(FREQUENCIES, DATES)
+
+    @pytest.mark.core_utils_checks
+    def test_frequencies_round_trip(self):
+        """
+        Ensure that exported frequencies are the same as the original ones
+        """
+        self.assertEqual([1, 2, 3], self.matrix.article_ids.tolist())
+        self.assertEqual(FREQUENCIES, self.matrix.to_frequencies())
+        self.assertEqual(4, self.matrix.get_totals()['S'])
+
+    @pytest.mark.core_utils_checks
+    def test_normalize(self):
+        """
+        Ensure that rows sum up to one and empty articles are zeros
+        """
+        normalized = self.matrix.normalize()
+        np.testing.assert_allclose([1.0, 1.0, 0.0], normalized.sum(axis=1))
+        self.assertEqual(0.75, normalized[1, TAG_INDEX['S']])
+
+    @pytest.mark.core_utils_checks
+    def test_aggregate_by_period(self):
+        """
+        Ensure that articles of the same month are summed up
+        """
+        periods, aggregated = self.matrix.aggregate_by_period('M')
+        self.assertEqual(['2022-01', '2022-02'], [str(period) for period in periods])
+        self.assertEqual(4, aggregated[0, TAG_INDEX['S']])
+        self.assertEqual(0, aggregated[1].sum())
+        with self.assertRaises(ValueError):
+            POSFrequencyMatrix.from_frequencies(FREQUENCIES).aggregate_by_period()
+
+    @pytest.mark.core_utils_checks
+    def test_save_and_load(self):
+        """
+        Ensure that counts and dates survive saving
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'matrix.npz'
+            self.matrix.save(path)
+            loaded = POSFrequencyMatrix.load(path)
+        self.assertEqual(FREQUENCIES, loaded.to_frequencies())
+        np.testing.assert_array_equal(self.matrix.dates, loaded.dates)
+
+    @pytest.mark.core_utils_checks
+    def test_unknown_tag_is_reported(self):
+        """
+        Ensure that a tag outside MyStem parts of speech raises ValueError naming it
+        """
+        with self.assertRaisesRegex(ValueError, 'NOUN'):
+            POSFrequencyMatrix.from_frequencies({1: {'NOUN': 2}})
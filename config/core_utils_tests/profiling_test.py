@@ -0,0 +1,82 @@
+"""
+Tests for pipeline profiling hooks
+"""
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from core_utils.profiling import (DEFAULT_PROFILE_EVERY, PROFILE_ENV_VARIABLE, PROFILE_EVERY_ENV_VARIABLE,
+                                  PipelineProfiler)
+
+
+class PipelineProfilerTest(unittest.TestCase):
+    """
+    Tests for PipelineProfiler
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name)
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    @pytest.mark.core_utils_checks
+    def test_disabled_profiler_collects_nothing(self):
+        """
+        Disabled profiler should neither count nor save reports
+        """
+        with mock.patch.dict(os.environ, {PROFILE_ENV_VARIABLE: ''}):
+            profiler = PipelineProfiler('pipeline', reports_path=self.path)
+        with profiler.article(), profiler.stage('reading'):
+            profiler.count('tokens', 10)
+        self.assertEqual({}, profiler.get_report()['counters'])
+        self.assertIsNone(profiler.save_report())
+        self.assertEqual([], list(self.path.iterdir()))
+
+    @pytest.mark.core_utils_checks
+    def test_report_contains_stages_counters_and_sections(self):
+        """
+        Enabled profiler should save stage timers, counters and attached sections
+        """
+        profiler = PipelineProfiler('pipeline', enabled=True, reports_path=self.path)
+        profiler.attach('analyzer', lambda: {'calls': 3})
+        for _ in range(2):
+            with profiler.article(), profiler.stage('reading'):
+                profiler.count('tokens', 5)
+        with open(profiler.save_report(), encoding='utf-8') as file:
+            report = json.load(file)
+        self.assertEqual({'articles': 2, 'tokens': 10}, report['counters'])
+        self.assertEqual(2, report['stages']['reading']['calls'])
+        self.assertEqual({'calls': 3}, report['analyzer'])
+        self.assertNotIn('cprofile', report)
+
+    @pytest.mark.core_utils_checks
+    def test_cprofile_statistics_are_saved(self):
+        """
+        With cprofile, statistics of sampled articles should be saved next to the report
+        """
+        with mock.patch.dict(os.environ, {PROFILE_ENV_VARIABLE: 'cprofile', PROFILE_EVERY_ENV_VARIABLE: '2'}):
+            profiler = PipelineProfiler('pipeline', reports_path=self.path)
+        self.assertEqual(2, profiler.profile_every)
+        for _ in range(3):
+            with profiler.article():
+                sum(range(100))
+        report_path = profiler.save_report()
+        with open(report_path, encoding='utf-8') as file:
+            self.assertTrue(Path(json.load(file)['cprofile']).exists())
+
+    @pytest.mark.core_utils_checks
+    def test_invalid_sampling_period_falls_back_to_default(self):
+        """
+        Sampling periods that are not positive integers should not break the pipeline
+        """
+        for value in ('often', '0', '-5', '2.5'):
+            with mock.patch.dict(os.environ, {PROFILE_ENV_VARIABLE: 'cprofile', PROFILE_EVERY_ENV_VARIABLE: value}):
+                profiler = PipelineProfiler('pipeline', reports_path=self.path)
+            self.assertEqual(DEFAULT_PROFILE_EVERY, profiler.profile_every, value)
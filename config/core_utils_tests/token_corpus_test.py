@@ -0,0 +1,85 @@
+"""
+Tests for the binary token corpus
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+
+from core_utils.token_corpus import TokenCorpus, TokenCorpusWriter, convert_artifacts
+
+CLEANED = {
+    1: 'мама мыла раму',
+    2: '',
+    3: 'мама 2022'
+}
+SINGLE_TAGGED = {
+    1: 'мама<S,жен,од=им,ед> мыть<V,несов,пе=прош,ед,изъяв,жен> рама<S,жен,неод=вин,ед>',
+    2: '',
+    3: 'мама<S,жен,од=им,ед>'
+}
+
+
+class TokenCorpusTest(unittest.TestCase):
+    """
+    Tests for TokenCorpusWriter, TokenCorpus and convert_artifacts
+    """
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / 'articles'
+        self.path.mkdir()
+        self.corpus_path = Path(self._directory.name) / 'corpus.bin'
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def _check_corpus(self, corpus: TokenCorpus) -> None:
+        self.assertEqual([1, 2, 3], sorted(corpus.article_ids))
+        for article_id, text in CLEANED.items():
+            self.assertEqual(text.split(), corpus.decode('forms', corpus.get_forms(article_id)))
+        self.assertEqual(['мама', 'мыть', 'рама'], corpus.decode('lemmas', corpus.get_lemmas(1)))
+        self.assertEqual(['S,жен,од=им,ед'], corpus.decode('tags', corpus.get_tags(3)))
+        self.assertEqual(0, len(corpus.get_lemmas(2)))
+        self.assertEqual(corpus.get_id('lemmas', 'мама'), corpus.get_lemmas(3)[0])
+        self.assertIsNone(corpus.get_id('forms', 'папа'))
+
+    @pytest.mark.core_utils_checks
+    def test_writer_and_reader_round_trip(self):
+        """
+        Ensure that tokens of every article are read back as they were added
+        """
+        with TokenCorpusWriter() as writer:
+            for article_id, text in CLEANED.items():
+                writer.add_article(article_id, text, SINGLE_TAGGED[article_id])
+            writer.save(self.corpus_path)
+        with TokenCorpus(self.corpus_path) as corpus:
+            self._check_corpus(corpus)
+
+    @pytest.mark.core_utils_checks
+    def test_convert_artifacts(self):
+        """
+        Ensure that articles with both cleaned and single-tagged texts are converted
+        """
+        for article_id, text in CLEANED.items():
+            (self.path / f'{article_id}_cleaned.txt').write_text(text, encoding='utf-8')
+            (self.path / f'{article_id}_single_tagged.txt').write_text(SINGLE_TAGGED[article_id],
+                                                                       encoding='utf-8')
+        (self.path / '4_single_tagged.txt').write_text(SINGLE_TAGGED[3], encoding='utf-8')
+        self.assertEqual(3, convert_artifacts(self.path, self.corpus_path))
+        with TokenCorpus(self.corpus_path) as corpus:
+            self._check_corpus(corpus)
+            self.assertNotIn(4, corpus)
+
+    @pytest.mark.core_utils_checks
+    def test_invalid_input_is_rejected(self):
+        """
+        Ensure that mismatched lemmas and tags and foreign files raise ValueError
+        """
+        with TokenCorpusWriter() as writer:
+            with self.assertRaises(ValueError):
+                writer.add_tokens(1, ['мама'], ['мама'], [])
+        self.corpus_path.write_bytes(b'not a corpus' * 8)
+        with self.assertRaises(ValueError):
+            TokenCorpus(self.corpus_path)
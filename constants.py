@@ -6,4 +6,6 @@ from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent
 ASSETS_PATH = PROJECT_ROOT / 'tmp' / 'articles'
+CACHE_PATH = PROJECT_ROOT / 'tmp' / 'cache'
+REPORTS_PATH = PROJECT_ROOT / 'tmp' / 'reports'
 CRAWLER_CONFIG_PATH = PROJECT_ROOT / 'scrapper_config.json'
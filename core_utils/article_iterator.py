@@ -0,0 +1,70 @@
+"""
+Lazy iteration over dataset articles
+"""
+from pathlib import Path
+
+from core_utils.article import Article
+from core_utils.dataset_scanner import FileKind, scan_dataset
+
+
+class DatasetArticle(Article):
+    """
+    Article whose files are read from a given dataset directory instead of ASSETS_PATH
+    """
+
+    def __init__(self, path: Path, url, article_id):
+        self.path = Path(path)
+        super().__init__(url, article_id)
+
+    def get_raw_text_path(self):
+        return self.path / super().get_raw_text_path().name
+
+    def get_meta_file_path(self):
+        return self.path / super().get_meta_file_path().name
+
+    def get_file_path(self, kind: str) -> str:
+        return self.path / super().get_file_path(kind).name
+
+
+FILTERS = ('start_id', 'end_id', 'date_from', 'date_to', 'author', 'topic')
+
+
+def _matches(article: Article, filters: dict) -> bool:
+    """
+    Checks article meta information against date, author and topic filters
+    """
+    date_from, date_to = filters.get('date_from'), filters.get('date_to')
+    if (date_from or date_to) and article.date is None:
+        return False
+    if date_from and article.date < date_from:
+        return False
+    if date_to and article.date > date_to:
+        return False
+    if filters.get('author') and article.author != filters['author']:
+        return False
+    if filters.get('topic') and filters['topic'] not in (article.topics or []):
+        return False
+    return True
+
+
+def iter_articles(path: Path, use_manifest: bool = True, manifests_path: Path = None, **filters):
+    """
+    Yields Article instances for raw texts in the dataset in the order of ids,
+    their meta information and texts are read from path.
+    Articles are created one by one, so only the current one is kept in memory.
+    Supported filters: start_id and end_id bound ids inclusively and are checked
+    before reading meta files, date_from, date_to, author and topic require meta information.
+    use_manifest and manifests_path are passed to scan_dataset
+    """
+    unknown = set(filters) - set(FILTERS)
+    if unknown:
+        raise TypeError(f'Unknown filters {sorted(unknown)}')
+    start_id, end_id = filters.get('start_id'), filters.get('end_id')
+    for article_id in scan_dataset(path, use_manifest, manifests_path).get_ids(FileKind.raw):
+        if start_id is not None and article_id < start_id:
+            continue
+        if end_id is not None and article_id > end_id:
+            break
+        article = DatasetArticle(path, url=None, article_id=article_id)
+        if _matches(article, filters):
+            yield article
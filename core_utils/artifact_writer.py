@@ -0,0 +1,131 @@
+"""
+Background writer of pipeline artifacts
+"""
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+_STOP = object()
+
+
+def write_text_atomically(path: Path, text: str) -> None:
+    """
+    Writes text to a hidden temporary file next to the target and then replaces the target,
+    so that readers never see a partially written artifact.
+    The temporary file is removed if writing fails
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as file:
+            file.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class ArtifactWriter:
+    """
+    Saves artifacts in a background thread while the pipeline analyzes next articles.
+    The queue is bounded: when the disk is slower than analysis,
+    save_as blocks until the writer catches up
+    """
+
+    def __init__(self, max_pending: int = 64):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._drain, name='artifact-writer', daemon=True)
+        self._error = None
+        self._stopped = False
+        self._started_at = None
+        self.stats = {
+            'artifacts': 0,
+            'bytes': 0,
+            'write_seconds': 0.0,
+            'blocked_seconds': 0.0,
+            'total_seconds': 0.0
+        }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self) -> None:
+        """
+        Starts the writer thread
+        """
+        self._started_at = time.perf_counter()
+        self._thread.start()
+
+    def save_as(self, article, text: str, kind: str) -> None:
+        """
+        Schedules saving of an article artifact, same arguments as Article.save_as
+        """
+        self._raise_if_failed()
+        start = time.perf_counter()
+        item = (article.get_file_path(kind), text)
+        while True:
+            if not self._thread.is_alive():
+                raise RuntimeError('Artifact writer thread is not running')
+            try:
+                self._queue.put(item, timeout=1.0)
+                break
+            except queue.Full:
+                continue
+        self.stats['blocked_seconds'] += time.perf_counter() - start
+
+    def close(self) -> None:
+        """
+        Waits for all scheduled artifacts to be written and stops the writer thread
+        """
+        if self._thread.is_alive():
+            start = time.perf_counter()
+            self._queue.put(_STOP)
+            self._thread.join()
+            self.stats['blocked_seconds'] += time.perf_counter() - start
+            self.stats['total_seconds'] = time.perf_counter() - self._started_at
+        self._raise_if_failed()
+        if self._started_at is not None and not self._stopped:
+            raise RuntimeError('Artifact writer thread died, pending artifacts were not written')
+
+    def get_overlap_seconds(self) -> float:
+        """
+        Returns time spent writing to the disk that did not delay the pipeline
+        """
+        return max(self.stats['write_seconds'] - self.stats['blocked_seconds'], 0.0)
+
+    def _drain(self) -> None:
+        """
+        Writes artifacts from the queue until the stop marker is received
+        """
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._stopped = True
+                return
+            if self._error is not None:
+                continue
+            path, text = item
+            start = time.perf_counter()
+            try:
+                write_text_atomically(path, text)
+            except Exception as error:  # pylint: disable=broad-except
+                self._error = error
+                continue
+            self.stats['write_seconds'] += time.perf_counter() - start
+            self.stats['artifacts'] += 1
+            self.stats['bytes'] += len(text.encode('utf-8'))
+
+    def _raise_if_failed(self) -> None:
+        """
+        Re-raises an error that happened in the writer thread
+        """
+        if self._error is not None:
+            raise self._error
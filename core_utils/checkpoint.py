@@ -0,0 +1,182 @@
+"""
+Durable progress journal for resumable article processing
+"""
+import datetime
+import json
+import os
+import time
+import traceback
+from pathlib import Path
+
+from constants import CACHE_PATH, REPORTS_PATH
+from core_utils.manifest import dump_json_atomically
+
+PROCESSING_JOURNAL_PATH = CACHE_PATH / 'processing_journal.jsonl'
+PROCESSING_REPORT_PATH = REPORTS_PATH / 'processing_report.json'
+
+
+class JournalEvent:
+    """
+    Kinds of journal records
+    """
+    started = 'started'
+    done = 'done'
+    failed = 'failed'
+
+
+class ProcessingJournal:
+    """
+    Append-only JSON lines journal of article processing. Every record is flushed
+    and fsynced before processing continues, so the journal survives a crash of the run.
+    With resume the previous journal is read: finished articles are skipped, failed ones
+    stay quarantined unless retry_quarantined is set, and an article that was started
+    but never finished max_crashes times is quarantined as the likely cause of the crashes
+    """
+
+    def __init__(self, path: Path = PROCESSING_JOURNAL_PATH, resume: bool = False,
+                 retry_quarantined: bool = False, max_crashes: int = 2):
+        self.path = Path(path)
+        self.retry_quarantined = retry_quarantined
+        self.max_crashes = max_crashes
+        self.done = set()
+        self.quarantined = {}
+        self._crashes = {}
+        if resume and self.path.exists():
+            self._replay()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')  # pylint: disable=consider-using-with
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _replay(self) -> None:
+        """
+        Restores the state of the previous runs from the journal.
+        A partial last record left by a crash is cut off, so that new records start on a new line
+        """
+        started = set()
+        complete = 0
+        with open(self.path, 'rb') as file:
+            for line in file:
+                if not line.endswith(b'\n'):
+                    break
+                complete += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._apply(record, started)
+        if complete < self.path.stat().st_size:
+            os.truncate(self.path, complete)
+        for article_id in started:
+            self._crashes[article_id] = self._crashes.get(article_id, 0) + 1
+        for article_id, crashes in self._crashes.items():
+            if crashes >= self.max_crashes and article_id not in self.done:
+                self.quarantined.setdefault(article_id, {'error': f'run crashed {crashes} times on this article',
+                                                         'seconds': None})
+
+    def _apply(self, record: dict, started: set) -> None:
+        """
+        Applies a record of the previous runs; started holds articles that were started but not finished.
+        Starting an article again means the run crashed on it
+        """
+        article_id = record['id']
+        if record['event'] == JournalEvent.started:
+            if article_id in started:
+                self._crashes[article_id] = self._crashes.get(article_id, 0) + 1
+            started.add(article_id)
+            return
+        started.discard(article_id)
+        if record['event'] == JournalEvent.done:
+            self.done.add(article_id)
+            self.quarantined.pop(article_id, None)
+        else:
+            self.quarantined[article_id] = {key: record[key] for key in ('error', 'seconds')}
+
+    def _write(self, record: dict) -> None:
+        """
+        Appends a record and makes it durable
+        """
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def should_process(self, article_id: int) -> bool:
+        """
+        Checks whether an article still has to be processed
+        """
+        if article_id in self.done:
+            return False
+        return self.retry_quarantined or article_id not in self.quarantined
+
+    def start(self, article_id: int) -> None:
+        """
+        Records that processing of an article began
+        """
+        self._write({'event': JournalEvent.started, 'id': article_id})
+
+    def finish(self, article_id: int, seconds: float) -> None:
+        """
+        Records that an article was processed
+        """
+        self._write({'event': JournalEvent.done, 'id': article_id, 'seconds': seconds})
+        self.done.add(article_id)
+        self.quarantined.pop(article_id, None)
+
+    def fail(self, article_id: int, error: str, seconds: float, details: str = '') -> None:
+        """
+        Records that an article failed and quarantines it
+        """
+        self._write({'event': JournalEvent.failed, 'id': article_id, 'error': error,
+                     'seconds': seconds, 'traceback': details})
+        self.quarantined[article_id] = {'error': error, 'seconds': seconds}
+
+    def close(self) -> None:
+        """
+        Closes the journal file
+        """
+        self._file.close()
+
+
+def run_with_checkpoints(articles, process_article, journal: ProcessingJournal = None,
+                         report_path: Path = PROCESSING_REPORT_PATH) -> dict:
+    """
+    Calls process_article(article) for each article in order of ids, journaling progress.
+    An exception quarantines the article instead of stopping the run.
+    param: articles is a dictionary {id: Article} as returned by CorpusManager.get_articles()
+    param: journal is closed at the end of the run, a new journal by default.
+    Open it with resume to continue the previous run from the first unfinished article
+    Returns the report that is also saved to report_path
+    """
+    start = time.perf_counter()
+    report = {
+        'started': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'processed': 0,
+        'skipped': 0,
+        'seconds': None,
+        'quarantined': {}
+    }
+    journal = journal or ProcessingJournal()
+    with journal:
+        for article_id in sorted(articles):
+            if not journal.should_process(article_id):
+                report['skipped'] += 1
+                continue
+            journal.start(article_id)
+            article_start = time.perf_counter()
+            try:
+                process_article(articles[article_id])
+            except Exception as error:  # pylint: disable=broad-except
+                journal.fail(article_id, repr(error), time.perf_counter() - article_start,
+                             traceback.format_exc())
+                continue
+            journal.finish(article_id, time.perf_counter() - article_start)
+            report['processed'] += 1
+        report['quarantined'] = {str(article_id): entry for article_id, entry
+                                 in sorted(journal.quarantined.items())}
+    report['seconds'] = time.perf_counter() - start
+    dump_json_atomically(report, Path(report_path))
+    return report
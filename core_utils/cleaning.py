@@ -0,0 +1,45 @@
+"""
+Text cleaning implementation
+"""
+import unicodedata
+
+# Basic Multilingual Plane: all scripts, punctuation and symbols found in news texts
+MAX_CODE_POINT = 0x10000
+
+
+def _build_table() -> tuple:
+    """
+    Builds a translation table that lowercases letters and replaces
+    punctuation, symbols and whitespace with spaces.
+    Covers the Basic Multilingual Plane, including guillemets, typographic quotes
+    and dashes that are common in Russian news.
+    The table is a tuple indexed by code point: unlike a dict it never
+    raises on lookup, so str.translate stays on its fast path
+    """
+    table = []
+    for code in range(MAX_CODE_POINT):
+        char = chr(code)
+        category = unicodedata.category(char)
+        if category[0] in 'PSZ' or char.isspace():
+            table.append(' ')
+        else:
+            table.append(char.lower())
+    return tuple(table)
+
+
+CLEANING_TABLE = _build_table()
+
+
+def clean_text(text: str) -> str:
+    """
+    Returns lowercased text without punctuation where tokens are separated by a single space
+    """
+    return ' '.join(text.translate(CLEANING_TABLE).split())
+
+
+def clean_token(word: str) -> str:
+    """
+    Returns a cleaned token exactly as clean_text would produce it:
+    punctuation inside the token becomes a space, e.g. 'кто-то' -> 'кто то'
+    """
+    return clean_text(word)
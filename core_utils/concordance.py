@@ -0,0 +1,139 @@
+"""
+Keyword in context (KWIC) search over the processed corpus
+"""
+import bisect
+import itertools
+import re
+
+from core_utils.lazy import lazy_import
+from core_utils.lemma_index import LemmaIndex
+from core_utils.token_corpus import TokenCorpus
+
+np = lazy_import('numpy')
+
+TAG_POS_PATTERN = re.compile(r'^[A-Z]+')
+
+
+def get_tag_pos(tag: str) -> str:
+    """
+    Returns a part of speech of a MyStem tag, e.g. S for S,жен,од=им,ед
+    """
+    match = TAG_POS_PATTERN.match(tag)
+    return match.group(0) if match else ''
+
+
+class ConcordanceLine:
+    """
+    Single hit of a query with its left and right context
+    """
+
+    def __init__(self, cursor: tuple, left: list, keyword: str, right: list):
+        self.article_id, self.position = cursor
+        self.left = left
+        self.keyword = keyword
+        self.right = right
+
+    def __str__(self):
+        return f"{' '.join(self.left):>60} [{self.keyword}] {' '.join(self.right)}"
+
+    def to_json(self) -> dict:
+        """
+        Returns a json-serializable representation
+        """
+        return {'article_id': self.article_id, 'position': self.position,
+                'left': self.left, 'keyword': self.keyword, 'right': self.right}
+
+
+class Concordance:
+    """
+    Finds occurrences of a lemma or a word form and returns them with context windows.
+    Lemma queries use positions of a lemma index, word form queries scan
+    the token corpus. Tags are aligned with lemmas, so word form queries can be restricted
+    to a part of speech only if all articles have as many forms as lemmas.
+    Hits are produced lazily in order of article ids and positions,
+    so the first page is ready as soon as enough hits are found
+    """
+
+    def __init__(self, corpus: TokenCorpus, index: LemmaIndex = None, window: int = 5, page_size: int = 20):
+        self.corpus = corpus
+        self.index = index
+        self.window = window
+        self.page_size = page_size
+        self._tag_pos = np.array([get_tag_pos(tag) for tag in corpus.vocabularies['tags']], dtype=object)
+        self._article_ids = sorted(corpus.article_ids)
+        self._forms_aligned = bool(np.all(corpus.offsets[:, 2] == corpus.offsets[:, 4]))
+
+    def _scan(self, stream: str, query: str, pos: str, start_id: int):
+        """
+        Yields (article_id, positions) of a form or a lemma found in the token corpus
+        """
+        value_id = self.corpus.get_id(stream, query)
+        if value_id is None:
+            return
+        pos_tag_ids = None if pos is None else np.flatnonzero(self._tag_pos == pos)
+        start = bisect.bisect_left(self._article_ids, start_id)
+        for article_id in self._article_ids[start:]:
+            tokens = self.corpus.get_tokens(article_id, stream)
+            positions = np.flatnonzero(tokens == value_id)
+            if pos_tag_ids is not None and len(positions):
+                tags = self.corpus.get_tags(article_id)
+                positions = positions[np.isin(tags[positions], pos_tag_ids)]
+            if len(positions):
+                yield article_id, positions.tolist()
+
+    def _iter_positions(self, query: str, pos: str, query_type: str, start_id: int):
+        """
+        Yields (article_id, positions) of a query
+        """
+        if query_type not in ('lemma', 'form'):
+            raise ValueError(f'Unknown query type {query_type!r}, expected lemma or form')
+        if query_type == 'form' and pos is not None and not self._forms_aligned:
+            raise ValueError('Word forms of some articles are not aligned with their tags, '
+                             'use a lemma query to filter by a part of speech')
+        if query_type == 'lemma' and self.index is not None:
+            return ((article_id, positions) for article_id, positions
+                    in self.index.iter_positions(query, pos, start_id)
+                    if article_id in self.corpus)
+        return self._scan('lemmas' if query_type == 'lemma' else 'forms', query, pos, start_id)
+
+    def _get_context_tokens(self, article_id: int, query_type: str):
+        """
+        Returns the stream to show context from: word forms for word form queries
+        and for lemma queries if forms are aligned with lemmas, lemmas otherwise
+        """
+        forms = self.corpus.get_forms(article_id)
+        if query_type == 'form' or len(forms) == len(self.corpus.get_lemmas(article_id)):
+            return 'forms', forms
+        return 'lemmas', self.corpus.get_lemmas(article_id)
+
+    def iter_lines(self, query: str, pos: str = None, query_type: str = 'lemma', after: tuple = None):
+        """
+        Lazily yields concordance lines of a lemma or a word form (query_type='form'),
+        pos restricts a part of speech of a keyword,
+        after is an (article_id, position) cursor to continue from
+        """
+        start_id = after[0] if after else 0
+        for article_id, positions in self._iter_positions(query, pos, query_type, start_id):
+            stream, tokens = self._get_context_tokens(article_id, query_type)
+            for position in positions:
+                if after and (article_id, position) <= tuple(after):
+                    continue
+                if position >= len(tokens):
+                    continue
+                left = tokens[max(position - self.window, 0):position]
+                right = tokens[position + 1:position + 1 + self.window]
+                yield ConcordanceLine((article_id, position),
+                                      self.corpus.decode(stream, left),
+                                      self.corpus.decode(stream, tokens[position:position + 1])[0],
+                                      self.corpus.decode(stream, right))
+
+    def get_page(self, query: str, pos: str = None, query_type: str = 'lemma', after: tuple = None) -> tuple:
+        """
+        Returns a page of page_size concordance lines and a cursor of the next page,
+        the cursor is None when there are no more lines
+        """
+        lines = list(itertools.islice(self.iter_lines(query, pos, query_type, after), self.page_size + 1))
+        if len(lines) <= self.page_size:
+            return lines, None
+        lines = lines[:self.page_size]
+        return lines, (lines[-1].article_id, lines[-1].position)
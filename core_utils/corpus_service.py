@@ -0,0 +1,357 @@
+"""
+Local HTTP service answering corpus statistics, metadata and search queries from memory
+"""
+import argparse
+import datetime
+import json
+import threading
+from collections import Counter, OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from constants import ASSETS_PATH
+from core_utils.article import date_from_meta
+from core_utils.dataset_scanner import FileKind, scan_dataset
+from core_utils.lemma_index import LemmaIndex
+
+DATE_FORMAT = '%Y-%m-%d'
+FILTERS = ('topic', 'author', 'date_from', 'date_to')
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache of query results
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns a cached result or None
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value) -> None:
+        """
+        Stores a result evicting the least recently used one if the cache is full
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        """
+        Returns cache size and hit rate
+        """
+        requests = self.hits + self.misses
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0}
+
+
+class CorpusStore:
+    """
+    In-memory corpus: meta information and POS frequencies of each article
+    and a lemma index of single-tagged texts.
+    Articles are listed with a corpus manager if it is given and implemented,
+    otherwise with a dataset scan
+    """
+
+    def __init__(self, path: Path = ASSETS_PATH, corpus_manager_class=None):
+        self.path = Path(path)
+        self.corpus_manager_class = corpus_manager_class
+        self.version = 0
+        self.articles = {}
+        self.index = LemmaIndex()
+        self._stamps = {}
+        self._lock = threading.RLock()
+        self.reload()
+
+    def _get_article_ids(self, scan) -> list:
+        """
+        Returns ids of articles provided by the corpus manager
+        """
+        if self.corpus_manager_class is not None:
+            articles = self.corpus_manager_class(path_to_raw_txt_data=self.path).get_articles()
+            if articles:
+                return sorted(articles)
+        return scan.get_ids(FileKind.raw)
+
+    def _load_article(self, article_id: int, scan) -> dict:
+        """
+        Reads meta information of an article
+        """
+        article = {'id': article_id, 'url': None, 'title': '', 'date': None, 'author': None,
+                   'topics': [], 'pos_frequencies': {}}
+        if scan.has(article_id, FileKind.meta):
+            with open(self.path / f'{article_id}_meta.json', encoding='utf-8') as file:
+                article.update(json.load(file))
+        return article
+
+    def reload(self) -> int:
+        """
+        Loads new and changed articles, returns the number of them.
+        An article that cannot be read yet, e.g. a meta file that is still being written,
+        keeps its previous state and is retried on the next reload.
+        The version grows after each change, so cached results of older versions are not used
+        """
+        scan = scan_dataset(self.path, use_manifest=False)
+        ids = self._get_article_ids(scan)
+        stamps = {article_id: tuple(scan.get_mtime(article_id, kind) if scan.has(article_id, kind) else None
+                                    for kind in (FileKind.meta, FileKind.single_tagged))
+                  for article_id in ids}
+        changed = [article_id for article_id in ids if self._stamps.get(article_id) != stamps[article_id]]
+        if not changed and len(stamps) == len(self._stamps):
+            return 0
+
+        articles = {article_id: self.articles[article_id] for article_id in ids if article_id in self.articles}
+        texts = {}
+        loaded = []
+        for article_id in changed:
+            try:
+                article = self._load_article(article_id, scan)
+                if scan.has(article_id, FileKind.single_tagged) and \
+                        self._stamps.get(article_id, (None, None))[1] != stamps[article_id][1]:
+                    with open(self.path / f'{article_id}_single_tagged.txt', encoding='utf-8') as file:
+                        texts[article_id] = file.read()
+            except (OSError, ValueError):
+                del stamps[article_id]
+                continue
+            articles[article_id] = article
+            loaded.append(article_id)
+        with self._lock:
+            self.index.remove_articles([article_id for article_id in texts
+                                        if article_id in self.index.indexed_ids])
+            for article_id, text in texts.items():
+                self.index.add_article(article_id, text)
+            self.articles = articles
+            self._stamps = stamps
+            self.version += 1
+        return len(loaded)
+
+    def _filter(self, ids, **filters) -> list:
+        """
+        Returns articles of given ids that match meta information filters
+        """
+        unknown = set(filters) - set(FILTERS)
+        if unknown:
+            raise TypeError(f'Unknown filters: {", ".join(sorted(unknown))}')
+        topic, author = filters.get('topic'), filters.get('author')
+        date_from = datetime.datetime.strptime(filters['date_from'], DATE_FORMAT) \
+            if filters.get('date_from') else None
+        date_to = datetime.datetime.strptime(filters['date_to'], DATE_FORMAT) + datetime.timedelta(days=1) \
+            if filters.get('date_to') else None
+        articles = self.articles
+        result = []
+        for article_id in ids:
+            article = articles.get(article_id)
+            if article is None:
+                continue
+            if topic and topic not in (article['topics'] or []):
+                continue
+            if author and article['author'] != author:
+                continue
+            if date_from or date_to:
+                date = date_from_meta(article['date']) if article['date'] else None
+                if date is None or (date_from and date < date_from) or (date_to and date >= date_to):
+                    continue
+            result.append(article)
+        return result
+
+    def get_article(self, article_id: str) -> dict:
+        """
+        Returns meta information of an article
+        """
+        if article_id is None:
+            raise ValueError('id parameter is required')
+        return self.articles[int(article_id)]
+
+    def get_frequencies(self, article_id: str = None, **filters) -> dict:
+        """
+        Returns POS frequencies of an article or summed over articles matching filters
+        """
+        if article_id is not None:
+            articles = [self.get_article(article_id)]
+        else:
+            articles = self._filter(sorted(self.articles), **filters)
+        total = Counter()
+        for article in articles:
+            total.update(article['pos_frequencies'] or {})
+        return {'articles': len(articles), 'pos_frequencies': dict(total.most_common())}
+
+    def search(self, lemma: str = None, pos: str = None, title: str = None,
+               limit: str = '100', **filters) -> dict:
+        """
+        Returns ids of articles containing a lemma and/or a title substring,
+        matching meta information filters
+        """
+        if lemma is not None:
+            with self._lock:
+                ids = self.index.lookup(lemma, pos)
+        else:
+            ids = sorted(self.articles)
+        articles = self._filter(ids, **filters)
+        if title:
+            articles = [article for article in articles if title.lower() in (article['title'] or '').lower()]
+        return {'total': len(articles), 'ids': [article['id'] for article in articles[:int(limit)]]}
+
+    def get_status(self) -> dict:
+        """
+        Returns the number of loaded and indexed articles
+        """
+        return {'version': self.version, 'articles': len(self.articles),
+                'indexed': len(self.index.indexed_ids)}
+
+
+class CorpusService:
+    """
+    ThreadingHTTPServer over a CorpusStore with a result cache and periodic hot reload.
+    Routes: /articles?id=N, /frequencies, /search, /status; each answers with json
+    """
+
+    def __init__(self, store: CorpusStore, address: tuple = ('127.0.0.1', 8000),
+                 cache_size: int = 1024, reload_interval: float = 5.0):
+        self.store = store
+        self.cache = QueryCache(cache_size)
+        self.routes = {
+            '/articles': lambda params: store.get_article(params.pop('id', None)),
+            '/frequencies': lambda params: store.get_frequencies(**params),
+            '/search': lambda params: store.search(**params)
+        }
+        self.server = ThreadingHTTPServer(address, self._make_handler())
+        self.server.daemon_threads = True
+        self.last_reload_error = None
+        self._stop_event = threading.Event()
+        self._threads = [threading.Thread(target=self.server.serve_forever, daemon=True)]
+        if reload_interval:
+            self._threads.append(threading.Thread(target=self._reload_periodically, args=(reload_interval,),
+                                                  daemon=True))
+
+    @property
+    def url(self) -> str:
+        """
+        Returns the base url of the service
+        """
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def query(self, route: str, params: dict):
+        """
+        Answers a query using the cache
+        """
+        if route == '/status':
+            return dict(self.store.get_status(), cache=self.cache.get_stats(),
+                        last_reload_error=self.last_reload_error)
+        if route not in self.routes:
+            raise LookupError(route)
+        key = (route, tuple(sorted(params.items())), self.store.version)
+        result = self.cache.get(key)
+        if result is None:
+            result = json.dumps(self.routes[route](dict(params)), ensure_ascii=False).encode('utf-8')
+            self.cache.put(key, result)
+        return result
+
+    def _make_handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Translates HTTP requests into service queries
+            """
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """
+                Answers a GET request
+                """
+                url = urlsplit(self.path)
+                try:
+                    result = service.query(url.path, dict(parse_qsl(url.query)))
+                    status = 200
+                except LookupError as error:
+                    result, status = {'error': f'not found: {error}'}, 404
+                except (TypeError, ValueError) as error:
+                    result, status = {'error': str(error)}, 400
+                except Exception as error:  # pylint: disable=broad-except
+                    result, status = {'error': f'internal error: {error!r}'}, 500
+                body = result if isinstance(result, bytes) else \
+                    json.dumps(result, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                """
+                Disables logging of each request
+                """
+
+        return Handler
+
+    def _reload_periodically(self, interval: float) -> None:
+        """
+        Reloads the store every interval seconds until the service is stopped. A failed reload
+        does not stop the thread: the error is shown in /status and the next reload tries again
+        """
+        while not self._stop_event.wait(interval):
+            try:
+                self.store.reload()
+                self.last_reload_error = None
+            except Exception as error:  # pylint: disable=broad-except
+                self.last_reload_error = repr(error)
+
+    def start(self) -> None:
+        """
+        Starts serving and reloading in background threads
+        """
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops serving and reloading
+        """
+        self._stop_event.set()
+        self.server.shutdown()
+        self.server.server_close()
+        for thread in self._threads:
+            thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serves corpus queries over HTTP')
+    parser.add_argument('--path', type=Path, default=ASSETS_PATH)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--cache-size', type=int, default=1024)
+    parser.add_argument('--reload-interval', type=float, default=5.0, help='seconds, 0 disables reload')
+    args = parser.parse_args()
+
+    from pipeline import CorpusManager  # pylint: disable=import-outside-toplevel
+    store = CorpusStore(args.path, CorpusManager)
+    service = CorpusService(store, (args.host, args.port), args.cache_size, args.reload_interval)
+    print(f'Serving {store.get_status()["articles"]} articles at {service.url}')
+    service.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        service.stop()
+
+
+if __name__ == '__main__':
+    main()
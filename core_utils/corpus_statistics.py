@@ -0,0 +1,198 @@
+"""
+Corpus-wide frequencies of parts of speech and lemmas
+"""
+import re
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from constants import CACHE_PATH
+from core_utils.dataset_scanner import FileKind, scan_dataset
+
+CORPUS_STATISTICS_PATH = CACHE_PATH / 'corpus_statistics.bin'
+
+MAGIC = b'CSTAT002'
+TABLES = ('pos', 'lemma', 'lemma_pos')
+LEMMA_POS_SEPARATOR = '\t'
+
+SINGLE_TAGGED_TOKEN_PATTERN = re.compile(r'(?<!\S)([^\s<]+)<([A-Z]+)')
+
+
+def count_article(path: Path) -> dict:
+    """
+    Counts parts of speech, lemmas and lemmas with parts of speech in N_single_tagged.txt
+    """
+    with open(path, encoding='utf-8') as file:
+        pairs = SINGLE_TAGGED_TOKEN_PATTERN.findall(file.read())
+    return {
+        'pos': Counter(pos for _, pos in pairs),
+        'lemma': Counter(lemma for lemma, _ in pairs),
+        'lemma_pos': Counter(f'{lemma}{LEMMA_POS_SEPARATOR}{pos}' for lemma, pos in pairs)
+    }
+
+
+def count_articles(paths: list) -> dict:
+    """
+    Map step: counts frequencies over a chunk of articles in a worker process
+    """
+    counters = {table: Counter() for table in TABLES}
+    for path in paths:
+        for table, counter in count_article(path).items():
+            counters[table].update(counter)
+    return counters
+
+
+def _to_little_endian(values: array) -> bytes:
+    """
+    Returns array bytes in a platform-independent byte order
+    """
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array:
+    """
+    Restores an array saved with _to_little_endian
+    """
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _read_column(file) -> array:
+    """
+    Reads a column of unsigned integers prefixed with its size in bytes
+    """
+    size, = struct.unpack('<Q', file.read(8))
+    return _from_little_endian('Q', file.read(size))
+
+
+class CorpusStatistics:
+    """
+    Frequency tables of the whole corpus: 'pos', 'lemma' and 'lemma_pos'.
+    Tables are computed in parallel (a Counter per worker, merged at the end),
+    saved in a compact binary columnar file and updated incrementally
+    with newly processed articles only
+    """
+
+    def __init__(self):
+        self.tables = {table: Counter() for table in TABLES}
+        # {article id: (size, modification time)} of counted single-tagged texts
+        self.counted = {}
+
+    @property
+    def processed_ids(self) -> set:
+        """
+        Returns ids of counted articles
+        """
+        return set(self.counted)
+
+    def update(self, dataset_path: Path, workers: int = None, chunk_size: int = 64) -> int:
+        """
+        Folds in single-tagged articles that were not counted yet,
+        returns the number of counted articles.
+        Counts can not be subtracted without the previous texts, so if any counted text
+        was rewritten or removed, all the tables are recounted
+        """
+        dataset_path = Path(dataset_path)
+        # texts may be rewritten in place, so sizes and modification times must be fresh
+        scan = scan_dataset(dataset_path, use_manifest=False)
+        stamps = {article_id: (scan.get_size(article_id, FileKind.single_tagged),
+                               scan.get_mtime(article_id, FileKind.single_tagged))
+                  for article_id in scan.get_ids(FileKind.single_tagged)}
+        if any(stamps.get(article_id) != stamp for article_id, stamp in self.counted.items()):
+            self.reset()
+        new_ids = [article_id for article_id in stamps if article_id not in self.counted]
+        paths = [dataset_path / f'{article_id}_single_tagged.txt' for article_id in new_ids]
+        self._count(paths, workers, chunk_size)
+        self.counted.update((article_id, stamps[article_id]) for article_id in new_ids)
+        return len(new_ids)
+
+    def reset(self) -> None:
+        """
+        Forgets all counted articles
+        """
+        self.tables = {table: Counter() for table in TABLES}
+        self.counted = {}
+
+    def _count(self, paths: list, workers: int, chunk_size: int) -> None:
+        """
+        Counts articles in worker processes and merges their counters into the tables
+        """
+        chunks = [paths[start:start + chunk_size] for start in range(0, len(paths), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for counters in executor.map(count_articles, chunks):
+                for table, counter in counters.items():
+                    self.tables[table].update(counter)
+
+    def top_k(self, table: str, k: int = 10, pos: str = None) -> list:
+        """
+        Returns k most frequent entries of a table as (entry, frequency) pairs.
+        For 'lemma_pos' table entries are (lemma, pos) tuples and can be filtered by pos
+        """
+        if table not in self.tables:
+            raise ValueError(f'Table must be one of the following: {", ".join(TABLES)}, received {table}')
+        if table != 'lemma_pos':
+            return self.tables[table].most_common(k)
+        result = []
+        for entry, frequency in self.tables[table].most_common():
+            lemma, entry_pos = entry.split(LEMMA_POS_SEPARATOR)
+            if pos is None or entry_pos == pos:
+                result.append(((lemma, entry_pos), frequency))
+                if len(result) == k:
+                    break
+        return result
+
+    def save(self, path: Path = CORPUS_STATISTICS_PATH) -> None:
+        """
+        Saves tables column by column: compressed vocabulary sorted by frequency
+        followed by an array of counts, then ids, sizes and modification times
+        of counted articles
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(MAGIC)
+            for table in TABLES:
+                entries = self.tables[table].most_common()
+                vocabulary = zlib.compress('\n'.join(entry for entry, _ in entries).encode('utf-8'))
+                counts = _to_little_endian(array('Q', (count for _, count in entries)))
+                file.write(struct.pack('<QQ', len(vocabulary), len(counts)))
+                file.write(vocabulary)
+                file.write(counts)
+            ids = sorted(self.counted)
+            for column in (ids, [self.counted[article_id][0] for article_id in ids],
+                           [self.counted[article_id][1] for article_id in ids]):
+                data = _to_little_endian(array('Q', column))
+                file.write(struct.pack('<Q', len(data)))
+                file.write(data)
+
+    @classmethod
+    def load(cls, path: Path = CORPUS_STATISTICS_PATH):
+        """
+        Loads statistics saved with save(), returns empty statistics if there is no file
+        """
+        statistics = cls()
+        path = Path(path)
+        if not path.exists():
+            return statistics
+        with open(path, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a corpus statistics file')
+            for table in TABLES:
+                vocabulary_size, counts_size = struct.unpack('<QQ', file.read(16))
+                vocabulary = zlib.decompress(file.read(vocabulary_size)).decode('utf-8')
+                counts = _from_little_endian('Q', file.read(counts_size))
+                entries = vocabulary.split('\n') if counts else []
+                statistics.tables[table] = Counter(dict(zip(entries, counts)))
+            ids, sizes, mtimes = (_read_column(file) for _ in range(3))
+            statistics.counted = {article_id: (size, mtime) for article_id, size, mtime in zip(ids, sizes, mtimes)}
+        return statistics
@@ -0,0 +1,331 @@
+"""
+Runner of pipeline stages described as a directed acyclic graph
+"""
+import argparse
+import runpy
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from constants import ASSETS_PATH, CACHE_PATH, PROJECT_ROOT
+from core_utils.dataset_scanner import FILE_SUFFIXES, FileKind, scan_dataset
+
+STAMPS_PATH = CACHE_PATH / 'dag_stamps'
+ARTICLE_KINDS = frozenset(FILE_SUFFIXES.values())
+
+
+class StageStatus:
+    """
+    Outcomes of a stage
+    """
+    done = 'done'
+    skipped = 'skipped'
+    failed = 'failed'
+    blocked = 'blocked'
+
+
+class Stage:
+    """
+    Pipeline stage: func(context) is called with a StageContext.
+    inputs and outputs are resources: kinds of article files (e.g. 'raw', 'single_tagged'),
+    paths of files, or names of other stages that stand for the moment they last succeeded.
+    The after keyword lists stages that must finish first without making this stage out of date
+    """
+
+    def __init__(self, name: str, func, inputs: tuple = (), outputs: tuple = (), **order):
+        unknown = set(order) - {'after'}
+        if unknown:
+            raise TypeError(f'Unknown stage options: {", ".join(sorted(unknown))}')
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.after = tuple(order.get('after', ()))
+
+
+class StageContext:
+    """
+    What a stage gets: the dataset path and in-memory results of stages
+    that ran earlier in the same process
+    """
+
+    def __init__(self, path: Path, results: dict):
+        self.path = path
+        self.results = results
+
+
+class DAGRunner:
+    """
+    Runs stages in the order of their dependencies: a stage depends on stages producing
+    its inputs and on stages listed in after. Independent stages run concurrently in threads.
+    A stage is skipped when all its outputs exist and none of its inputs changed
+    since its last successful run. A stage without inputs, like crawl, is skipped
+    whenever all its outputs exist
+    """
+
+    def __init__(self, stages: list, path: Path = ASSETS_PATH, workers: int = 4,
+                 stamps_path: Path = STAMPS_PATH):
+        self.stages = {stage.name: stage for stage in stages}
+        self.path = Path(path)
+        self.workers = workers
+        self.stamps_path = Path(stamps_path)
+        self.producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(f'{output} is produced by both {self.producers[output]} and {stage.name}')
+                self.producers[output] = stage.name
+        self.dependencies = {stage.name: self._get_dependencies(stage) for stage in stages}
+        self._check_cycles()
+
+    def _get_dependencies(self, stage: Stage) -> set:
+        """
+        Returns names of stages that must finish before a stage
+        """
+        dependencies = set(stage.after)
+        for resource in stage.inputs:
+            if resource in self.stages:
+                dependencies.add(resource)
+            elif resource in self.producers:
+                dependencies.add(self.producers[resource])
+        unknown = dependencies - set(self.stages)
+        if unknown:
+            raise ValueError(f'Stage {stage.name} depends on unknown stages {sorted(unknown)}')
+        return dependencies
+
+    def _check_cycles(self) -> None:
+        """
+        Raises ValueError if dependencies contain a cycle
+        """
+        remaining = dict(self.dependencies)
+        while remaining:
+            ready = [name for name, dependencies in remaining.items() if not dependencies & set(remaining)]
+            if not ready:
+                raise ValueError(f'Stages form a cycle: {sorted(remaining)}')
+            for name in ready:
+                del remaining[name]
+
+    def get_stamp_path(self, name: str) -> Path:
+        """
+        Returns a file touched after a successful run of a stage
+        """
+        return self.stamps_path / f'{name}.stamp'
+
+    def _get_times(self, resource, scan) -> tuple:
+        """
+        Returns (oldest, newest) modification times of a resource in nanoseconds,
+        None if it does not exist completely
+        """
+        if resource in ARTICLE_KINDS:
+            ids = scan.get_ids(FileKind.raw) if resource != FileKind.raw else scan.get_ids(resource)
+            if not ids or any(not scan.has(article_id, resource) for article_id in ids):
+                return None
+            times = [scan.get_mtime(article_id, resource) for article_id in ids]
+            return min(times), max(times)
+        path = self.get_stamp_path(resource) if resource in self.stages else Path(resource)
+        if not path.exists():
+            return None
+        mtime = path.stat().st_mtime_ns
+        return mtime, mtime
+
+    def is_up_to_date(self, stage: Stage) -> bool:
+        """
+        Checks whether all outputs of a stage exist and its inputs did not change
+        since the stage last succeeded
+        """
+        scan = scan_dataset(self.path, use_manifest=False) if self.path.exists() else None
+        if scan is None and set(stage.inputs + stage.outputs) & ARTICLE_KINDS:
+            return False
+        if not stage.inputs and stage.outputs:
+            return all(self._get_times(resource, scan) is not None for resource in stage.outputs)
+        stamp = self._get_times(stage.name, scan)
+        if stamp is None or any(self._get_times(resource, scan) is None for resource in stage.outputs):
+            return False
+        inputs = [self._get_times(resource, scan) for resource in stage.inputs]
+        return all(times is not None and times[1] <= stamp[0] for times in inputs)
+
+    def _select(self, targets: list) -> set:
+        """
+        Returns names of targets together with all their dependencies
+        """
+        selected = set()
+        pending = list(targets or self.stages)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f'Unknown stage {name}')
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.dependencies[name])
+        return selected
+
+    def _run_stage(self, name: str, results: dict, force: bool) -> tuple:
+        """
+        Runs a stage unless it is up to date, returns its status and result
+        """
+        stage = self.stages[name]
+        if not force and self.is_up_to_date(stage):
+            return StageStatus.skipped, None
+        result = stage.func(StageContext(self.path, results))
+        stamp_path = self.get_stamp_path(name)
+        stamp_path.parent.mkdir(parents=True, exist_ok=True)
+        stamp_path.touch()
+        return StageStatus.done, result
+
+    def _get_failed_dependencies(self, name: str, report: dict) -> list:
+        """
+        Returns names of dependencies of a stage that failed or were blocked
+        """
+        return sorted(dependency for dependency in self.dependencies[name] if dependency in report
+                      and report[dependency]['status'] in (StageStatus.failed, StageStatus.blocked))
+
+    @staticmethod
+    def _collect(running: dict, results: dict, report: dict) -> None:
+        """
+        Waits for running stages, moves the finished ones to the report and their results to results
+        """
+        done, _ = wait([future for future, _ in running.values()], return_when=FIRST_COMPLETED)
+        for name, (future, start) in list(running.items()):
+            if future not in done:
+                continue
+            del running[name]
+            try:
+                status, result = future.result()
+                error = None
+            except Exception as exception:  # pylint: disable=broad-except
+                status, result, error = StageStatus.failed, None, repr(exception)
+            if status == StageStatus.done:
+                results[name] = result
+            report[name] = {'status': status, 'seconds': time.perf_counter() - start, 'error': error}
+
+    def run(self, targets: list = None, force=False) -> dict:
+        """
+        Runs targets (all stages by default) with their dependencies.
+        force is either a bool or a collection of stage names to run even if up to date.
+        Returns {stage name: {'status', 'seconds', 'error'}}
+        """
+        selected = self._select(targets)
+        results = {}
+        report = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while len(report) < len(selected):
+                for name in sorted(selected - set(report) - set(running)):
+                    failed = self._get_failed_dependencies(name, report)
+                    if failed:
+                        report[name] = {'status': StageStatus.blocked, 'seconds': 0.0,
+                                        'error': f'{", ".join(failed)} did not succeed'}
+                    elif all(dependency in report for dependency in self.dependencies[name]):
+                        stage_force = force if isinstance(force, bool) else name in force
+                        running[name] = (executor.submit(self._run_stage, name, results, stage_force),
+                                         time.perf_counter())
+                if running:
+                    self._collect(running, results, report)
+        return report
+
+
+def crawl(context: StageContext) -> None:
+    """
+    Runs the crawler script
+    """
+    runpy.run_path(str(PROJECT_ROOT / 'scrapper.py'), run_name='__main__')
+
+
+def validate(context: StageContext) -> None:
+    """
+    Validates the dataset raising pipeline exceptions
+    """
+    # pylint: disable=import-outside-toplevel
+    from core_utils.dataset_validator import DatasetValidator
+    from pipeline import EmptyDirectoryError, InconsistentDatasetError
+    DatasetValidator(context.path).validate().raise_for_problems(EmptyDirectoryError,
+                                                                InconsistentDatasetError)
+
+
+def process(context: StageContext) -> None:
+    """
+    Runs TextProcessingPipeline. The pipeline writes its artifacts to the dataset
+    and keeps nothing in memory, so the next stages read them from the disk
+    """
+    from pipeline import CorpusManager, TextProcessingPipeline  # pylint: disable=import-outside-toplevel
+    TextProcessingPipeline(CorpusManager(path_to_raw_txt_data=context.path)).run()
+
+
+def count_pos(context: StageContext) -> dict:
+    """
+    Counts parts of speech of single-tagged texts and saves them to meta files,
+    returns {article_id: frequencies}
+    """
+    # pylint: disable=import-outside-toplevel
+    from core_utils.pos_frequencies import count_pos_frequencies, save_pos_frequencies_to_meta
+    frequencies = {}
+    for article_id in scan_dataset(context.path, use_manifest=False).get_ids(FileKind.single_tagged):
+        with open(context.path / f'{article_id}_single_tagged.txt', encoding='utf-8') as file:
+            frequencies[article_id] = count_pos_frequencies(file.read())
+        save_pos_frequencies_to_meta(context.path / f'{article_id}_meta.json', frequencies[article_id])
+    return frequencies
+
+
+def visualize(context: StageContext) -> int:
+    """
+    Draws POS frequencies of each article, reusing counts of the previous stage if it ran
+    """
+    # pylint: disable=import-outside-toplevel
+    import json
+    from core_utils.visualizer import visualize_batch
+    frequencies = context.results.get('pos_frequency')
+    if frequencies is None:
+        frequencies = {}
+        for article_id in scan_dataset(context.path, use_manifest=False).get_ids(FileKind.meta):
+            with open(context.path / f'{article_id}_meta.json', encoding='utf-8') as file:
+                frequencies[article_id] = json.load(file).get('pos_frequencies') or {}
+    return visualize_batch({context.path / f'{article_id}_image.png': statistics
+                            for article_id, statistics in frequencies.items() if statistics})
+
+
+def build_index(context: StageContext) -> int:
+    """
+    Adds new single-tagged articles to the lemma index
+    """
+    from core_utils.lemma_index import LemmaIndex  # pylint: disable=import-outside-toplevel
+    index = LemmaIndex.load()
+    added = index.update(context.path)
+    index.save()
+    return added
+
+
+def get_default_stages() -> list:
+    """
+    Returns stages of the whole lab: crawl, validate, process, pos_frequency, visualize, index
+    """
+    from core_utils.lemma_index import LEMMA_INDEX_PATH  # pylint: disable=import-outside-toplevel
+    return [
+        Stage('crawl', crawl, outputs=(FileKind.raw,)),
+        Stage('validate', validate, inputs=(FileKind.raw, FileKind.meta)),
+        Stage('process', process, inputs=(FileKind.raw,),
+              outputs=(FileKind.cleaned, FileKind.single_tagged, FileKind.multiple_tagged),
+              after=('validate',)),
+        Stage('pos_frequency', count_pos, inputs=(FileKind.single_tagged,)),
+        Stage('visualize', visualize, inputs=('pos_frequency',), outputs=(FileKind.image,)),
+        Stage('index', build_index, inputs=(FileKind.single_tagged,), outputs=(str(LEMMA_INDEX_PATH),))
+    ]
+
+
+def main():
+    stages = get_default_stages()
+    parser = argparse.ArgumentParser(description='Runs pipeline stages in the order of their dependencies')
+    parser.add_argument('targets', nargs='*',
+                        help=f'stages to run with their dependencies: {", ".join(stage.name for stage in stages)}; '
+                             f'all by default')
+    parser.add_argument('--force', nargs='*', help='stages to run even if up to date, all if empty')
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    force = args.force if args.force else args.force is not None
+    report = DAGRunner(stages, workers=args.workers).run(args.targets, force)
+    for name, entry in report.items():
+        print(f"{name:<14} {entry['status']:<8} {entry['seconds']:8.2f} sec {entry['error'] or ''}")
+
+
+if __name__ == '__main__':
+    main()
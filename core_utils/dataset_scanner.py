@@ -0,0 +1,154 @@
+"""
+Single-pass dataset scanner with a persistent manifest
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from constants import CACHE_PATH
+from core_utils.manifest import dump_json_atomically
+
+DATASET_MANIFESTS_PATH = CACHE_PATH / 'dataset_manifests'
+
+
+class FileKind:
+    raw = 'raw'
+    meta = 'meta'
+    cleaned = 'cleaned'
+    single_tagged = 'single_tagged'
+    multiple_tagged = 'multiple_tagged'
+    image = 'image'
+    pdf = 'pdf'
+
+
+FILE_SUFFIXES = {
+    'raw.txt': FileKind.raw,
+    'meta.json': FileKind.meta,
+    'cleaned.txt': FileKind.cleaned,
+    'single_tagged.txt': FileKind.single_tagged,
+    'multiple_tagged.txt': FileKind.multiple_tagged,
+    'image.png': FileKind.image,
+    'raw.pdf': FileKind.pdf
+}
+
+FILE_NAME_PATTERN = re.compile(r'^(\d+)_(' + '|'.join(map(re.escape, FILE_SUFFIXES)) + r')$')
+
+
+class DatasetScan:
+    """
+    Result of a dataset scan: for each article id stores size and modification time
+    of every file that belongs to it
+    """
+
+    def __init__(self, path: Path, mtime: int, files: dict, unknown: list):
+        self.path = Path(path)
+        self.mtime = mtime
+        self.files = files
+        self.unknown = unknown
+
+    def get_ids(self, kind: str = FileKind.raw) -> list:
+        """
+        Returns sorted ids of articles that have a file of the given kind
+        """
+        return sorted(article_id for article_id, kinds in self.files.items() if kind in kinds)
+
+    def has(self, article_id: int, kind: str) -> bool:
+        """
+        Checks whether an article has a file of the given kind
+        """
+        return kind in self.files.get(article_id, {})
+
+    def get_size(self, article_id: int, kind: str) -> int:
+        """
+        Returns the size of an article file in bytes
+        """
+        return self.files[article_id][kind][0]
+
+    def get_mtime(self, article_id: int, kind: str) -> int:
+        """
+        Returns the modification time of an article file in nanoseconds
+        """
+        return self.files[article_id][kind][1]
+
+    def to_json(self) -> dict:
+        """
+        Returns a json-serializable representation of the scan
+        """
+        return {
+            'path': str(self.path),
+            'mtime': self.mtime,
+            'files': {str(article_id): kinds for article_id, kinds in self.files.items()},
+            'unknown': self.unknown
+        }
+
+    @classmethod
+    def from_json(cls, data: dict):
+        """
+        Restores a scan from its json representation
+        """
+        files = {int(article_id): {kind: tuple(stat) for kind, stat in kinds.items()}
+                 for article_id, kinds in data['files'].items()}
+        return cls(data['path'], data['mtime'], files, data['unknown'])
+
+
+def get_manifest_path(path: Path, manifests_path: Path = None) -> Path:
+    """
+    Returns the manifest location for a dataset directory,
+    manifests are kept in DATASET_MANIFESTS_PATH unless another directory is given
+    """
+    key = hashlib.sha1(str(Path(path).resolve()).encode('utf-8')).hexdigest()
+    return Path(manifests_path or DATASET_MANIFESTS_PATH) / f'{key}.json'
+
+
+def _scan_directory(path: Path, mtime: int) -> DatasetScan:
+    """
+    Classifies each file of a directory in a single scandir pass.
+    Hidden files, such as temporary files of atomic writes, are ignored
+    """
+    files = {}
+    unknown = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            match = FILE_NAME_PATTERN.match(entry.name)
+            if match is None or not entry.is_file():
+                unknown.append(entry.name)
+                continue
+            stat = entry.stat()
+            kinds = files.setdefault(int(match.group(1)), {})
+            kinds[FILE_SUFFIXES[match.group(2)]] = (stat.st_size, stat.st_mtime_ns)
+    return DatasetScan(path, mtime, files, sorted(unknown))
+
+
+def scan_dataset(path: Path, use_manifest: bool = True, manifests_path: Path = None) -> DatasetScan:
+    """
+    Scans a dataset directory. If the directory has not changed since the previous scan
+    (only the directory itself is stat-ed), the saved manifest is reused.
+    Manifests are kept in manifests_path, DATASET_MANIFESTS_PATH by default.
+    Note that the directory modification time changes when files are created,
+    removed or renamed, but not when a file is rewritten in place
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(path)
+    if not path.is_dir():
+        raise NotADirectoryError(path)
+    mtime = path.stat().st_mtime_ns
+
+    manifest_path = get_manifest_path(path, manifests_path)
+    if use_manifest and manifest_path.exists():
+        with open(manifest_path, encoding='utf-8') as file:
+            try:
+                data = json.load(file)
+            except json.JSONDecodeError:
+                data = {}
+        if data.get('mtime') == mtime:
+            return DatasetScan.from_json(data)
+
+    scan = _scan_directory(path, mtime)
+    if use_manifest:
+        dump_json_atomically(scan.to_json(), manifest_path)
+    return scan
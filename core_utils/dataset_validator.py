@@ -0,0 +1,227 @@
+"""
+Dataset validator with a checksum manifest
+"""
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from constants import CACHE_PATH
+from core_utils.dataset_scanner import FileKind, scan_dataset
+from core_utils.manifest import dump_json_atomically
+
+VALIDATION_MANIFESTS_PATH = CACHE_PATH / 'validation_manifests'
+ARTICLE_FILE_PREFIX = re.compile(r'^\d+_')
+
+
+class ProblemKind:
+    empty_directory = 'empty_directory'
+    unknown_file = 'unknown_file'
+    id_gap = 'id_gap'
+    missing_meta = 'missing_meta'
+    missing_raw = 'missing_raw'
+    empty_text = 'empty_text'
+    not_utf8 = 'not_utf8'
+    corrupt_meta = 'corrupt_meta'
+
+
+class ValidationReport:
+    """
+    Stores all problems found in a dataset and warnings that do not make it invalid
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.problems = []
+        self.warnings = []
+        self.checked_files = 0
+        self.reused_files = 0
+
+    def add(self, kind: str, message: str, article_id: int = None) -> None:
+        """
+        Registers a problem
+        """
+        self.problems.append({'kind': kind, 'article_id': article_id, 'message': message})
+
+    def warn(self, kind: str, message: str, article_id: int = None) -> None:
+        """
+        Registers a warning
+        """
+        self.warnings.append({'kind': kind, 'article_id': article_id, 'message': message})
+
+    def is_valid(self) -> bool:
+        """
+        Checks whether no problems were found
+        """
+        return not self.problems
+
+    def to_json(self) -> dict:
+        """
+        Returns a machine-readable representation of the report
+        """
+        return {
+            'path': str(self.path),
+            'valid': self.is_valid(),
+            'checked_files': self.checked_files,
+            'reused_files': self.reused_files,
+            'problems': self.problems,
+            'warnings': self.warnings
+        }
+
+    def save(self, path: Path) -> None:
+        """
+        Saves the report as json
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_json(), file, indent=4, ensure_ascii=False)
+
+    def raise_for_problems(self, empty_directory_error: type, inconsistent_dataset_error: type) -> None:
+        """
+        Raises the exception corresponding to the first problem found
+        """
+        if not self.problems:
+            return
+        problem = self.problems[0]
+        if problem['kind'] == ProblemKind.empty_directory:
+            raise empty_directory_error(problem['message'])
+        raise inconsistent_dataset_error(problem['message'])
+
+
+def _check_raw(path: Path) -> tuple:
+    """
+    Checks that a raw text is a non-empty utf-8 text, returns its checksum and a problem if any
+    """
+    with open(path, 'rb') as file:
+        content = file.read()
+    checksum = hashlib.sha256(content).hexdigest()
+    try:
+        text = content.decode('utf-8')
+    except UnicodeDecodeError:
+        return checksum, ProblemKind.not_utf8
+    if not text.strip():
+        return checksum, ProblemKind.empty_text
+    return checksum, None
+
+
+def _check_meta(path: Path) -> tuple:
+    """
+    Checks that a meta file is a valid json, returns its checksum and a problem if any
+    """
+    with open(path, 'rb') as file:
+        content = file.read()
+    checksum = hashlib.sha256(content).hexdigest()
+    try:
+        json.loads(content.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return checksum, ProblemKind.corrupt_meta
+    return checksum, None
+
+
+class DatasetValidator:
+    """
+    Validates dataset structure using a directory listing only:
+    continuity of ids from 1, parity of raw and meta files, file naming and empty files.
+    Article files (N_*) with an unknown kind are problems, other unknown files are warnings.
+    File contents are checked in a thread pool, and checksums of valid files are saved,
+    so that files whose size and modification time did not change are not read again
+    """
+
+    def __init__(self, path: Path, check_meta: bool = True, workers: int = 8,
+                 manifests_path: Path = VALIDATION_MANIFESTS_PATH):
+        self.path = Path(path)
+        self.check_meta = check_meta
+        self.workers = workers
+        key = hashlib.sha1(str(self.path.resolve()).encode('utf-8')).hexdigest()
+        self._manifest_path = Path(manifests_path) / f'{key}.json'
+
+    def validate(self) -> ValidationReport:
+        """
+        Returns a report with all the problems found
+        """
+        # files may be rewritten in place, so sizes and modification times must be fresh
+        scan = scan_dataset(self.path, use_manifest=False)
+        report = ValidationReport(self.path)
+        for name in scan.unknown:
+            message = f'File {name} does not follow naming conventions'
+            if ARTICLE_FILE_PREFIX.match(name):
+                report.add(ProblemKind.unknown_file, message)
+            else:
+                report.warn(ProblemKind.unknown_file, message)
+        if not scan.files and not report.problems:
+            report.add(ProblemKind.empty_directory, f'Directory {self.path} has no articles')
+            return report
+
+        raw_ids = scan.get_ids(FileKind.raw)
+        missing = sorted(set(range(1, len(raw_ids) + 1)) - set(raw_ids))
+        for article_id in missing:
+            report.add(ProblemKind.id_gap, f'Article {article_id} is missing: '
+                                           f'ids must start from 1 and be continuous', article_id)
+        for article_id in sorted(set(raw_ids) - set(range(1, len(raw_ids) + 1))):
+            report.add(ProblemKind.id_gap, f'Article {article_id} is out of the continuous range', article_id)
+
+        if self.check_meta:
+            meta_ids = scan.get_ids(FileKind.meta)
+            for article_id in sorted(set(raw_ids) - set(meta_ids)):
+                report.add(ProblemKind.missing_meta, f'Article {article_id} has no meta file', article_id)
+            for article_id in sorted(set(meta_ids) - set(raw_ids)):
+                report.add(ProblemKind.missing_raw, f'Article {article_id} has no raw text', article_id)
+
+        self._check_contents(scan, report)
+        return report
+
+    def _check_contents(self, scan, report: ValidationReport) -> None:
+        """
+        Checks contents of files that changed since the previous validation
+        """
+        manifest = self._load_manifest()
+        checks = {FileKind.raw: ('raw.txt', _check_raw)}
+        if self.check_meta:
+            checks[FileKind.meta] = ('meta.json', _check_meta)
+
+        to_check = []
+        valid = {}
+        for kind, (suffix, check) in checks.items():
+            for article_id in scan.get_ids(kind):
+                name = f'{article_id}_{kind}'
+                stat = [scan.get_size(article_id, kind), scan.get_mtime(article_id, kind)]
+                if kind == FileKind.raw and not stat[0]:
+                    report.add(ProblemKind.empty_text, f'Article {article_id} has an empty raw text', article_id)
+                elif manifest.get(name, [None, None])[:2] == stat:
+                    valid[name] = manifest[name]
+                    report.reused_files += 1
+                else:
+                    to_check.append((name, article_id, stat, check, self.path / f'{article_id}_{suffix}'))
+
+        valid.update(self._run_checks(to_check, report))
+        dump_json_atomically(valid, self._manifest_path)
+
+    def _run_checks(self, to_check: list, report: ValidationReport) -> dict:
+        """
+        Reads and checks files in a thread pool,
+        returns manifest entries of the files that are valid
+        """
+        valid = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [(name, article_id, stat, path, executor.submit(check, path))
+                       for name, article_id, stat, check, path in to_check]
+            for name, article_id, stat, path, future in futures:
+                checksum, problem = future.result()
+                report.checked_files += 1
+                if problem is None:
+                    valid[name] = stat + [checksum]
+                else:
+                    report.add(problem, f'File {path.name} is invalid: {problem}', article_id)
+        return valid
+
+    def _load_manifest(self) -> dict:
+        """
+        Loads checksums of files that were valid during the previous run
+        """
+        if not self._manifest_path.exists():
+            return {}
+        with open(self._manifest_path, encoding='utf-8') as file:
+            try:
+                return json.load(file)
+            except json.JSONDecodeError:
+                return {}
@@ -0,0 +1,138 @@
+"""
+Watcher that finds articles as soon as the crawler saves them
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+from core_utils.dataset_scanner import FILE_NAME_PATTERN, FILE_SUFFIXES, FileKind, scan_dataset
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+
+class DatasetWatcher:
+    """
+    Follows a dataset directory and yields ids of articles whose raw text and meta file
+    are completely written. A pair is considered complete when both files did not change
+    between two consecutive observations, are older than settle_time seconds,
+    the raw text is not empty and the meta file is a valid json.
+    Uses inotify when inotify_simple is installed and polling otherwise.
+    With inotify the directory is listed once, after that only files named
+    in events and articles that are not ready yet are stat-ed
+    """
+
+    def __init__(self, path: Path, poll_interval: float = 1.0, settle_time: float = 0.5,
+                 use_inotify: bool = True):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self._emitted = set()
+        # ids of articles that are not ready yet with their last observed state
+        self._pending = {}
+        self._needs_scan = True
+        self._inotify = None
+        if use_inotify and inotify_simple is not None:
+            self._inotify = inotify_simple.INotify()
+            flags = inotify_simple.flags
+            self._inotify.add_watch(str(self.path), flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE)
+
+    def watch(self, stop_event=None, idle_timeout: float = None):
+        """
+        Yields ids of complete articles in the order they become ready.
+        Stops when stop_event (threading.Event) is set or when no new articles
+        appeared for idle_timeout seconds; ready articles are yielded before stopping
+        """
+        last_activity = time.monotonic()
+        while True:
+            stopping = stop_event is not None and stop_event.is_set()
+            ready = self._find_ready(settle=not stopping)
+            if ready:
+                last_activity = time.monotonic()
+            yield from ready
+            if stopping:
+                return
+            if idle_timeout is not None and time.monotonic() - last_activity > idle_timeout:
+                return
+            self._wait()
+
+    def close(self) -> None:
+        """
+        Releases inotify resources
+        """
+        if self._inotify is not None:
+            self._inotify.close()
+
+    def _wait(self) -> None:
+        """
+        Waits for file system events or for the next polling round
+        """
+        if self._inotify is None:
+            time.sleep(self.poll_interval)
+            return
+        for event in self._inotify.read(timeout=int(self.poll_interval * 1000)):
+            if event.mask & inotify_simple.flags.Q_OVERFLOW:
+                self._needs_scan = True
+                continue
+            match = FILE_NAME_PATTERN.match(event.name)
+            if match is None or FILE_SUFFIXES[match.group(2)] not in (FileKind.raw, FileKind.meta):
+                continue
+            article_id = int(match.group(1))
+            if article_id not in self._emitted:
+                self._pending.setdefault(article_id, None)
+
+    def _stat(self, article_id: int):
+        """
+        Returns (size, modification time) of the raw text and the meta file of an article,
+        None if any of them does not exist
+        """
+        try:
+            return tuple((stat.st_size, stat.st_mtime_ns) for stat in
+                         (os.stat(self.path / f'{article_id}_raw.txt'),
+                          os.stat(self.path / f'{article_id}_meta.json')))
+        except FileNotFoundError:
+            return None
+
+    def _find_ready(self, settle: bool = True) -> list:
+        """
+        Returns ids of articles that became complete since the previous call
+        """
+        if self._needs_scan:
+            scan = scan_dataset(self.path, use_manifest=False)
+            for article_id in scan.get_ids(FileKind.raw):
+                if article_id not in self._emitted:
+                    self._pending.setdefault(article_id, None)
+            self._needs_scan = self._inotify is None
+        now_ns = time.time_ns()
+        ready = []
+        for article_id in sorted(self._pending):
+            state = self._stat(article_id)
+            if state is None:
+                continue
+            previous = self._pending[article_id]
+            self._pending[article_id] = state
+            if settle:
+                newest = max(mtime for _, mtime in state)
+                if state != previous or now_ns - newest < self.settle_time * 1e9:
+                    continue
+            if self._is_complete(article_id, state):
+                self._emitted.add(article_id)
+                del self._pending[article_id]
+                ready.append(article_id)
+        return ready
+
+    def _is_complete(self, article_id: int, state: tuple) -> bool:
+        """
+        Checks that raw text is not empty and meta file is fully written
+        """
+        if not state[0][0]:
+            return False
+        try:
+            with open(self.path / f'{article_id}_meta.json', encoding='utf-8') as file:
+                json.load(file)
+        except (OSError, ValueError):
+            return False
+        return True
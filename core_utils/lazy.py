@@ -0,0 +1,35 @@
+"""
+Lazy import of heavy dependencies
+"""
+import functools
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """
+    Returns a module that is actually executed on the first attribute access.
+    Use it for heavy dependencies that are not needed by every run
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {name!r}', name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+@functools.lru_cache(maxsize=None)
+def get_pyplot():
+    """
+    Imports matplotlib.pyplot with a non-interactive backend on the first call
+    """
+    import matplotlib  # pylint: disable=import-outside-toplevel
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+    return plt
@@ -0,0 +1,347 @@
+"""
+Inverted index from lemmas to articles and token positions
+"""
+import functools
+import itertools
+import json
+import struct
+from pathlib import Path
+
+from constants import CACHE_PATH
+from core_utils.corpus_statistics import LEMMA_POS_SEPARATOR, SINGLE_TAGGED_TOKEN_PATTERN
+from core_utils.dataset_scanner import FileKind, scan_dataset
+
+LEMMA_INDEX_PATH = CACHE_PATH / 'lemma_index.bin'
+MAGIC = b'LINDEX01'
+
+
+def encode_varints(values) -> bytes:
+    """
+    Encodes non-negative integers with a variable number of bytes: 7 bits per byte
+    """
+    result = bytearray()
+    for value in values:
+        while value >= 0x80:
+            result.append((value & 0x7F) | 0x80)
+            value >>= 7
+        result.append(value)
+    return bytes(result)
+
+
+def decode_varints(data: bytes) -> list:
+    """
+    Decodes integers encoded with encode_varints
+    """
+    values = []
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = 0
+            shift = 0
+    return values
+
+
+def iter_varints(data: bytes):
+    """
+    Lazily decodes integers encoded with encode_varints
+    """
+    value = 0
+    shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = 0
+            shift = 0
+
+
+def get_term(lemma: str, pos: str = None) -> str:
+    """
+    Returns an index term for a lemma or a lemma with a part of speech
+    """
+    return lemma if pos is None else f'{lemma}{LEMMA_POS_SEPARATOR}{pos}'
+
+
+class PostingList:
+    """
+    Articles and positions of a term. Both streams are delta-encoded varints:
+    documents stream stores (article id delta, number of positions) pairs,
+    positions stream stores position deltas inside each article
+    """
+
+    def __init__(self, documents: bytes = b'', positions: bytes = b'', last_id: int = -1):
+        self.documents = bytearray(documents)
+        self.positions = bytearray(positions)
+        self.last_id = last_id
+
+    def append(self, article_id: int, positions: list) -> None:
+        """
+        Adds an article with a bigger id than all the indexed ones
+        """
+        self.documents += encode_varints((article_id - self.last_id - 1, len(positions)))
+        self.positions += encode_varints(current - previous for previous, current
+                                         in zip([0] + positions, positions))
+        self.last_id = article_id
+
+    def decode_ids(self) -> list:
+        """
+        Returns ids of articles containing the term
+        """
+        values = decode_varints(self.documents)
+        ids = []
+        article_id = -1
+        for delta in values[::2]:
+            article_id += delta + 1
+            ids.append(article_id)
+        return ids
+
+    def decode(self) -> dict:
+        """
+        Returns {article_id: [positions]}
+        """
+        values = decode_varints(self.documents)
+        deltas = decode_varints(self.positions)
+        result = {}
+        article_id = -1
+        offset = 0
+        for delta, count in zip(values[::2], values[1::2]):
+            article_id += delta + 1
+            positions = []
+            position = 0
+            for position_delta in deltas[offset:offset + count]:
+                position += position_delta
+                positions.append(position)
+            result[article_id] = positions
+            offset += count
+        return result
+
+    def iter_decode(self, start_id: int = 0):
+        """
+        Lazily yields (article_id, [positions]) for articles with ids not less than start_id
+        """
+        documents = iter_varints(self.documents)
+        deltas = iter_varints(self.positions)
+        article_id = -1
+        for delta in documents:
+            article_id += delta + 1
+            count = next(documents, None)
+            if count is None:
+                raise ValueError(f'Documents stream is truncated after article {article_id}')
+            positions = list(itertools.accumulate(itertools.islice(deltas, count)))
+            if article_id >= start_id:
+                yield article_id, positions
+
+    @classmethod
+    def from_dict(cls, postings: dict):
+        """
+        Encodes {article_id: [positions]}
+        """
+        posting_list = cls()
+        for article_id in sorted(postings):
+            posting_list.append(article_id, postings[article_id])
+        return posting_list
+
+
+class LemmaIndex:
+    """
+    Compressed positional inverted index over N_single_tagged.txt files.
+    Each token is indexed by its lemma and by its lemma with a part of speech
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        self._postings = {}
+        self.indexed_ids = set()
+        self._decode_ids = functools.lru_cache(maxsize=cache_size)(self._decode_term_ids)
+        self._decode = functools.lru_cache(maxsize=cache_size)(self._decode_term)
+
+    def add_article(self, article_id: int, single_tagged_text: str) -> None:
+        """
+        Indexes tokens of a single-tagged text. Already indexed articles are skipped,
+        remove them with remove_articles() to index a new version
+        """
+        if article_id in self.indexed_ids:
+            return
+        occurrences = {}
+        for position, (lemma, pos) in enumerate(SINGLE_TAGGED_TOKEN_PATTERN.findall(single_tagged_text)):
+            occurrences.setdefault(get_term(lemma), []).append(position)
+            occurrences.setdefault(get_term(lemma, pos), []).append(position)
+
+        for term, positions in occurrences.items():
+            posting_list = self._postings.get(term)
+            if posting_list is None:
+                posting_list = self._postings[term] = PostingList()
+            if article_id > posting_list.last_id:
+                posting_list.append(article_id, positions)
+            else:
+                postings = posting_list.decode()
+                postings[article_id] = positions
+                self._postings[term] = PostingList.from_dict(postings)
+        self.indexed_ids.add(article_id)
+        self._decode_ids.cache_clear()
+        self._decode.cache_clear()
+
+    def remove_articles(self, article_ids) -> None:
+        """
+        Removes postings of articles, e.g. before indexing their new versions.
+        Every posting list is checked, so articles should be removed in batches
+        """
+        article_ids = set(article_ids) & self.indexed_ids
+        if not article_ids:
+            return
+        for term in list(self._postings):
+            posting_list = self._postings[term]
+            if article_ids.isdisjoint(posting_list.decode_ids()):
+                continue
+            postings = posting_list.decode()
+            for article_id in article_ids:
+                postings.pop(article_id, None)
+            if postings:
+                self._postings[term] = PostingList.from_dict(postings)
+            else:
+                del self._postings[term]
+        self.indexed_ids -= article_ids
+        self._decode_ids.cache_clear()
+        self._decode.cache_clear()
+
+    def update(self, dataset_path: Path) -> int:
+        """
+        Indexes single-tagged articles that are not indexed yet, returns their number
+        """
+        dataset_path = Path(dataset_path)
+        scan = scan_dataset(dataset_path, use_manifest=False)
+        new_ids = [article_id for article_id in scan.get_ids(FileKind.single_tagged)
+                   if article_id not in self.indexed_ids]
+        for article_id in new_ids:
+            with open(dataset_path / f'{article_id}_single_tagged.txt', encoding='utf-8') as file:
+                self.add_article(article_id, file.read())
+        return len(new_ids)
+
+    def lookup(self, lemma: str, pos: str = None) -> list:
+        """
+        Returns sorted ids of articles containing a lemma
+        """
+        return self._decode_ids(get_term(lemma, pos))
+
+    def get_positions(self, lemma: str, pos: str = None) -> dict:
+        """
+        Returns {article_id: [positions]} of a lemma
+        """
+        return self._decode(get_term(lemma, pos))
+
+    def iter_positions(self, lemma: str, pos: str = None, start_id: int = 0):
+        """
+        Lazily yields (article_id, [positions]) of a lemma without decoding the whole posting list
+        """
+        posting_list = self._postings.get(get_term(lemma, pos))
+        if posting_list is not None:
+            yield from posting_list.iter_decode(start_id)
+
+    def search(self, must: list = (), should: list = (), must_not: list = ()) -> list:
+        """
+        Boolean query: articles containing all of must terms, at least one of should terms
+        (if given) and none of must_not terms. Terms are lemmas or (lemma, pos) tuples
+        """
+        result = None
+        for term in sorted(must, key=lambda term: len(self._lookup_term(term))):
+            ids = set(self._lookup_term(term))
+            result = ids if result is None else result & ids
+            if not result:
+                return []
+        if should:
+            any_ids = set().union(*(self._lookup_term(term) for term in should))
+            result = any_ids if result is None else result & any_ids
+        if result is None:
+            return []
+        for term in must_not:
+            result -= set(self._lookup_term(term))
+        return sorted(result)
+
+    def search_phrase(self, lemmas: list, pos: list = None) -> dict:
+        """
+        Returns {article_id: [start positions]} of consecutive lemmas,
+        pos optionally restricts parts of speech of each lemma
+        """
+        pos = pos or [None] * len(lemmas)
+        candidates = self.search(must=list(zip(lemmas, pos)))
+        postings = [self.get_positions(lemma, tag) for lemma, tag in zip(lemmas, pos)]
+        result = {}
+        for article_id in candidates:
+            starts = set(postings[0][article_id])
+            for offset, term_postings in enumerate(postings[1:], start=1):
+                starts &= {position - offset for position in term_postings[article_id]}
+                if not starts:
+                    break
+            if starts:
+                result[article_id] = sorted(starts)
+        return result
+
+    def save(self, path: Path = LEMMA_INDEX_PATH) -> None:
+        """
+        Saves the index: json header with terms offsets followed by posting lists
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        terms = {}
+        blob = bytearray()
+        for term, posting_list in self._postings.items():
+            terms[term] = [len(blob), len(posting_list.documents), len(posting_list.positions),
+                           posting_list.last_id]
+            blob += posting_list.documents
+            blob += posting_list.positions
+        header = json.dumps({'terms': terms, 'indexed_ids': sorted(self.indexed_ids)},
+                            ensure_ascii=False).encode('utf-8')
+        with open(path, 'wb') as file:
+            file.write(MAGIC)
+            file.write(struct.pack('<Q', len(header)))
+            file.write(header)
+            file.write(blob)
+
+    @classmethod
+    def load(cls, path: Path = LEMMA_INDEX_PATH):
+        """
+        Loads an index saved with save(), returns an empty index if there is no file
+        """
+        index = cls()
+        path = Path(path)
+        if not path.exists():
+            return index
+        with open(path, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a lemma index file')
+            header_size, = struct.unpack('<Q', file.read(8))
+            header = json.loads(file.read(header_size).decode('utf-8'))
+            blob = file.read()
+        for term, (offset, documents_size, positions_size, last_id) in header['terms'].items():
+            positions_offset = offset + documents_size
+            index._postings[term] = PostingList(blob[offset:positions_offset],
+                                                blob[positions_offset:positions_offset + positions_size],
+                                                last_id)
+        index.indexed_ids = set(header['indexed_ids'])
+        return index
+
+    def _lookup_term(self, term) -> list:
+        """
+        Returns article ids for a lemma or a (lemma, pos) tuple
+        """
+        return self.lookup(*term) if isinstance(term, tuple) else self.lookup(term)
+
+    def _decode_term_ids(self, term: str) -> list:
+        """
+        Decodes article ids of a term
+        """
+        posting_list = self._postings.get(term)
+        return posting_list.decode_ids() if posting_list else []
+
+    def _decode_term(self, term: str) -> dict:
+        """
+        Decodes positions of a term
+        """
+        posting_list = self._postings.get(term)
+        return posting_list.decode() if posting_list else {}
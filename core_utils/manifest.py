@@ -0,0 +1,139 @@
+"""
+Processing manifest implementation
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from constants import CACHE_PATH
+from core_utils.article import ArtifactType
+
+PROCESSING_MANIFEST_PATH = CACHE_PATH / 'processing_manifest.json'
+
+ANALYZER_PACKAGES = ('pymystem3', 'pymorphy2', 'pymorphy2-dicts-ru')
+
+ALL_ARTIFACTS = (
+    ArtifactType.cleaned,
+    ArtifactType.single_tagged,
+    ArtifactType.multiple_tagged
+)
+
+
+def get_analyzer_versions() -> dict:
+    """
+    Returns versions of installed morphological analyzers
+    """
+    from importlib import metadata  # pylint: disable=import-outside-toplevel
+    versions = {}
+    for package in ANALYZER_PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def get_file_hash(path: Path) -> str:
+    """
+    Returns SHA-256 hex digest of a file content
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dump_json_atomically(data, path: Path) -> None:
+    """
+    Writes json to a temporary file first and then replaces the target,
+    so that an interrupted run never leaves a half-written file
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class ProcessingManifest:
+    """
+    Remembers which raw articles are already processed.
+    An article is up to date when its raw text hash, analyzers versions
+    and pipeline settings are the same as during the previous run
+    and all its artifacts exist
+    """
+
+    def __init__(self, settings: dict = None, force: bool = False,
+                 path: Path = PROCESSING_MANIFEST_PATH):
+        self.path = Path(path)
+        self.force = force
+        self.fingerprint = {
+            'analyzers': get_analyzer_versions(),
+            'settings': settings or {}
+        }
+        self._entries = {}
+        self._hashes = {}
+        self._load()
+
+    def _load(self):
+        """
+        Loads entries of the previous run if they were made with the same fingerprint
+        """
+        if self.force or not self.path.exists():
+            return
+        with open(self.path, encoding='utf-8') as file:
+            try:
+                manifest = json.load(file)
+            except json.JSONDecodeError:
+                return
+        if manifest.get('fingerprint') == self.fingerprint:
+            self._entries = manifest.get('articles', {})
+
+    def _get_raw_hash(self, article, stat: os.stat_result) -> str:
+        """
+        Returns raw text hash reusing the stored or the last computed one
+        if file size and mtime did not change
+        """
+        key = str(article.article_id)
+        entry = self._entries.get(key, {})
+        if entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime_ns:
+            return entry['raw_hash']
+        size, mtime, raw_hash = self._hashes.get(key, (None, None, None))
+        if size != stat.st_size or mtime != stat.st_mtime_ns:
+            raw_hash = get_file_hash(article.get_raw_text_path())
+            self._hashes[key] = (stat.st_size, stat.st_mtime_ns, raw_hash)
+        return raw_hash
+
+    def is_up_to_date(self, article, kinds: tuple = ALL_ARTIFACTS) -> bool:
+        """
+        Checks whether an article can be skipped by the pipeline
+        """
+        if self.force:
+            return False
+        entry = self._entries.get(str(article.article_id))
+        if not entry or not set(kinds).issubset(entry['artifacts']):
+            return False
+        if not all(article.get_file_path(kind).exists() for kind in kinds):
+            return False
+        return entry['raw_hash'] == self._get_raw_hash(article, article.get_raw_text_path().stat())
+
+    def register(self, article, kinds: tuple = ALL_ARTIFACTS) -> None:
+        """
+        Marks an article as processed
+        """
+        stat = article.get_raw_text_path().stat()
+        self._entries[str(article.article_id)] = {
+            'raw_hash': self._get_raw_hash(article, stat),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'artifacts': list(kinds)
+        }
+
+    def save(self) -> None:
+        """
+        Saves manifest to the disk
+        """
+        dump_json_atomically({'fingerprint': self.fingerprint,
+                              'articles': self._entries}, self.path)
@@ -0,0 +1,538 @@
+"""
+Morphological analyzers with deferred initialisation
+"""
+import abc
+import functools
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from core_utils.article import ArtifactType
+from core_utils.manifest import ALL_ARTIFACTS
+
+
+def _create_mystem():
+    """
+    Returns a new Mystem instance with its own process
+    """
+    from pymystem3 import Mystem  # pylint: disable=import-outside-toplevel
+    return Mystem()
+
+
+@functools.lru_cache(maxsize=None)
+def get_mystem():
+    """
+    Returns a shared Mystem instance, the binary is started on the first call only
+    """
+    return _create_mystem()
+
+
+@functools.lru_cache(maxsize=None)
+def get_morph_analyzer():
+    """
+    Returns a shared pymorphy2 analyzer, dictionaries are loaded on the first call only
+    """
+    import pymorphy2  # pylint: disable=import-outside-toplevel
+    return pymorphy2.MorphAnalyzer()
+
+
+class MystemTimeoutError(Exception):
+    """
+    Mystem did not answer in time, the process was restarted
+    """
+
+
+class RestartReason:
+    """
+    Why a Mystem process was replaced
+    """
+    timeout = 'timeout'
+    error = 'error'
+    calls = 'calls'
+    megabytes = 'megabytes'
+
+
+class MystemLimits:
+    """
+    Limits of a supervised Mystem process
+    param: timeout is the maximum duration of a call in seconds
+    param: max_calls and max_megabytes of analyzed text make the process be replaced
+    """
+
+    def __init__(self, timeout: float = 30.0, max_calls: int = 10000, max_megabytes: float = 100.0):
+        self.timeout = timeout
+        self.max_calls = max_calls
+        self.max_bytes = int(max_megabytes * 2 ** 20)
+
+
+class _MystemWorker:
+    """
+    Mystem instance with a thread that performs its calls
+    """
+
+    def __init__(self, mystem):
+        self.mystem = mystem
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.calls = 0
+        self.processed_bytes = 0
+
+    @classmethod
+    def start(cls, factory, warmup_text: str, timeout: float):
+        """
+        Creates an instance and makes it start its process analyzing warmup_text in its thread.
+        Raises MystemTimeoutError and stops the process if the warmup takes longer than timeout
+        """
+        worker = cls(factory())
+        if not warmup_text:
+            return worker
+        try:
+            worker.executor.submit(worker.mystem.analyze, warmup_text).result(timeout=timeout)
+        except FutureTimeoutError as error:
+            worker.close()
+            raise MystemTimeoutError(f'Mystem did not start in {timeout} seconds') from error
+        except Exception:
+            worker.close()
+            raise
+        return worker
+
+    def close(self) -> None:
+        """
+        Stops the Mystem process, which also unblocks a call hanging in the thread
+        """
+        close = getattr(self.mystem, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception:  # pylint: disable=broad-except
+                pass
+        self.executor.shutdown(wait=False)
+
+
+class _StandbyWorkers:
+    """
+    Keeps size Mystem workers started in background threads, ready to replace the active one
+    """
+
+    def __init__(self, start_worker, size: int):
+        self.start_worker = start_worker
+        self.size = size
+        self.closed = False
+        self._ready = queue.Queue()
+        self._starting = 0
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        """
+        Starts a standby worker, is run in a background thread
+        """
+        try:
+            worker = self.start_worker()
+        except Exception:  # pylint: disable=broad-except
+            worker = None
+        with self._lock:
+            self._starting -= 1
+            if worker is not None and not self.closed:
+                self._ready.put(worker)
+                return
+        if worker is not None:
+            worker.close()
+
+    def fill(self) -> None:
+        """
+        Starts as many workers as needed to have size of them
+        """
+        with self._lock:
+            missing = max(self.size - self._ready.qsize() - self._starting, 0)
+            self._starting += missing
+        for _ in range(missing):
+            threading.Thread(target=self._start, daemon=True).start()
+
+    def take(self, timeout: float):
+        """
+        Returns a ready worker, waiting up to timeout seconds for one that is starting.
+        Returns None if there are none
+        """
+        with self._lock:
+            starting = self._starting
+        try:
+            return self._ready.get(timeout=timeout if starting else 0.0)
+        except queue.Empty:
+            return None
+
+    def close(self) -> list:
+        """
+        Stops starting new workers, returns the ready ones
+        """
+        with self._lock:
+            self.closed = True
+            workers = []
+            while not self._ready.empty():
+                workers.append(self._ready.get_nowait())
+        return workers
+
+
+class SupervisedMystem:
+    """
+    Mystem wrapper with the same analyze() method that guards the pipeline against
+    hanging or leaking Mystem processes:
+        - each call is limited by limits.timeout seconds, after that MystemTimeoutError is raised;
+        - the process is replaced after a timeout, an error, limits.max_calls calls
+          or limits.max_megabytes of analyzed text;
+        - standby instances are started in background, so a replacement is ready at once.
+    factory returns a new Mystem instance, warmup_text is analyzed by a new instance
+    to start its process before it is used
+    """
+
+    def __init__(self, factory=None, limits: MystemLimits = None, standby: int = 1,
+                 warmup_text: str = 'мама мыла раму'):
+        self.limits = limits or MystemLimits()
+        self._workers = _StandbyWorkers(functools.partial(_MystemWorker.start, factory or _create_mystem,
+                                                          warmup_text, self.limits.timeout), standby)
+        self._active = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=10000)
+        self._stats = {'calls': 0, 'timeouts': 0, 'errors': 0, 'cold_starts': 0,
+                       'restarts': {reason: 0 for reason in ('timeout', 'error', 'calls', 'megabytes')}}
+        self._workers.fill()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _get_worker(self) -> _MystemWorker:
+        """
+        Returns the active instance, takes a standby one (waiting for one that is starting)
+        or starts a new one if there are none
+        """
+        if self._active is None:
+            self._active = self._workers.take(self.limits.timeout)
+            if self._active is None:
+                self._stats['cold_starts'] += 1
+                self._active = self._workers.start_worker()
+            self._workers.fill()
+        return self._active
+
+    def _restart(self, reason: str) -> None:
+        """
+        Retires the active instance, its process is stopped in background
+        """
+        worker, self._active = self._active, None
+        self._stats['restarts'][reason] += 1
+        threading.Thread(target=worker.close, daemon=True).start()
+
+    def analyze(self, text: str) -> list:
+        """
+        Analyzes a text with Mystem, calls are performed one at a time
+        """
+        with self._lock:
+            if self._workers.closed:
+                raise RuntimeError('SupervisedMystem is closed')
+            worker = self._get_worker()
+            start = time.perf_counter()
+            future = worker.executor.submit(worker.mystem.analyze, text)
+            try:
+                result = future.result(timeout=self.limits.timeout)
+            except FutureTimeoutError as error:
+                self._stats['timeouts'] += 1
+                self._restart(RestartReason.timeout)
+                raise MystemTimeoutError(f'Mystem did not answer in {self.limits.timeout} seconds '
+                                         f'on a text of {len(text)} characters') from error
+            except Exception:
+                self._stats['errors'] += 1
+                self._restart(RestartReason.error)
+                raise
+            self._latencies.append(time.perf_counter() - start)
+            self._stats['calls'] += 1
+            worker.calls += 1
+            worker.processed_bytes += len(text.encode('utf-8'))
+            if worker.calls >= self.limits.max_calls:
+                self._restart(RestartReason.calls)
+            elif worker.processed_bytes >= self.limits.max_bytes:
+                self._restart(RestartReason.megabytes)
+            return result
+
+    def get_stats(self) -> dict:
+        """
+        Returns numbers of calls, timeouts, restarts by reason and latency percentiles
+        """
+        latencies = sorted(self._latencies)
+        stats = dict(self._stats, restarts=dict(self._stats['restarts']))
+        stats['restarts_total'] = sum(stats['restarts'].values())
+        for name, fraction in (('latency_p50', 0.5), ('latency_p99', 0.99)):
+            stats[name] = latencies[min(int(fraction * len(latencies)), len(latencies) - 1)] \
+                if latencies else None
+        return stats
+
+    def close(self) -> None:
+        """
+        Stops active and standby processes
+        """
+        with self._lock:
+            workers = self._workers.close()
+            if self._active is not None:
+                workers.append(self._active)
+            self._active = None
+        for worker in workers:
+            worker.close()
+
+
+MYSTEM_BATCH_SEPARATOR = 'zzbatchseparatorzz'
+# Full stops around the separator word end sentences on both sides,
+# so joined lines do not share disambiguation context
+SEPARATOR_PUNCTUATION = ' . '
+MYSTEM_BATCH_JOINER = f'{SEPARATOR_PUNCTUATION}{MYSTEM_BATCH_SEPARATOR}{SEPARATOR_PUNCTUATION}'
+
+
+def _remove_joiner(part: list, first: bool, last: bool):
+    """
+    Removes full stops that were added around separator words.
+    Returns None if they are not where they are expected
+    """
+    part = list(part)
+    if not first:
+        if not part or not part[0]['text'].startswith(SEPARATOR_PUNCTUATION):
+            return None
+        part[0] = dict(part[0], text=part[0]['text'][len(SEPARATOR_PUNCTUATION):])
+    if not last:
+        if not part or not part[-1]['text'].endswith(SEPARATOR_PUNCTUATION):
+            return None
+        part[-1] = dict(part[-1], text=part[-1]['text'][:-len(SEPARATOR_PUNCTUATION)])
+    return [item for item in part if item['text'] or 'analysis' in item]
+
+
+def _analyze_lines(mystem, lines: list):
+    """
+    Analyzes lines with a single Mystem call, returns analyses of lines without line breaks
+    or None if the output can not be split back
+    """
+    items = mystem.analyze(MYSTEM_BATCH_JOINER.join(lines))
+    if items and items[-1]['text'] == '\n':
+        items = items[:-1]
+    parts = [[]]
+    for item in items:
+        if item['text'] == MYSTEM_BATCH_SEPARATOR:
+            parts.append([])
+        else:
+            parts[-1].append(item)
+    if len(parts) != len(lines):
+        return None
+    parts = [_remove_joiner(part, index == 0, index == len(parts) - 1) for index, part in enumerate(parts)]
+    return None if None in parts else parts
+
+
+def analyze_batch(mystem, texts: list) -> list:
+    """
+    Analyzes texts with a single Mystem call, returns a list of analyses, one per text,
+    in the same format as Mystem.analyze of each text.
+    Mystem.analyze makes a round trip to the process for every line of input,
+    so all lines of all texts are put on one line joined with a separator sentence.
+    Objects that batch by themselves, like MystemCache, provide analyze_many(texts)
+    """
+    analyze_many = getattr(mystem, 'analyze_many', None)
+    if analyze_many is not None:
+        return analyze_many(texts)
+    text_lines = [text.splitlines() for text in texts]
+    lines = [line for line_list in text_lines for line in line_list]
+    parts = _analyze_lines(mystem, lines) if len(lines) > 1 else None
+    if parts is None:
+        return [mystem.analyze(text) for text in texts]
+    parts = iter(parts)
+    results = []
+    for line_list in text_lines:
+        result = []
+        for part in itertools.islice(parts, len(line_list)):
+            result.extend(part)
+            result.append({'text': '\n'})
+        results.append(result)
+    return results
+
+
+class AnalyzedToken:
+    """
+    Token with the information needed for cleaned, single-tagged and multiple-tagged texts.
+    Tokens without a lemma, e.g. numbers, appear in cleaned texts only.
+    PyMorphy tags are set by PymorphyBackend
+    """
+
+    def __init__(self, word: str, cleaned: str, lemma: str = None, mystem_tags: str = None):
+        self.word = word
+        self.cleaned = cleaned
+        self.lemma = lemma
+        self.mystem_tags = mystem_tags
+        self.pymorphy_tags = None
+
+    @property
+    def tagged(self) -> bool:
+        """
+        Checks whether a token has a lemma and appears in tagged texts
+        """
+        return self.lemma is not None
+
+    def get_cleaned(self) -> str:
+        """
+        Returns lowercased original form of a token
+        """
+        return self.cleaned
+
+    def get_single_tagged(self) -> str:
+        """
+        Returns normalized lemma with MyStem tags
+        """
+        lemma = self.lemma or self.cleaned
+        return f'{lemma}<{self.mystem_tags}>' if self.mystem_tags is not None else lemma
+
+    def get_multiple_tagged(self) -> str:
+        """
+        Returns normalized lemma with MyStem and PyMorphy tags
+        """
+        return f'{self.get_single_tagged()}({self.pymorphy_tags or ""})'
+
+
+class AnalyzerBackend(abc.ABC):
+    """
+    Common interface of analyzers: analyze(texts) takes a batch of texts
+    and returns a list of AnalyzedToken lists, one per text
+    """
+
+    @abc.abstractmethod
+    def analyze(self, texts: list) -> list:
+        """
+        Analyzes a batch of texts
+        """
+
+    def close(self) -> None:
+        """
+        Releases resources of a backend
+        """
+
+
+class RegexTokenizerBackend(AnalyzerBackend):
+    """
+    Splits cleaned texts into tokens without any morphology, the cheapest backend
+    """
+
+    def analyze(self, texts: list) -> list:
+        from core_utils.cleaning import clean_text  # pylint: disable=import-outside-toplevel
+        return [[AnalyzedToken(word, word) for word in clean_text(text).split()] for text in texts]
+
+
+class MystemBackend(AnalyzerBackend):
+    """
+    Tokenizes and lemmatizes with Mystem. A batch is analyzed with a single call
+    of analyze_batch(). Cleaned forms are made with clean_text, so cleaned texts are the same
+    as those of RegexTokenizerBackend: words with hyphens are split, numbers are kept.
+    mystem is any object with Mystem.analyze, e.g. SupervisedMystem or MystemCache
+    """
+
+    def __init__(self, mystem=None):
+        self.mystem = mystem if mystem is not None else get_mystem()
+
+    @staticmethod
+    def _to_tokens(analysis: list) -> list:
+        """
+        Converts Mystem output of a text into tokens
+        """
+        from core_utils.cleaning import clean_text  # pylint: disable=import-outside-toplevel
+        tokens = []
+        for item in analysis:
+            cleaned = clean_text(item['text'])
+            if not cleaned:
+                continue
+            if 'analysis' not in item:
+                tokens.extend(AnalyzedToken(word, word) for word in cleaned.split())
+            elif item['analysis']:
+                tokens.append(AnalyzedToken(item['text'], cleaned, item['analysis'][0]['lex'],
+                                            item['analysis'][0]['gr']))
+            else:
+                tokens.append(AnalyzedToken(item['text'], cleaned, cleaned))
+        return tokens
+
+    def analyze(self, texts: list) -> list:
+        return [self._to_tokens(analysis) for analysis in analyze_batch(self.mystem, texts)]
+
+
+class PymorphyBackend(AnalyzerBackend):
+    """
+    Lemmatizes and tags with PyMorphy. Besides analyze(texts), annotate() adds
+    PyMorphy tags to tokens produced by another backend.
+    A batch usually repeats the same forms many times, so each distinct form
+    is parsed once and the result is projected back onto tokens
+    """
+
+    def __init__(self, morph=None):
+        self.morph = morph if morph is not None else get_morph_analyzer()
+
+    def analyze_forms(self, forms) -> dict:
+        """
+        Returns {form: (normal form, tags)} parsing each distinct form once
+        """
+        result = {}
+        for form in set(forms):
+            parse = self.morph.parse(form)[0]
+            result[form] = (parse.normal_form, str(parse.tag))
+        return result
+
+    def annotate(self, token_lists: list) -> None:
+        """
+        Sets PyMorphy tags of the lowercased word form of each tagged token
+        """
+        forms = self.analyze_forms(token.word.lower() for tokens in token_lists
+                                   for token in tokens if token.tagged)
+        for tokens in token_lists:
+            for token in tokens:
+                if token.tagged:
+                    token.pymorphy_tags = forms[token.word.lower()][1]
+
+    def analyze(self, texts: list) -> list:
+        token_lists = RegexTokenizerBackend().analyze(texts)
+        forms = self.analyze_forms(token.cleaned for tokens in token_lists for token in tokens)
+        for tokens in token_lists:
+            for token in tokens:
+                token.lemma, token.pymorphy_tags = forms[token.cleaned]
+        return token_lists
+
+
+class ArtifactAnalyzer:
+    """
+    Chooses the cheapest backends for the requested artifacts:
+        - cleaned only: regex tokenizer, no morphology at all;
+        - single_tagged: Mystem;
+        - multiple_tagged: Mystem with PyMorphy tags
+    """
+
+    def __init__(self, artifacts: tuple = ALL_ARTIFACTS, mystem=None, morph=None):
+        unknown = set(artifacts) - set(ALL_ARTIFACTS)
+        if unknown:
+            raise ValueError(f'Unknown artifacts {sorted(unknown)}')
+        self.artifacts = tuple(kind for kind in ALL_ARTIFACTS if kind in artifacts)
+        tagged = {ArtifactType.single_tagged, ArtifactType.multiple_tagged} & set(self.artifacts)
+        self.tokenizer = MystemBackend(mystem) if tagged else RegexTokenizerBackend()
+        self.tagger = PymorphyBackend(morph) if ArtifactType.multiple_tagged in self.artifacts else None
+
+    def analyze(self, texts: list) -> list:
+        """
+        Returns AnalyzedToken lists of a batch of texts
+        """
+        token_lists = self.tokenizer.analyze(texts)
+        if self.tagger is not None:
+            self.tagger.annotate(token_lists)
+        return token_lists
+
+    def render(self, tokens: list) -> dict:
+        """
+        Returns {artifact kind: text} for tokens of a single text
+        """
+        formatters = {
+            ArtifactType.cleaned: AnalyzedToken.get_cleaned,
+            ArtifactType.single_tagged: AnalyzedToken.get_single_tagged,
+            ArtifactType.multiple_tagged: AnalyzedToken.get_multiple_tagged
+        }
+        return {kind: ' '.join(formatters[kind](token) for token in tokens
+                               if token.tagged or kind == ArtifactType.cleaned)
+                for kind in self.artifacts}
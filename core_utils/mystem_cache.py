@@ -0,0 +1,199 @@
+"""
+Persistent cache of Mystem analysis results
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from constants import CACHE_PATH
+from core_utils.manifest import get_analyzer_versions
+from core_utils.morphology import analyze_batch
+
+MYSTEM_CACHE_PATH = CACHE_PATH / 'mystem_cache.sqlite'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+SENTENCE_BOUNDARY = re.compile(r'((?<=[.!?…])\s+|\s*\n\s*)')
+
+
+def split_sentences(text: str) -> list:
+    """
+    Splits text into sentences and whitespace separators between them:
+    [sentence, separator, sentence, ...]. Mystem analyzes each line separately,
+    so line breaks end sentences too
+    """
+    return SENTENCE_BOUNDARY.split(text)
+
+
+def normalize_sentence(sentence: str) -> str:
+    """
+    Collapses whitespace, so that the same sentence with different line breaks has the same key
+    """
+    return ' '.join(sentence.split())
+
+
+class MystemCache:
+    """
+    Content-addressed disk cache of Mystem analysis.
+    Mystem takes context into account, so results are cached for whole sentences
+    keyed by the hash of a normalized sentence and Mystem version.
+    When the cache grows over max_bytes, least recently used entries are evicted
+    """
+
+    def __init__(self, mystem, path: Path = MYSTEM_CACHE_PATH,
+                 max_bytes: int = DEFAULT_MAX_BYTES, version: str = None):
+        self._mystem = mystem
+        self.max_bytes = max_bytes
+        self.version = version or str(get_analyzer_versions()['pymystem3'])
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(path))
+        self._connection.execute('CREATE TABLE IF NOT EXISTS analysis ('
+                                 'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                                 'size INTEGER NOT NULL, last_used REAL NOT NULL)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS last_used_index ON analysis (last_used)')
+        self._total_bytes = self._connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM analysis').fetchone()[0]
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'hit_chars': 0,
+            'miss_chars': 0,
+            'lookup_seconds': 0.0,
+            'mystem_seconds': 0.0,
+            'evicted': 0
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def analyze(self, text: str) -> list:
+        """
+        Returns Mystem analysis of a text in the same format as Mystem.analyze
+        """
+        return self.analyze_many([text])[0]
+
+    def analyze_many(self, texts: list) -> list:
+        """
+        Returns Mystem analyses of texts. Sentences that are not cached yet are sent
+        to Mystem in a single call, and new results are committed right away,
+        so an interrupted run keeps everything analyzed before
+        """
+        chunks = [split_sentences(text) for text in texts]
+        sentences = {}
+        for text_chunks in chunks:
+            for chunk in text_chunks[::2]:
+                if chunk.strip():
+                    sentences.setdefault(normalize_sentence(chunk), None)
+        analyses = self._lookup(sentences)
+        missed = [sentence for sentence in sentences if sentence not in analyses]
+        if missed:
+            analyses.update(self._analyze_missed(missed))
+        self._connection.commit()
+
+        results = []
+        for text_chunks in chunks:
+            result = []
+            for index, chunk in enumerate(text_chunks):
+                if index % 2:
+                    result.append({'text': chunk})
+                elif chunk.strip():
+                    result.extend(analyses[normalize_sentence(chunk)])
+            result.append({'text': '\n'})
+            results.append(result)
+        return results
+
+    def get_stats(self) -> dict:
+        """
+        Returns hit rate and estimated time saved by the cache
+        """
+        stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        seconds_per_char = stats['mystem_seconds'] / stats['miss_chars'] if stats['miss_chars'] else 0.0
+        stats['seconds_saved'] = stats['hit_chars'] * seconds_per_char - stats['lookup_seconds']
+        return stats
+
+    def close(self) -> None:
+        """
+        Closes the cache
+        """
+        self._connection.commit()
+        self._connection.close()
+
+    def _get_key(self, sentence: str) -> str:
+        """
+        Returns a cache key for a normalized sentence
+        """
+        return hashlib.sha1(f'{self.version}\0{sentence}'.encode('utf-8')).hexdigest()
+
+    def _lookup(self, sentences) -> dict:
+        """
+        Returns {sentence: analysis} for sentences found in the cache
+        """
+        start = time.perf_counter()
+        found = {}
+        for sentence in sentences:
+            key = self._get_key(sentence)
+            row = self._connection.execute('SELECT value FROM analysis WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                continue
+            self._connection.execute('UPDATE analysis SET last_used = ? WHERE key = ?', (time.time(), key))
+            found[sentence] = json.loads(row[0])
+            self.stats['hits'] += 1
+            self.stats['hit_chars'] += len(sentence)
+        self.stats['lookup_seconds'] += time.perf_counter() - start
+        return found
+
+    def _analyze_missed(self, sentences: list) -> dict:
+        """
+        Analyzes sentences with a single Mystem call and stores the results
+        """
+        start = time.perf_counter()
+        analyses = analyze_batch(self._mystem, sentences)
+        self.stats['mystem_seconds'] += time.perf_counter() - start
+        self.stats['misses'] += len(sentences)
+        self.stats['miss_chars'] += sum(map(len, sentences))
+
+        result = {}
+        for sentence, analysis in zip(sentences, analyses):
+            # Mystem appends a line break to the end of each analyzed input
+            if analysis and analysis[-1].get('text') == '\n':
+                analysis = analysis[:-1]
+            self._store(self._get_key(sentence), analysis)
+            result[sentence] = analysis
+        return result
+
+    def _store(self, key: str, analysis: list) -> None:
+        """
+        Saves analysis and evicts least recently used entries if the cache is full
+        """
+        value = json.dumps(analysis, ensure_ascii=False)
+        size = len(value.encode('utf-8'))
+        self._connection.execute('INSERT OR REPLACE INTO analysis VALUES (?, ?, ?, ?)',
+                                 (key, value, size, time.time()))
+        self._total_bytes += size
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Removes least recently used entries until the cache takes 90% of max_bytes
+        """
+        target = self.max_bytes * 0.9
+        rows = self._connection.execute('SELECT key, size FROM analysis ORDER BY last_used')
+        evicted = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+        self._connection.executemany('DELETE FROM analysis WHERE key = ?', evicted)
+        self.stats['evicted'] += len(evicted)
@@ -0,0 +1,346 @@
+"""
+N-gram frequencies and collocation measures over lemma ids of the binary token corpus
+"""
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from constants import CACHE_PATH
+from core_utils.concordance import get_tag_pos
+from core_utils.lazy import lazy_import
+from core_utils.pos_matrix import MYSTEM_POS_TAGS, TAG_INDEX
+from core_utils.token_corpus import TOKEN_CORPUS_PATH, TokenCorpus
+
+np = lazy_import('numpy')
+
+NGRAMS_PATH = CACHE_PATH / 'ngrams'
+POS_BITS = 4
+UNKNOWN_POS = len(MYSTEM_POS_TAGS)
+MEASURES = ('frequency', 'pmi', 'log_likelihood')
+
+
+def _get_token_bits(lemmas_number: int) -> int:
+    """
+    Returns the number of bits of a token key: lemma id followed by a part of speech index
+    """
+    return max((lemmas_number - 1).bit_length(), 1) + POS_BITS
+
+
+def _get_layout(size: int, token_bits: int) -> tuple:
+    """
+    Returns the number of token keys packed into a 64-bit word and the number of words of an n-gram
+    """
+    tokens_per_word = 64 // token_bits
+    return tokens_per_word, -(-size // tokens_per_word)
+
+
+def _unique_rows(rows, weights=None) -> tuple:
+    """
+    Returns sorted distinct rows of packed n-grams and their summed weights,
+    numbers of occurrences if weights are not given
+    """
+    if rows.shape[1] == 1 and weights is None:
+        unique, counts = np.unique(rows[:, 0], return_counts=True)
+        return unique[:, None], counts.astype(np.int64)
+    if weights is None:
+        weights = np.ones(len(rows), dtype=np.uint64)
+    if rows.shape[1] == 1:
+        unique, inverse = np.unique(rows[:, 0], return_inverse=True)
+        return unique[:, None], np.bincount(inverse, weights=weights,
+                                            minlength=len(unique)).astype(np.int64)
+    if rows.shape[0] == 0:
+        return rows, np.zeros(0, dtype=np.int64)
+    order = np.lexsort(rows.T[::-1])
+    rows = rows[order]
+    starts = np.flatnonzero(np.concatenate(([True], np.any(rows[1:] != rows[:-1], axis=1))))
+    return rows[starts], np.add.reduceat(weights[order], starts).astype(np.int64)
+
+
+def _get_token_keys(corpus: TokenCorpus, start_row: int, end_row: int):
+    """
+    Returns token keys of consecutive articles and a mask of tokens that start a new article
+    """
+    offsets = corpus.offsets[start_row:end_row]
+    start = offsets[0, 3]
+    end = offsets[-1, 3] + offsets[-1, 4]
+    lemmas = corpus.get_stream('lemmas')[start:end].astype(np.uint64)
+    tags = corpus.get_stream('tags')[start:end]
+    tag_pos = np.array([TAG_INDEX.get(get_tag_pos(tag), UNKNOWN_POS)
+                        for tag in corpus.vocabularies['tags']], dtype=np.uint64)
+    keys = (lemmas << np.uint64(POS_BITS)) | tag_pos[tags]
+    article_starts = np.zeros(len(keys), dtype=bool)
+    starts = offsets[:, 3] - start
+    # articles without lemmas at the end of a chunk start right after its last token
+    article_starts[starts[starts < len(keys)]] = True
+    return keys, article_starts
+
+
+def _pack_ngrams(keys, article_starts, size: int, token_bits: int):
+    """
+    Packs size consecutive token keys of the same article into rows of 64-bit words.
+    Bigrams of any vocabulary and trigrams of up to 2 ** 17 lemmas take a single word
+    """
+    tokens_per_word, words = _get_layout(size, token_bits)
+    if len(keys) < size:
+        return np.zeros((0, words), dtype=np.uint64)
+    length = len(keys) - size + 1
+    columns = [np.zeros(length, dtype=np.uint64) for _ in range(words)]
+    crosses = np.zeros(length, dtype=bool)
+    for index in range(size):
+        word = index // tokens_per_word
+        columns[word] = (columns[word] << np.uint64(token_bits)) | keys[index:index + length]
+        if index:
+            crosses |= article_starts[index:index + length]
+    if words == 1:
+        return columns[0][~crosses][:, None]
+    return np.stack(columns, axis=1)[~crosses]
+
+
+def _partition(packed, partitions: int):
+    """
+    Returns partition numbers of packed n-grams using multiplicative hashing
+    """
+    mixed = np.zeros(len(packed), dtype=np.uint64)
+    for column in packed.T:
+        mixed = (mixed ^ column) * np.uint64(0x9E3779B97F4A7C15)
+    return ((mixed >> np.uint64(40)) % np.uint64(partitions)).astype(np.int64)
+
+
+class CountingOptions:
+    """
+    Options of counting n-grams of a large corpus
+    param: workers is a number of processes counting chunks of articles
+    param: chunk_size is a number of articles counted at once by a worker
+    param: partitions is a number of parts n-gram counts are split into on disk
+    param: spill_path is a directory for temporary files, the system one by default
+    """
+
+    def __init__(self, workers: int = 1, chunk_size: int = 1000, partitions: int = 16,
+                 spill_path: Path = None):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.partitions = partitions
+        self.spill_path = spill_path
+
+
+class _ChunkCounter:
+    """
+    Counts n-grams of chunks of articles, possibly in worker processes,
+    spills their counts to disk and merges them partition by partition
+    """
+
+    def __init__(self, corpus_path: Path, size: int, partitions: int, spill_path: Path):
+        self.corpus_path = str(corpus_path)
+        self.size = size
+        self.partitions = partitions
+        self.spill_path = str(spill_path)
+
+    def count(self, start_row: int, end_row: int):
+        """
+        Counts n-grams of a chunk of articles and spills counts of each partition to disk.
+        Returns unigram counts of the chunk
+        """
+        with TokenCorpus(self.corpus_path) as corpus:
+            lemmas_number = len(corpus.vocabularies['lemmas'])
+            keys, article_starts = _get_token_keys(corpus, start_row, end_row)
+            unigrams = np.bincount(keys.astype(np.int64), minlength=lemmas_number << POS_BITS)
+            packed = _pack_ngrams(keys, article_starts, self.size, _get_token_bits(lemmas_number))
+            del keys, article_starts
+        partition_numbers = _partition(packed, self.partitions)
+        for partition in range(self.partitions):
+            ngrams, counts = _unique_rows(packed[partition_numbers == partition])
+            np.save(Path(self.spill_path) / f'{partition}_{start_row}.npy',
+                    np.column_stack([ngrams, counts.astype(np.uint64)]))
+        return unigrams
+
+    def count_chunks(self, chunks: list, workers: int):
+        """
+        Counts chunks of articles given as (start row, end row) pairs.
+        Returns the sum of their unigram counts
+        """
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self.count, start, end) for start, end in chunks]
+                return sum(future.result() for future in futures)
+        return sum(self.count(start, end) for start, end in chunks)
+
+    def merge(self, words: int, min_count: int) -> tuple:
+        """
+        Merges spilled counts of each partition, drops n-grams rarer than min_count.
+        Returns sorted n-grams and their counts
+        """
+        all_ngrams = [np.zeros((0, words), dtype=np.uint64)]
+        all_counts = [np.zeros(0, dtype=np.int64)]
+        for partition in range(self.partitions):
+            spills = [np.load(path) for path in Path(self.spill_path).glob(f'{partition}_*.npy')]
+            if not spills:
+                continue
+            merged = np.concatenate(spills)
+            ngrams, counts = _unique_rows(merged[:, :-1], merged[:, -1])
+            keep = counts >= min_count
+            all_ngrams.append(ngrams[keep])
+            all_counts.append(counts[keep])
+        ngrams = np.concatenate(all_ngrams)
+        counts = np.concatenate(all_counts)
+        order = np.argsort(ngrams[:, 0]) if words == 1 else np.lexsort(ngrams.T[::-1])
+        return ngrams[order], counts[order]
+
+
+class NgramStatistics:
+    """
+    Frequencies of lemma n-grams with their parts of speech.
+    Each n-gram is packed into a row of 64-bit integers, usually a single one,
+    so counting is done with NumPy.
+    Articles are counted in chunks, counts are spilled to disk split into partitions
+    by a hash of an n-gram and then each partition is merged separately,
+    so memory usage is bounded by the size of a partition
+    param: counted is a pair of packed n-grams and their counts
+    """
+
+    def __init__(self, size: int, lemmas, counted: tuple, unigrams):
+        ngrams, counts = counted
+        self.size = size
+        self.lemmas = np.asarray(lemmas, dtype=object)
+        self.token_bits = _get_token_bits(len(self.lemmas))
+        self.tokens_per_word, words = _get_layout(size, self.token_bits)
+        self.ngrams = np.asarray(ngrams, dtype=np.uint64).reshape(-1, words)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.unigrams = np.asarray(unigrams, dtype=np.int64)
+
+    @property
+    def total(self) -> int:
+        """
+        Returns the number of tokens in the corpus
+        """
+        return int(self.unigrams.sum())
+
+    @classmethod
+    def from_token_corpus(cls, size: int = 2, corpus_path: Path = TOKEN_CORPUS_PATH, min_count: int = 1,
+                          options: CountingOptions = None):
+        """
+        Counts n-grams of a binary token corpus
+        param: size is a number of tokens in an n-gram
+        param: min_count drops rare n-grams from the result
+        param: options set up workers, chunks and partitions, see CountingOptions
+        """
+        options = options or CountingOptions()
+        with TokenCorpus(corpus_path) as corpus:
+            lemmas = corpus.vocabularies['lemmas'].copy()
+            rows = len(corpus)
+
+        spill_path = Path(tempfile.mkdtemp(dir=options.spill_path))
+        counter = _ChunkCounter(corpus_path, size, options.partitions, spill_path)
+        try:
+            unigrams = np.zeros(len(lemmas) << POS_BITS, dtype=np.int64)
+            unigrams += counter.count_chunks([(start, min(start + options.chunk_size, rows))
+                                              for start in range(0, rows, options.chunk_size)],
+                                             options.workers)
+            counted = counter.merge(_get_layout(size, _get_token_bits(len(lemmas)))[1], min_count)
+        finally:
+            shutil.rmtree(spill_path, ignore_errors=True)
+        return cls(size, lemmas, counted, unigrams)
+
+    def _get_token_keys(self, index: int):
+        """
+        Returns token keys at a given place of each n-gram
+        """
+        word, place = divmod(index, self.tokens_per_word)
+        tokens_in_word = min(self.size - word * self.tokens_per_word, self.tokens_per_word)
+        shift = np.uint64(self.token_bits * (tokens_in_word - 1 - place))
+        mask = np.uint64((1 << self.token_bits) - 1)
+        return (self.ngrams[:, word] >> shift) & mask
+
+    def _get_scores(self, measure: str):
+        """
+        Returns association scores of all n-grams
+        """
+        if measure == 'frequency':
+            return self.counts.astype(np.float64)
+        members = [self.unigrams[self._get_token_keys(index).astype(np.int64)].astype(np.float64)
+                   for index in range(self.size)]
+        if measure == 'pmi':
+            expected = np.prod(members, axis=0) / float(self.total) ** (self.size - 1)
+            return np.log2(self.counts / expected)
+        if self.size != 2:
+            raise ValueError('Log-likelihood is defined for bigrams only')
+        return _log_likelihood(self.counts.astype(np.float64), members[0], members[1], float(self.total))
+
+    def _select(self, pattern: str, min_count: int):
+        """
+        Returns a mask of n-grams that occur at least min_count times and match a pattern
+        """
+        selected = self.counts >= min_count
+        if pattern is None:
+            return selected
+        tags = pattern.split('+')
+        if len(tags) != self.size or not set(tags).issubset(TAG_INDEX):
+            raise ValueError(f'Pattern {pattern!r} does not describe {self.size}-grams of MyStem tags')
+        pos_mask = np.uint64((1 << POS_BITS) - 1)
+        for index, tag in enumerate(tags):
+            selected &= (self._get_token_keys(index) & pos_mask) == np.uint64(TAG_INDEX[tag])
+        return selected
+
+    def _describe(self, candidates, scores) -> list:
+        """
+        Returns (lemmas, parts of speech, count, score) tuples of n-grams in the order of scores
+        """
+        token_keys = [self._get_token_keys(index)[candidates] for index in range(self.size)]
+        result = []
+        for position in np.argsort(-scores, kind='stable'):
+            keys = [int(index_keys[position]) for index_keys in token_keys]
+            result.append((tuple(self.lemmas[key >> POS_BITS] for key in keys),
+                           tuple((MYSTEM_POS_TAGS + ('',))[key & ((1 << POS_BITS) - 1)] for key in keys),
+                           int(self.counts[candidates[position]]),
+                           float(scores[position])))
+        return result
+
+    def top_k(self, k: int = 20, pattern: str = None, measure: str = 'frequency',
+              min_count: int = 1) -> list:
+        """
+        Returns k best n-grams as (lemmas, parts of speech, count, score) tuples
+        param: pattern is a sequence of parts of speech, e.g. 'A+S'
+        param: measure is one of 'frequency', 'pmi', 'log_likelihood'
+        param: min_count excludes rare n-grams, that have unreliably high PMI
+        """
+        if measure not in MEASURES:
+            raise ValueError(f'Unknown measure {measure!r}, expected one of {MEASURES}')
+        candidates = np.flatnonzero(self._select(pattern, min_count))
+        scores = self._get_scores(measure)[candidates]
+        if len(candidates) > k:
+            best = np.argpartition(-scores, k)[:k]
+            candidates, scores = candidates[best], scores[best]
+        return self._describe(candidates, scores)
+
+    def save(self, path: Path = None) -> None:
+        """
+        Saves statistics to a .npz file
+        """
+        path = Path(path or NGRAMS_PATH / f'{self.size}grams.npz')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, size=self.size, lemmas=self.lemmas.astype(str), ngrams=self.ngrams,
+                            counts=self.counts, unigrams=self.unigrams)
+
+    @classmethod
+    def load(cls, path: Path):
+        """
+        Loads statistics saved with save()
+        """
+        with np.load(path) as data:
+            return cls(int(data['size']), data['lemmas'].tolist(), (data['ngrams'], data['counts']),
+                       data['unigrams'])
+
+
+def _log_likelihood(joint, first, second, total):
+    """
+    Returns Dunning's log-likelihood ratio of bigrams from a 2x2 contingency table
+    """
+    observed = (joint, first - joint, second - joint, total - first - second + joint)
+    expected = (first * second / total, first * (total - second) / total,
+                (total - first) * second / total, (total - first) * (total - second) / total)
+    score = np.zeros_like(joint)
+    for observed_value, expected_value in zip(observed, expected):
+        positive = observed_value > 0
+        score[positive] += observed_value[positive] * np.log(observed_value[positive]
+                                                             / expected_value[positive])
+    return 2 * score
@@ -2,10 +2,6 @@
 PDF files downloader implementation
 """
 
-
-import wget
-import fitz
-
 from constants import ASSETS_PATH
 
 
@@ -24,12 +20,14 @@ class PDFRawFile:
         """
         Downloads PDF file by the URL given.
         """
+        import wget  # pylint: disable=import-outside-toplevel
         wget.download(self._url, str(ASSETS_PATH / f"{self._id}_raw.pdf"))
 
     def get_text(self):
         """
         Gets text from the PDF file downloaded.
         """
+        import fitz  # pylint: disable=import-outside-toplevel
         text = ""
         with fitz.open(ASSETS_PATH / f"{self._id}_raw.pdf") as pdf:
             for page in pdf:
@@ -0,0 +1,67 @@
+"""
+Part of speech frequencies counting
+"""
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+MYSTEM_POS_PATTERN = re.compile(r'<([A-Z]+)[,=>]')
+MYSTEM_TAGS_POS_PATTERN = re.compile(r'^[A-Z]+', re.MULTILINE)
+
+
+def count_pos_frequencies(single_tagged_text: str) -> dict:
+    """
+    Counts parts of speech in the content of N_single_tagged.txt
+    with a single scan of a compiled regular expression
+    """
+    return dict(Counter(MYSTEM_POS_PATTERN.findall(single_tagged_text)))
+
+
+class PosFrequencyCounter:
+    """
+    Counts parts of speech while tokens are produced by the pipeline,
+    so that tagged files do not have to be read again
+    """
+
+    def __init__(self):
+        self._counter = Counter()
+
+    def add(self, mystem_tags: str) -> None:
+        """
+        Registers a token by its Mystem tags, e.g. 'S,жен,од=им,ед'
+        """
+        match = MYSTEM_TAGS_POS_PATTERN.match(mystem_tags)
+        if match:
+            self._counter[match.group()] += 1
+
+    def update(self, mystem_tags: list) -> None:
+        """
+        Registers tokens of a whole text by their Mystem tags with a single regex scan
+        """
+        self._counter.update(MYSTEM_TAGS_POS_PATTERN.findall('\n'.join(mystem_tags)))
+
+    def get_frequencies(self) -> dict:
+        """
+        Returns frequencies of parts of speech
+        """
+        return dict(self._counter)
+
+
+def save_pos_frequencies(article, frequencies: dict) -> None:
+    """
+    Extends N_meta.json of an article with pos_frequencies
+    """
+    save_pos_frequencies_to_meta(article.get_meta_file_path(), frequencies)
+
+
+def save_pos_frequencies_to_meta(meta_path: Path, frequencies: dict) -> None:
+    """
+    Extends a meta file with pos_frequencies
+    """
+    with open(meta_path, encoding='utf-8') as meta_file:
+        meta = json.load(meta_file)
+    meta['pos_frequencies'] = frequencies
+    with open(meta_path, 'w', encoding='utf-8') as meta_file:
+        json.dump(meta, meta_file, sort_keys=False,
+                  indent=4, ensure_ascii=False, separators=(',', ': '))
@@ -0,0 +1,108 @@
+"""
+NumPy-backed matrix of part of speech frequencies
+"""
+import json
+from pathlib import Path
+
+from core_utils.lazy import lazy_import
+
+np = lazy_import('numpy')
+
+MYSTEM_POS_TAGS = ('A', 'ADV', 'ADVPRO', 'ANUM', 'APRO', 'COM', 'CONJ',
+                   'INTJ', 'NUM', 'PART', 'PR', 'S', 'SPRO', 'V')
+TAG_INDEX = {tag: index for index, tag in enumerate(MYSTEM_POS_TAGS)}
+
+
+class POSFrequencyMatrix:
+    """
+    Matrix of articles x MyStem parts of speech with frequencies of each tag in each article
+    """
+
+    def __init__(self, article_ids, counts, dates=None):
+        self.article_ids = np.asarray(article_ids, dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.int64).reshape(len(self.article_ids), len(MYSTEM_POS_TAGS))
+        self.dates = None if dates is None else np.asarray(dates, dtype='datetime64[s]')
+
+    @classmethod
+    def from_frequencies(cls, frequencies: dict, dates: dict = None):
+        """
+        Builds a matrix from {article_id: {tag: frequency}} and optional {article_id: datetime}.
+        Raises ValueError for tags that are not MyStem parts of speech
+        """
+        article_ids = sorted(frequencies)
+        counts = np.zeros((len(article_ids), len(MYSTEM_POS_TAGS)), dtype=np.int64)
+        for row, article_id in enumerate(article_ids):
+            for tag, frequency in frequencies[article_id].items():
+                if tag not in TAG_INDEX:
+                    raise ValueError(f'Article {article_id} has an unknown part of speech {tag!r}, '
+                                     f'expected one of: {", ".join(MYSTEM_POS_TAGS)}')
+                counts[row, TAG_INDEX[tag]] = frequency
+        article_dates = None if dates is None else [dates[article_id] for article_id in article_ids]
+        return cls(article_ids, counts, article_dates)
+
+    @classmethod
+    def from_articles(cls, articles):
+        """
+        Builds a matrix from pos_frequencies saved in meta files of Article instances
+        """
+        frequencies = {}
+        dates = {}
+        for article in articles:
+            with open(article.get_meta_file_path(), encoding='utf-8') as meta_file:
+                frequencies[article.article_id] = json.load(meta_file).get('pos_frequencies', {})
+            dates[article.article_id] = article.date
+        has_dates = all(date is not None for date in dates.values())
+        return cls.from_frequencies(frequencies, dates if has_dates else None)
+
+    def normalize(self) -> 'np.ndarray':
+        """
+        Returns relative frequencies: each row sums up to 1, rows of empty articles are zeros
+        """
+        totals = self.counts.sum(axis=1, keepdims=True)
+        return np.divide(self.counts, totals, out=np.zeros(self.counts.shape), where=totals != 0)
+
+    def get_totals(self) -> dict:
+        """
+        Returns frequencies of parts of speech in the whole corpus
+        """
+        return dict(zip(MYSTEM_POS_TAGS, self.counts.sum(axis=0).tolist()))
+
+    def aggregate_by_period(self, period: str = 'M') -> tuple:
+        """
+        Sums frequencies of articles published in the same period:
+        'Y' - year, 'M' - month, 'W' - week, 'D' - day.
+        Returns an array of periods and a matrix periods x parts of speech
+        """
+        if self.dates is None:
+            raise ValueError('Matrix has no article dates to aggregate by')
+        periods, inverse = np.unique(self.dates.astype(f'datetime64[{period}]'), return_inverse=True)
+        aggregated = np.zeros((len(periods), len(MYSTEM_POS_TAGS)), dtype=np.int64)
+        np.add.at(aggregated, inverse, self.counts)
+        return periods, aggregated
+
+    def to_frequencies(self) -> dict:
+        """
+        Exports the matrix back to {article_id: {tag: frequency}} without zero frequencies
+        """
+        return {
+            article_id: {tag: count for tag, count in zip(MYSTEM_POS_TAGS, row) if count}
+            for article_id, row in zip(self.article_ids.tolist(), self.counts.tolist())
+        }
+
+    def save(self, path: Path) -> None:
+        """
+        Saves the matrix to a .npz file
+        """
+        arrays = {'article_ids': self.article_ids, 'counts': self.counts}
+        if self.dates is not None:
+            arrays['dates'] = self.dates
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Path):
+        """
+        Loads a matrix saved with save()
+        """
+        with np.load(path) as arrays:
+            dates = arrays['dates'] if 'dates' in arrays.files else None
+            return cls(arrays['article_ids'], arrays['counts'], dates)
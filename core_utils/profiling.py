@@ -0,0 +1,152 @@
+"""
+Profiling hooks for pipelines
+"""
+import cProfile
+import datetime
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from constants import REPORTS_PATH
+
+PROFILE_ENV_VARIABLE = 'PIPELINE_PROFILE'
+PROFILE_EVERY_ENV_VARIABLE = 'PIPELINE_PROFILE_EVERY'
+DEFAULT_PROFILE_EVERY = 10
+
+
+def get_profile_every() -> int:
+    """
+    Returns sampling period from PIPELINE_PROFILE_EVERY,
+    values that are not positive integers fall back to the default one
+    """
+    value = os.environ.get(PROFILE_EVERY_ENV_VARIABLE, '')
+    try:
+        profile_every = int(value)
+    except ValueError:
+        return DEFAULT_PROFILE_EVERY
+    return profile_every if profile_every > 0 else DEFAULT_PROFILE_EVERY
+
+
+class PipelineProfiler:
+    """
+    Collects cumulative time of pipeline stages and counters of processed data.
+    Disabled profiler costs almost nothing, so hooks can stay in the code.
+    Profiling is enabled either explicitly or with the PIPELINE_PROFILE environment variable:
+        PIPELINE_PROFILE=1 - stage timers and counters
+        PIPELINE_PROFILE=cprofile - additionally dump cProfile statistics
+            for every N-th article, N is taken from PIPELINE_PROFILE_EVERY (10 by default)
+    """
+
+    def __init__(self, name: str, enabled: bool = None, profile_every: int = None,
+                 reports_path: Path = REPORTS_PATH):
+        env_value = os.environ.get(PROFILE_ENV_VARIABLE, '')
+        self.name = name
+        self.enabled = bool(env_value and env_value != '0') if enabled is None else enabled
+        if profile_every is None and env_value == 'cprofile':
+            profile_every = get_profile_every()
+        self.profile_every = profile_every if self.enabled else None
+        self.reports_path = Path(reports_path)
+
+        self._started_at = datetime.datetime.now()
+        self._collected = {
+            'stages': defaultdict(lambda: {'seconds': 0.0, 'calls': 0}),
+            'counters': defaultdict(int),
+            'sections': {}
+        }
+        self._cprofile = cProfile.Profile() if self.profile_every else None
+
+    def stage(self, stage_name: str):
+        """
+        Returns a context manager that adds the time spent inside it to a stage timer
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(stage_name)
+
+    def article(self):
+        """
+        Returns a context manager wrapping processing of a single article:
+        counts articles and samples them for cProfile
+        """
+        if not self.enabled:
+            return nullcontext()
+        counters = self._collected['counters']
+        counters['articles'] += 1
+        if self._cprofile is not None and (counters['articles'] - 1) % self.profile_every == 0:
+            return self._sample()
+        return nullcontext()
+
+    def count(self, counter_name: str, value: int = 1) -> None:
+        """
+        Increases a counter, e.g. number of tokens or bytes
+        """
+        if self.enabled:
+            self._collected['counters'][counter_name] += value
+
+    def attach(self, section_name: str, get_stats) -> None:
+        """
+        Adds a section to the report filled by get_stats() when the report is made,
+        e.g. statistics of an analyzer
+        """
+        self._collected['sections'][section_name] = get_stats
+
+    def get_report(self) -> dict:
+        """
+        Returns collected statistics
+        """
+        report = {
+            'pipeline': self.name,
+            'started': self._started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            'total_seconds': (datetime.datetime.now() - self._started_at).total_seconds(),
+            'stages': dict(self._collected['stages']),
+            'counters': dict(self._collected['counters'])
+        }
+        for section_name, get_stats in self._collected['sections'].items():
+            report[section_name] = get_stats()
+        return report
+
+    def save_report(self):
+        """
+        Saves the report as json and cProfile statistics if collected.
+        Returns the path to the report or None if profiling is disabled
+        """
+        if not self.enabled:
+            return None
+        self.reports_path.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.name}_{self._started_at.strftime('%Y%m%d_%H%M%S')}"
+        report = self.get_report()
+        if self._cprofile is not None:
+            cprofile_path = self.reports_path / f'{stem}.prof'
+            self._cprofile.dump_stats(str(cprofile_path))
+            report['cprofile'] = str(cprofile_path)
+        report_path = self.reports_path / f'{stem}.json'
+        with open(report_path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=4, ensure_ascii=False)
+        return report_path
+
+    @contextmanager
+    def _measure(self, stage_name: str):
+        """
+        Measures time spent in a stage
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage = self._collected['stages'][stage_name]
+            stage['seconds'] += time.perf_counter() - start
+            stage['calls'] += 1
+
+    @contextmanager
+    def _sample(self):
+        """
+        Collects cProfile statistics for a single article
+        """
+        self._cprofile.enable()
+        try:
+            yield
+        finally:
+            self._cprofile.disable()
@@ -0,0 +1,251 @@
+"""
+Memory-mapped binary corpus of token ids
+"""
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+
+from constants import CACHE_PATH
+from core_utils.dataset_scanner import FileKind, scan_dataset
+from core_utils.lazy import lazy_import
+
+np = lazy_import('numpy')
+
+TOKEN_CORPUS_PATH = CACHE_PATH / 'token_corpus.bin'
+MAGIC = b'TCORP001'
+PREAMBLE_SIZE = 64
+TOKEN_DTYPE = '<u4'
+OFFSETS_DTYPE = '<i8'
+STREAMS = ('forms', 'lemmas', 'tags')
+SINGLE_TAGGED_FULL_PATTERN = re.compile(r'(?<!\S)([^\s<]+)<([^>]*)>')
+
+
+class TokenCorpusWriter:
+    """
+    Collects token ids of articles and writes them to a single binary file.
+    Token ids are spilled to temporary files, so only vocabularies are kept in memory
+    """
+
+    def __init__(self):
+        self.vocabularies = {stream: {} for stream in STREAMS}
+        self._offsets = []
+        self._sizes = {stream: 0 for stream in STREAMS}
+        self._spills = {stream: tempfile.TemporaryFile() for stream in STREAMS}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _encode(self, stream: str, values: list) -> int:
+        """
+        Appends ids of values to a stream, returns the stream offset of the first one
+        """
+        vocabulary = self.vocabularies[stream]
+        ids = array('I', (vocabulary.setdefault(value, len(vocabulary)) for value in values))
+        if sys.byteorder == 'big':
+            ids.byteswap()
+        self._spills[stream].write(ids.tobytes())
+        start = self._sizes[stream]
+        self._sizes[stream] += len(values)
+        return start
+
+    def add_tokens(self, article_id: int, forms: list, lemmas: list, tags: list) -> None:
+        """
+        Adds tokens of an article: cleaned word forms and lemmas with MyStem tags.
+        Lemmas and tags must be of the same length
+        """
+        if len(lemmas) != len(tags):
+            raise ValueError(f'Article {article_id}: {len(lemmas)} lemmas but {len(tags)} tags')
+        self._offsets.append((article_id,
+                              self._encode('forms', forms), len(forms),
+                              self._encode('lemmas', lemmas), len(lemmas)))
+        self._encode('tags', tags)
+
+    def add_article(self, article_id: int, cleaned_text: str, single_tagged_text: str) -> None:
+        """
+        Adds an article parsing its N_cleaned.txt and N_single_tagged.txt texts
+        """
+        pairs = SINGLE_TAGGED_FULL_PATTERN.findall(single_tagged_text)
+        self.add_tokens(article_id, cleaned_text.split(),
+                        [lemma for lemma, _ in pairs], [tags for _, tags in pairs])
+
+    def save(self, path: Path = TOKEN_CORPUS_PATH) -> None:
+        """
+        Writes the corpus: preamble, offsets table, token id streams and a json header
+        with vocabularies and section positions. Sections are aligned to 8 bytes
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        sections = {}
+        with open(tmp_path, 'wb') as file:
+            file.write(b'\0' * PREAMBLE_SIZE)
+
+            offsets = array('q', (value for row in self._offsets for value in row))
+            if sys.byteorder == 'big':
+                offsets.byteswap()
+            sections['offsets'] = [file.tell(), len(self._offsets)]
+            file.write(offsets.tobytes())
+
+            for stream in STREAMS:
+                file.write(b'\0' * (-file.tell() % 8))
+                sections[stream] = [file.tell(), self._sizes[stream]]
+                spill = self._spills[stream]
+                spill.seek(0)
+                shutil.copyfileobj(spill, file)
+
+            header = json.dumps({
+                'sections': sections,
+                'vocabularies': {stream: list(vocabulary) for stream, vocabulary
+                                 in self.vocabularies.items()}
+            }, ensure_ascii=False).encode('utf-8')
+            header_offset = file.tell()
+            file.write(header)
+            file.seek(0)
+            file.write(MAGIC + struct.pack('<QQ', header_offset, len(header)))
+        os.replace(tmp_path, path)
+
+    def close(self) -> None:
+        """
+        Removes temporary files
+        """
+        for spill in self._spills.values():
+            spill.close()
+
+
+class TokenCorpus:
+    """
+    Read-only view of a binary token corpus. Token arrays are NumPy views
+    of the memory-mapped file, so slicing an article does not copy data
+    """
+
+    def __init__(self, path: Path = TOKEN_CORPUS_PATH):
+        self.path = Path(path)
+        with open(self.path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{self.path} is not a token corpus file')
+        header_offset, header_size = struct.unpack_from('<QQ', self._mmap, len(MAGIC))
+        header = json.loads(self._mmap[header_offset:header_offset + header_size].decode('utf-8'))
+
+        self.vocabularies = {stream: np.array(header['vocabularies'][stream], dtype=object)
+                             for stream in STREAMS}
+        self._ids = {stream: {value: index for index, value in enumerate(vocabulary)}
+                     for stream, vocabulary in header['vocabularies'].items()}
+        offset, count = header['sections']['offsets']
+        self.offsets = np.frombuffer(self._mmap, dtype=OFFSETS_DTYPE, count=count * 5,
+                                     offset=offset).reshape(count, 5)
+        self._streams = {}
+        for stream in STREAMS:
+            offset, count = header['sections'][stream]
+            self._streams[stream] = np.frombuffer(self._mmap, dtype=TOKEN_DTYPE,
+                                                  count=count, offset=offset)
+        self._rows = {int(article_id): row for row, article_id in enumerate(self.offsets[:, 0])}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, article_id: int) -> bool:
+        return article_id in self._rows
+
+    @property
+    def article_ids(self) -> list:
+        """
+        Returns ids of stored articles
+        """
+        return list(self._rows)
+
+    def get_stream(self, stream: str):
+        """
+        Returns a read-only array of ids of forms, lemmas or tags of all articles
+        in order of the offsets table
+        """
+        return self._streams[stream]
+
+    def get_tokens(self, article_id: int, stream: str):
+        """
+        Returns a read-only array of ids of forms, lemmas or tags of an article
+        """
+        _, form_start, form_count, lemma_start, lemma_count = self.offsets[self._rows[article_id]]
+        if stream == 'forms':
+            return self._streams[stream][form_start:form_start + form_count]
+        return self._streams[stream][lemma_start:lemma_start + lemma_count]
+
+    def get_forms(self, article_id: int):
+        """
+        Returns ids of cleaned word forms of an article
+        """
+        return self.get_tokens(article_id, 'forms')
+
+    def get_lemmas(self, article_id: int):
+        """
+        Returns ids of lemmas of an article
+        """
+        return self.get_tokens(article_id, 'lemmas')
+
+    def get_tags(self, article_id: int):
+        """
+        Returns ids of MyStem tags of an article
+        """
+        return self.get_tokens(article_id, 'tags')
+
+    def get_id(self, stream: str, value: str):
+        """
+        Returns an id of a form, a lemma or a tag, None if it is not in the corpus
+        """
+        return self._ids[stream].get(value)
+
+    def decode(self, stream: str, ids) -> list:
+        """
+        Returns strings of token ids
+        """
+        return self.vocabularies[stream][ids].tolist()
+
+    def close(self) -> None:
+        """
+        Releases the memory map. If arrays returned earlier are still referenced,
+        the map is released when they are garbage collected
+        """
+        self.offsets = None
+        self._streams = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+
+def convert_artifacts(dataset_path: Path, path: Path = TOKEN_CORPUS_PATH) -> int:
+    """
+    Builds a token corpus from N_cleaned.txt and N_single_tagged.txt files,
+    returns the number of converted articles
+    """
+    dataset_path = Path(dataset_path)
+    # artifacts are rewritten in place when articles are processed again
+    scan = scan_dataset(dataset_path, use_manifest=False)
+    ids = [article_id for article_id in scan.get_ids(FileKind.single_tagged)
+           if scan.has(article_id, FileKind.cleaned)]
+    with TokenCorpusWriter() as writer:
+        for article_id in ids:
+            with open(dataset_path / f'{article_id}_cleaned.txt', encoding='utf-8') as file:
+                cleaned_text = file.read()
+            with open(dataset_path / f'{article_id}_single_tagged.txt', encoding='utf-8') as file:
+                single_tagged_text = file.read()
+            writer.add_article(article_id, cleaned_text, single_tagged_text)
+        writer.save(path)
+    return len(ids)
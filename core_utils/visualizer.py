@@ -2,37 +2,101 @@
 Visualizer module for visualizing PosFrequencyPipeline results
 """
 
+import hashlib
+import json
 from pathlib import Path
-import numpy as np
-import matplotlib.pyplot as plt
 
+from constants import CACHE_PATH
+from core_utils.lazy import get_pyplot, lazy_import
+from core_utils.manifest import dump_json_atomically
 
-def visualize(statistics: dict, path_to_save: Path):
+np = lazy_import('numpy')
+
+VISUALIZER_MANIFEST_PATH = CACHE_PATH / 'visualizer_manifest.json'
+COLORS = ('b', 'g', 'r', 'c')
+
+
+def _draw(axis, statistics: dict) -> None:
     """
-    param: statistics is a dictionary with keys:POS tags, values:frequencies
+    Draws all bars of a chart with a single call
     """
-    number_of_tags = len(statistics)
-    sorted_frequencies = sorted(statistics.values(), reverse=True)
     sorted_tags = sorted(statistics, key=statistics.get, reverse=True)
+    sorted_frequencies = [statistics[tag] for tag in sorted_tags]
+    pos_tags = np.arange(len(sorted_tags))
+
+    axis.bar(pos_tags, sorted_frequencies,
+             align='center', width=0.5,
+             color=[COLORS[i % len(COLORS)] for i in range(len(sorted_tags))])
+    axis.set_xticks(pos_tags)
+    axis.set_xticklabels(sorted_tags, rotation=20)
+    axis.set_ylim(0, max(sorted_frequencies, default=0) + 1)
 
-    pos_tags = np.arange(number_of_tags)
-    colors = ('b', 'g', 'r', 'c')
 
+def _render(charts: list) -> None:
+    """
+    Renders (statistics, path_to_save) pairs reusing a single figure
+    """
+    plt = get_pyplot()
     figure = plt.figure()
     axis = figure.add_subplot(1, 1, 1)
-    for i in range(0, number_of_tags):
-        axis.bar(pos_tags[i], sorted_frequencies[i],
-                 align='center', width=0.5,
-                 color=colors[i % len(colors)])
+    try:
+        for statistics, path_to_save in charts:
+            axis.clear()
+            _draw(axis, statistics)
+            figure.savefig(path_to_save)
+    finally:
+        plt.close(figure)
 
-    axis.set_xticks(pos_tags)
-    axis.set_xticklabels(sorted_tags)
-    plt.setp(sorted_tags)
-    plt.xticks(rotation=20)
-    y_max = max(sorted_frequencies) + 1
-    plt.ylim(0, y_max)
 
-    plt.savefig(path_to_save)
+def _get_statistics_hash(statistics: dict) -> str:
+    """
+    Returns a hash of chart input
+    """
+    return hashlib.sha1(json.dumps(statistics, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def visualize(statistics: dict, path_to_save: Path):
+    """
+    param: statistics is a dictionary with keys:POS tags, values:frequencies
+    """
+    _render([(statistics, path_to_save)])
+
+
+def visualize_batch(charts: dict, workers: int = 1, skip_unchanged: bool = True,
+                    manifest_path: Path = VISUALIZER_MANIFEST_PATH) -> int:
+    """
+    Renders many charts at once
+    param: charts is a dictionary with keys:paths to save, values:statistics
+    param: workers is a number of processes to render charts in
+    param: skip_unchanged enables skipping images whose statistics did not change
+    Returns the number of rendered charts
+    """
+    manifest = {}
+    if skip_unchanged and Path(manifest_path).exists():
+        with open(manifest_path, encoding='utf-8') as file:
+            manifest = json.load(file)
+
+    to_render = []
+    for path_to_save, statistics in charts.items():
+        statistics_hash = _get_statistics_hash(statistics)
+        key = str(Path(path_to_save).resolve())
+        if skip_unchanged and manifest.get(key) == statistics_hash and Path(path_to_save).exists():
+            continue
+        to_render.append((statistics, path_to_save))
+        manifest[key] = statistics_hash
+
+    if workers > 1 and len(to_render) > 1:
+        # multiprocessing is expensive to import and is not needed for a single worker
+        from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+        chunks = [to_render[start::workers] for start in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_render, chunks))
+    elif to_render:
+        _render(to_render)
+
+    if skip_unchanged:
+        dump_json_atomically(manifest, Path(manifest_path))
+    return len(to_render)
 
 
 if __name__ == "__main__":